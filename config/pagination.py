@@ -1,5 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
 
 class DefaultPageNumberPagination(PageNumberPagination):
@@ -29,3 +36,115 @@ class DefaultPageNumberPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class KeysetPagination(BasePagination):
+    """Cursor (keyset) pagination over a unique ordering such as ``(created_at, id)``.
+
+    - The opaque ``?cursor=`` holds the last row's ordering values; the next
+      page is ``WHERE (created_at, id) < (...)`` instead of an OFFSET, so a
+      page costs the same however deep the client scrolls (no COUNT either)
+    - Newest first by default; ``?ordering=`` accepts only the ordering
+      field, ascending or descending (``created_at`` / ``-created_at``),
+      anything else is a 400
+    - The cursor records its direction and is rejected under another ordering
+    - Supports `?page_size=`, capped to 100
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Cursor inválido"
+
+    def __init__(self, fields=("created_at", "id"), ordering_field=None):
+        self.fields = tuple(fields)
+        # Name accepted in ``?ordering=`` (defaults to the first field)
+        self.ordering_field = ordering_field or self.fields[0]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        requested = str(request.query_params.get("ordering") or "").strip()
+        allowed = (f"-{self.ordering_field}", self.ordering_field)
+        if requested and requested not in allowed:
+            raise ValidationError({"ordering": [f"Use {allowed[0]} ou {allowed[1]}."]})
+        self.descending = not requested or requested.startswith("-")
+        self.ordering = allowed[0] if self.descending else allowed[1]
+
+        cursor = self.decode_cursor(request, queryset.model)
+        if cursor is not None:
+            queryset = queryset.filter(self._after(cursor))
+        order = [f"-{f}" if self.descending else f for f in self.fields]
+        rows = list(queryset.order_by(*order)[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return api_settings.PAGE_SIZE or self.max_page_size
+
+    def _after(self, values):
+        # (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y)
+        op = "lt" if self.descending else "gt"
+        cond = Q()
+        for i, field in enumerate(self.fields):
+            eq = {f: values[j] for j, f in enumerate(self.fields[:i])}
+            cond |= Q(**eq, **{f"{field}__{op}": values[i]})
+        return cond
+
+    def _value(self, row, field):
+        value = row[field] if isinstance(row, dict) else getattr(row, field)
+        return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+    def encode_cursor(self, row) -> str:
+        raw = json.dumps(
+            {"o": self.ordering, "v": [self._value(row, f) for f in self.fields]}
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            # A cursor only continues the ordering it was issued for
+            if raw.get("o") != self.ordering:
+                raise ValueError(raw)
+            raw = raw["v"]
+            if not isinstance(raw, list) or len(raw) != len(self.fields):
+                raise ValueError(raw)
+            values = [
+                model._meta.get_field(f).to_python(v) for f, v in zip(self.fields, raw)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        if any(v is None for v in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.last),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "ordering": self.ordering,
+                "results": data,
+            }
+        )
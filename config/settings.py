@@ -191,12 +191,30 @@ CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/1
 # Optional: simple beat schedule to validate the worker periodically
 from celery.schedules import crontab  # type: ignore
 
+# With adaptive sampling the beat is a short tick and each camera is only
+# captured when its risk-tier interval elapsed (FLOOD_SAMPLING_INTERVALS)
+FLOOD_ADAPTIVE_SAMPLING = os.getenv("FLOOD_ADAPTIVE_SAMPLING", "1").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+FLOOD_SCHEDULER_TICK_SECONDS = float(os.getenv("FLOOD_SCHEDULER_TICK_SECONDS", "60"))
 CELERY_BEAT_SCHEDULE = {
+    # Single sweep per cycle: persists alerts and refreshes flood:predict_all
     "flood-analyze-all-cameras": {
         "task": "core.flood_camera_monitoring.infra.tasks.analyze_all_cameras_task",
-        "schedule": 300.00,
+        "schedule": FLOOD_SCHEDULER_TICK_SECONDS if FLOOD_ADAPTIVE_SAMPLING else 300.00,
+    },
+    # Next months' partitions + retention of old detections (infra/partitions.py)
+    "flood-detection-partitions": {
+        "task": "core.flood_camera_monitoring.infra.tasks.maintain_detection_partitions_task",
+        "schedule": 24 * 3600.0,
     },
 }
+# predict_all cache: refreshed in background once older than STALE (keep it
+# a bit above the beat interval); stale data is still served until TTL
+PREDICT_CACHE_STALE_SECONDS = int(os.getenv("PREDICT_CACHE_STALE_SECONDS", "360"))
+PREDICT_CACHE_TTL_SECONDS = int(os.getenv("PREDICT_CACHE_TTL_SECONDS", "86400"))
 
 # Logging: ensure our modules and Celery log to console at INFO level
 LOGGING = {
@@ -232,6 +250,23 @@ CAMERA_INSTALL_URL = os.getenv("CAMERA_INSTALL_URL", "")
 # Redis URL dedicated for application cache (separate DB from Celery broker/results).
 # Defaults to DB 2 on the same Redis host.
 REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL", "redis://redis:6379/2")
+# Process-wide connection pool for core.common.cache clients
+REDIS_CACHE_MAX_CONNECTIONS = int(os.getenv("REDIS_CACHE_MAX_CONNECTIONS", "50"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2.0"))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "2.0"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+# Cached value encoding: codec json|orjson|msgpack, compression none|zlib|lz4
+# applied to payloads of at least CACHE_COMPRESS_MIN_BYTES
+CACHE_CODEC = os.getenv("CACHE_CODEC", "orjson")
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib")
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "4096"))
+# core.common.tiered_cache: per-process LRU in front of Redis, invalidated
+# via pub/sub; the local TTL bounds staleness if a message is missed
+TIERED_CACHE_TTL_SECONDS = int(os.getenv("TIERED_CACHE_TTL_SECONDS", "300"))
+TIERED_CACHE_LOCAL_TTL_SECONDS = float(
+    os.getenv("TIERED_CACHE_LOCAL_TTL_SECONDS", "30")
+)
+TIERED_CACHE_MAX_ENTRIES = int(os.getenv("TIERED_CACHE_MAX_ENTRIES", "256"))
 
 # Django REST Framework
 REST_FRAMEWORK = {
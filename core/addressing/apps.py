@@ -12,3 +12,4 @@ class AddressingConfig(AppConfig):
             from .infra import models  # noqa: F401
         except Exception:
             pass
+        from . import signals  # noqa: F401
@@ -3,6 +3,7 @@ from typing import Iterable, Optional
 from core.addressing.domain import entities as d_entities
 from core.addressing.domain import repository as d_repo
 from core.addressing.infra import models as orm
+from core.addressing.signals import invalidate_addressing_cache
 
 
 def _to_domain_neighborhood(m: orm.Neighborhood) -> d_entities.Neighborhood:
@@ -64,6 +65,8 @@ class DjangoNeighborhoodRepository(d_repo.NeighborhoodRepository):
             region_id=neighborhood.region_id or None,
             props=neighborhood.props or {},
         )
+        # QuerySet.update() skips post_save
+        invalidate_addressing_cache()
         m = orm.Neighborhood.objects.get(id=neighborhood.id)
         return _to_domain_neighborhood(m)
 
@@ -87,5 +90,6 @@ class DjangoRegionRepository(d_repo.RegionRepository):
 
     def update_region(self, region: d_entities.Region) -> d_entities.Region:
         orm.Region.objects.filter(id=region.id).update(name=region.name, city=region.city, props=region.props or {})
+        invalidate_addressing_cache()
         m = orm.Region.objects.get(id=region.id)
         return _to_domain_region(m)
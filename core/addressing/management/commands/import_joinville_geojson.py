@@ -8,6 +8,7 @@ from typing import Any, Dict, Iterable, List, Tuple
 from django.core.management.base import BaseCommand, CommandError
 
 from core.addressing.infra.models import Neighborhood, Region
+from core.addressing.signals import deferred_invalidation
 
 
 # ---- Geometry helpers (module-level) ----
@@ -246,67 +247,77 @@ class Command(BaseCommand):
             return r
 
         # Se vamos inferir zonas quando faltarem, precisamos talvez das coords dos bairros
-        for feat in features:
-            props: Dict[str, Any] = feat.get("properties") or {}
-            g = feat.get("geometry") if keep_geometry else None
-
-            region_name = (props.get(prop_region) or "").strip()
-            neigh_name = (props.get(prop_neigh) or "").strip()
-
-            if not region_name and not neigh_name:
-                continue
-
-            region: Region | None = None
-            if region_name:
-                region = get_or_create_region(region_name, g)
-            elif infer_zones and neigh_name:
-                c = geom_centroid(
-                    feat.get("geometry") if feat.get("geometry") else None
-                )
-                if c is not None and center_lat is not None and center_lon is not None:
-                    zone = infer_zone_name((c[1], c[0]))  # (lat, lon)
-                else:
-                    zone = "Centro"
-                region = get_or_create_region(zone, None, inferred=True)
-
-            if neigh_name:
-                # Build props containing geometry and metrics only inside JSON
-                n_props = {"source_props": props}
-                area_val = None
-                if keep_geometry and g:
-                    n_props["geometry"] = g
-                    c = geom_centroid(g)
-                    if c:
-                        n_props["centroid"] = [c[0], c[1]]  # [lon, lat]
-                    area_val = geom_area_km2(g)
-                    if area_val is not None:
-                        n_props["area_km2"] = area_val
-
-                n, created = Neighborhood.objects.get_or_create(
-                    name=neigh_name,
-                    city=city,
-                    defaults={"region": region, "props": n_props, "area_km2": area_val},
-                )
-
-                updates = {}
-                if region and n.region_id != getattr(region, "id", None):
-                    n.region = region
-                    updates["region"] = region
-
-                # Merge props on update
-                merged = dict(n.props or {})
-                for k, v in n_props.items():
-                    merged[k] = v
-                if merged != (n.props or {}):
-                    n.props = merged
-                    updates["props"] = merged
-
-                # Update area_km2 if computed
-                if area_val is not None and n.area_km2 != area_val:
-                    n.area_km2 = area_val
-                    updates["area_km2"] = area_val
-
-                if updates and not created:
-                    n.save(update_fields=list(updates.keys()))
-                if created:
-                    created_neighs += 1
+        # One cache invalidation for the whole import, not one per row
+        with deferred_invalidation():
+            for feat in features:
+                props: Dict[str, Any] = feat.get("properties") or {}
+                g = feat.get("geometry") if keep_geometry else None
+
+                region_name = (props.get(prop_region) or "").strip()
+                neigh_name = (props.get(prop_neigh) or "").strip()
+
+                if not region_name and not neigh_name:
+                    continue
+
+                region: Region | None = None
+                if region_name:
+                    region = get_or_create_region(region_name, g)
+                elif infer_zones and neigh_name:
+                    c = geom_centroid(
+                        feat.get("geometry") if feat.get("geometry") else None
+                    )
+                    if (
+                        c is not None
+                        and center_lat is not None
+                        and center_lon is not None
+                    ):
+                        zone = infer_zone_name((c[1], c[0]))  # (lat, lon)
+                    else:
+                        zone = "Centro"
+                    region = get_or_create_region(zone, None, inferred=True)
+
+                if neigh_name:
+                    # Build props containing geometry and metrics only inside JSON
+                    n_props = {"source_props": props}
+                    area_val = None
+                    if keep_geometry and g:
+                        n_props["geometry"] = g
+                        c = geom_centroid(g)
+                        if c:
+                            n_props["centroid"] = [c[0], c[1]]  # [lon, lat]
+                        area_val = geom_area_km2(g)
+                        if area_val is not None:
+                            n_props["area_km2"] = area_val
+
+                    n, created = Neighborhood.objects.get_or_create(
+                        name=neigh_name,
+                        city=city,
+                        defaults={
+                            "region": region,
+                            "props": n_props,
+                            "area_km2": area_val,
+                        },
+                    )
+
+                    updates = {}
+                    if region and n.region_id != getattr(region, "id", None):
+                        n.region = region
+                        updates["region"] = region
+
+                    # Merge props on update
+                    merged = dict(n.props or {})
+                    for k, v in n_props.items():
+                        merged[k] = v
+                    if merged != (n.props or {}):
+                        n.props = merged
+                        updates["props"] = merged
+
+                    # Update area_km2 if computed
+                    if area_val is not None and n.area_km2 != area_val:
+                        n.area_km2 = area_val
+                        updates["area_km2"] = area_val
+
+                    if updates and not created:
+                        n.save(update_fields=list(updates.keys()))
+                    if created:
+                        created_neighs += 1
@@ -5,6 +5,54 @@ from rest_framework.decorators import action
 from core.addressing.application.services import build_neighborhoods_feature_collection
 from core.addressing.infra.repositories import DjangoNeighborhoodRepository
 from core.addressing.infra.models import Region, Neighborhood
+from core.addressing.signals import CACHE_NAMESPACE
+from core.common.tiered_cache import tiered_cache
+
+
+@tiered_cache(CACHE_NAMESPACE)
+def regions_neighborhoods_payload(city):
+    regions_qs = Region.objects.all()
+    if city:
+        regions_qs = regions_qs.filter(city__iexact=city)
+    regions_qs = regions_qs.order_by("name").prefetch_related("neighborhoods")
+
+    payload_regions = []
+    total_nb = 0
+    for reg in regions_qs:
+        # Restrict neighborhoods to same city (defensive)
+        nbs = [
+            nb
+            for nb in reg.neighborhoods.all()
+            if not city or nb.city.lower() == reg.city.lower()
+        ]
+        nbs_sorted = sorted(nbs, key=lambda x: (x.name or ""))
+        total_nb += len(nbs_sorted)
+        payload_regions.append(
+            {
+                "id": str(reg.id),
+                "name": reg.name,
+                "city": reg.city,
+                "neighborhood_count": len(nbs_sorted),
+                "neighborhoods": [
+                    {"id": str(nb.id), "name": nb.name, "city": nb.city}
+                    for nb in nbs_sorted
+                ],
+            }
+        )
+
+    return {
+        "city": city or None,
+        "total_regions": len(payload_regions),
+        "total_neighborhoods": total_nb,
+        "regions": payload_regions,
+    }
+
+
+@tiered_cache(CACHE_NAMESPACE)
+def neighborhoods_feature_collection(all_flag, city, region):
+    return build_neighborhoods_feature_collection(
+        DjangoNeighborhoodRepository(), all_flag=all_flag, city=city, region=region
+    )
 
 
 class AddressingViewSet(viewsets.ViewSet):
@@ -27,45 +75,7 @@ class AddressingViewSet(viewsets.ViewSet):
         }
         """
         city = request.query_params.get("city")
-
-        regions_qs = Region.objects.all()
-        if city:
-            regions_qs = regions_qs.filter(city__iexact=city)
-        regions_qs = regions_qs.order_by("name").prefetch_related("neighborhoods")
-
-        payload_regions = []
-        total_nb = 0
-        for reg in regions_qs:
-            # Restrict neighborhoods to same city (defensive)
-            nbs = [
-                nb
-                for nb in reg.neighborhoods.all()
-                if not city or nb.city.lower() == reg.city.lower()
-            ]
-            nbs_sorted = sorted(nbs, key=lambda x: (x.name or ""))
-            total_nb += len(nbs_sorted)
-            payload_regions.append(
-                {
-                    "id": str(reg.id),
-                    "name": reg.name,
-                    "city": reg.city,
-                    "neighborhood_count": len(nbs_sorted),
-                    "neighborhoods": [
-                        {"id": str(nb.id), "name": nb.name, "city": nb.city}
-                        for nb in nbs_sorted
-                    ],
-                }
-            )
-
-        return Response(
-            {
-                "city": city or None,
-                "total_regions": len(payload_regions),
-                "total_neighborhoods": total_nb,
-                "regions": payload_regions,
-            },
-            status=status.HTTP_200_OK,
-        )
+        return Response(regions_neighborhoods_payload(city), status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"], url_path="dados_geograficos")
     def dados_geograficos(self, request):
@@ -101,8 +111,5 @@ class AddressingViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        repo = DjangoNeighborhoodRepository()
-        collection = build_neighborhoods_feature_collection(
-            repo, all_flag=all_flag, city=city, region=region
-        )
+        collection = neighborhoods_feature_collection(all_flag, city, region)
         return Response(collection, status=status.HTTP_200_OK)
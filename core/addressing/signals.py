@@ -0,0 +1,67 @@
+"""Invalidate the cached addressing read endpoints whenever the data changes.
+
+Invalidation is one Redis round trip (generation bump + publish), so it is
+collapsed: inside a transaction it runs once, after commit; inside
+``deferred_invalidation()`` (bulk imports) it runs once, on exit.
+"""
+
+from contextlib import contextmanager
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.addressing.infra.models import City, Neighborhood, Region
+from core.common.tiered_cache import invalidate
+
+CACHE_NAMESPACE = "addressing"
+
+_deferred = threading.local()
+
+
+def _invalidate_now() -> None:
+    invalidate(CACHE_NAMESPACE)
+
+
+def invalidate_addressing_cache(sender=None, **kwargs) -> None:
+    if getattr(_deferred, "depth", 0):
+        _deferred.dirty = True
+        return
+    conn = transaction.get_connection()
+    if not conn.in_atomic_block:
+        _invalidate_now()
+        return
+    # Already scheduled for this transaction? (rolled back callbacks are
+    # dropped from the list, so a later change schedules it again)
+    if any(entry[1] is _invalidate_now for entry in conn.run_on_commit):
+        return
+    transaction.on_commit(_invalidate_now)
+
+
+@contextmanager
+def deferred_invalidation():
+    """Collect invalidations of the block and run at most one at the end."""
+    depth = getattr(_deferred, "depth", 0)
+    if not depth:
+        _deferred.dirty = False
+    _deferred.depth = depth + 1
+    try:
+        yield
+    finally:
+        _deferred.depth = depth
+        if not depth and _deferred.dirty:
+            _deferred.dirty = False
+            invalidate_addressing_cache()
+
+
+for _model in (City, Region, Neighborhood):
+    post_save.connect(
+        invalidate_addressing_cache,
+        sender=_model,
+        dispatch_uid=f"addressing-cache-save-{_model.__name__}",
+    )
+    post_delete.connect(
+        invalidate_addressing_cache,
+        sender=_model,
+        dispatch_uid=f"addressing-cache-delete-{_model.__name__}",
+    )
@@ -1,30 +1,313 @@
 import json
+import logging
+import threading
 import time
-from typing import Any, Optional
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
 
 import redis
 from django.conf import settings
 
+try:  # optional fast codecs
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+try:
+    import lz4.frame as lz4_frame  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
 
-def get_redis() -> redis.Redis:
-    return redis.from_url(settings.REDIS_CACHE_URL, decode_responses=True)
+_pools: Dict[tuple, redis.ConnectionPool] = {}
+_pools_lock = threading.Lock()
 
 
-def cache_set_json(key: str, value: Any, ex: Optional[int] = None) -> None:
-    r = get_redis()
-    r.set(key, json.dumps(value, default=str), ex=ex)
+def _pool(url: str, decode_responses: bool) -> redis.ConnectionPool:
+    """One process-wide connection pool per (url, decode_responses)."""
+    key = (url, bool(decode_responses))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = redis.ConnectionPool.from_url(
+                    url,
+                    decode_responses=decode_responses,
+                    max_connections=int(
+                        getattr(settings, "REDIS_CACHE_MAX_CONNECTIONS", 50)
+                    ),
+                    socket_timeout=float(
+                        getattr(settings, "REDIS_SOCKET_TIMEOUT", 2.0)
+                    ),
+                    socket_connect_timeout=float(
+                        getattr(settings, "REDIS_SOCKET_CONNECT_TIMEOUT", 2.0)
+                    ),
+                    health_check_interval=int(
+                        getattr(settings, "REDIS_HEALTH_CHECK_INTERVAL", 30)
+                    ),
+                )
+                _pools[key] = pool
+    return pool
 
 
-def cache_get_json(key: str) -> Optional[Any]:
-    r = get_redis()
-    raw = r.get(key)
+def get_redis(decode_responses: bool = True, url: Optional[str] = None) -> redis.Redis:
+    """Redis client for the app cache; use decode_responses=False for binary values.
+
+    Clients share a module-level connection pool (per URL), so calling this
+    per operation does not open new TCP connections. ``url`` defaults to
+    REDIS_CACHE_URL.
+    """
+    url = url or settings.REDIS_CACHE_URL
+    return redis.Redis(connection_pool=_pool(url, decode_responses))
+
+
+class CacheMetrics:
+    """In-process hit/miss/error counters and recent operation latencies."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=window)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.ops = 0
+
+    def record(self, seconds: float, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.ops += 1
+            self.hits += hits
+            self.misses += misses
+            self._latencies.append(seconds)
+
+    def error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lat = sorted(self._latencies)
+            hits, misses, errors, ops = self.hits, self.misses, self.errors, self.ops
+
+        def pct(p: float) -> float:
+            if not lat:
+                return 0.0
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000.0, 3)
+
+        lookups = hits + misses
+        return {
+            "ops": ops,
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)},
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+            self.hits = self.misses = self.errors = self.ops = 0
+
+
+metrics = CacheMetrics()
+
+
+@contextmanager
+def _timed():
+    t0 = time.perf_counter()
+    stats = {"hits": 0, "misses": 0}
+    try:
+        yield stats
+    except Exception:
+        metrics.error()
+        raise
+    metrics.record(time.perf_counter() - t0, **stats)
+
+
+# Value codecs -------------------------------------------------------------
+#
+# Encoded values start with a 4-byte header: MAGIC, format version, codec id
+# and compression id. Values without the header (plain JSON text written by
+# older code) are still decoded as JSON.
+
+MAGIC = 0xFC  # never the first byte of JSON text
+FORMAT_VERSION = 1
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _msgpack_loads(raw: bytes) -> Any:
+    return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+
+# id -> (name, dumps, loads); ids are part of the stored format, never reuse
+CODECS: Dict[int, tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    1: ("json", _json_dumps, json.loads),
+}
+if orjson is not None:
+    CODECS[2] = ("orjson", _orjson_dumps, orjson.loads)
+if msgpack is not None:
+    CODECS[3] = ("msgpack", _msgpack_dumps, _msgpack_loads)
+
+COMPRESSORS: Dict[
+    int, tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]
+] = {
+    0: ("none", bytes, bytes),
+    1: ("zlib", lambda b: zlib.compress(b, 6), zlib.decompress),
+}
+if lz4_frame is not None:
+    COMPRESSORS[2] = ("lz4", lz4_frame.compress, lz4_frame.decompress)
+
+_CODEC_IDS = {name: cid for cid, (name, _, _) in CODECS.items()}
+_COMPRESSOR_IDS = {name: cid for cid, (name, _, _) in COMPRESSORS.items()}
+
+
+def _codec_id(name: Optional[str] = None) -> int:
+    name = name or getattr(settings, "CACHE_CODEC", "orjson")
+    # Fall back to the stdlib when the optional package is missing
+    return _CODEC_IDS.get(str(name).lower(), _CODEC_IDS.get("orjson", 1))
+
+
+def warn_missing_codecs() -> list[str]:
+    """Log (once, at startup) configured codecs whose package is not installed.
+
+    Encoding silently falls back (orjson -> json, unknown compression -> zlib),
+    so a missing wheel would otherwise only show up as slower cache reads.
+    Returns the warnings, for checks and tests.
+    """
+    codec = str(getattr(settings, "CACHE_CODEC", "orjson")).lower()
+    compression = str(getattr(settings, "CACHE_COMPRESSION", "zlib")).lower()
+    problems = []
+    if codec not in _CODEC_IDS:
+        fallback = CODECS[_codec_id(codec)][0]
+        problems.append(
+            f"CACHE_CODEC={codec} is unavailable (package not installed); "
+            f"using {fallback}"
+        )
+    if compression not in _COMPRESSOR_IDS:
+        problems.append(
+            f"CACHE_COMPRESSION={compression} is unavailable (package not "
+            "installed); using zlib"
+        )
+    for msg in problems:
+        logging.getLogger(__name__).warning(msg)
+    return problems
+
+
+def _compressor_id(name: Optional[str] = None) -> int:
+    name = name or getattr(settings, "CACHE_COMPRESSION", "zlib")
+    return _COMPRESSOR_IDS.get(str(name).lower(), 1)
+
+
+def encode_value(
+    value: Any,
+    codec: Optional[str] = None,
+    compression: Optional[str] = None,
+    min_compress_bytes: Optional[int] = None,
+) -> bytes:
+    """Serialize ``value`` with the configured codec, compressing large payloads."""
+    cid = _codec_id(codec)
+    body = CODECS[cid][1](value)
+    zid = 0
+    threshold = (
+        int(getattr(settings, "CACHE_COMPRESS_MIN_BYTES", 4096))
+        if min_compress_bytes is None
+        else int(min_compress_bytes)
+    )
+    if len(body) >= threshold:
+        zid = _compressor_id(compression)
+        if zid:
+            packed = COMPRESSORS[zid][1](body)
+            if len(packed) < len(body):
+                body = packed
+            else:
+                zid = 0
+    return bytes((MAGIC, FORMAT_VERSION, cid, zid)) + body
+
+
+def decode_value(raw) -> Any:
+    """Inverse of encode_value; also accepts legacy plain-JSON values."""
+    if isinstance(raw, str):
+        return json.loads(raw)
+    raw = bytes(raw)
+    if len(raw) < 4 or raw[0] != MAGIC:
+        return json.loads(raw)
+    version, cid, zid = raw[1], raw[2], raw[3]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache format version {version}")
+    if cid not in CODECS or zid not in COMPRESSORS:
+        raise ValueError(f"Cache value needs codec={cid} compression={zid}")
+    body = COMPRESSORS[zid][2](raw[4:])
+    return CODECS[cid][2](body)
+
+
+def _loads(raw) -> Optional[Any]:
     if not raw:
         return None
     try:
-        return json.loads(raw)
+        return decode_value(raw)
     except Exception:
         return None
 
 
+def cache_set_json(key: str, value: Any, ex: Optional[int] = None) -> None:
+    with _timed():
+        get_redis(decode_responses=False).set(key, encode_value(value), ex=ex)
+
+
+def cache_get_json(key: str) -> Optional[Any]:
+    with _timed() as stats:
+        raw = get_redis(decode_responses=False).get(key)
+        stats["hits" if raw else "misses"] += 1
+    return _loads(raw)
+
+
+def cache_mget_json(keys: Iterable[str]) -> Dict[str, Optional[Any]]:
+    """Fetch several JSON keys in one round-trip; missing keys map to None."""
+    keys = list(keys)
+    if not keys:
+        return {}
+    with _timed() as stats:
+        raws = get_redis(decode_responses=False).mget(keys)
+        found = sum(1 for raw in raws if raw)
+        stats["hits"] += found
+        stats["misses"] += len(keys) - found
+    return {k: _loads(raw) for k, raw in zip(keys, raws)}
+
+
+def cache_mset_json(items: Mapping[str, Any], ex: Optional[int] = None) -> None:
+    """Set several JSON keys in one pipelined round-trip (optionally with TTL)."""
+    if not items:
+        return
+    with _timed():
+        pipe = get_redis(decode_responses=False).pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(key, encode_value(value), ex=ex)
+        pipe.execute()
+
+
+def cache_metrics() -> dict:
+    return metrics.snapshot()
+
+
 def now_ts() -> float:
     return time.time()
@@ -0,0 +1,258 @@
+"""Two-tier read cache: per-process LRU+TTL in front of Redis.
+
+``@tiered_cache("namespace")`` memoizes a function by its arguments. A read
+first checks a bounded in-process LRU (no network hop), then Redis (shared by
+every worker), and only then calls the function, filling both tiers.
+
+Writers call ``invalidate("namespace")``: it bumps the namespace generation in
+Redis (old shared entries simply stop being addressed and expire by TTL) and
+publishes the namespace on a pub/sub channel. A daemon thread in each process
+listens on that channel and drops the matching local entries, so memory never
+serves data older than the last invalidation it heard about; the local TTL
+bounds staleness if a message is missed (e.g. while Redis is unreachable).
+
+Cached values must be JSON/codec serializable and treated as read-only.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+
+from core.common.cache import cache_get_json, cache_set_json, get_redis
+
+CHANNEL = "tiered_cache:invalidate"
+GENERATION_KEY = "tiered_cache:{ns}:gen"
+VALUE_KEY = "tiered_cache:{ns}:{gen}:{digest}"
+
+logger = logging.getLogger(__name__)
+_MISSING = object()
+
+
+class LocalLRU:
+    """Thread-safe bounded LRU whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 30.0) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every clear(); set() ignores values computed before it
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, epoch: Optional[int] = None) -> None:
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.epoch += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_local: Dict[str, List[LocalLRU]] = {}
+_local_lock = threading.Lock()
+_listener_pid: Optional[int] = None
+
+
+def _register(namespace: str, lru: LocalLRU) -> None:
+    with _local_lock:
+        _local.setdefault(namespace, []).append(lru)
+
+
+def _clear_local(namespace: Optional[str] = None) -> None:
+    with _local_lock:
+        groups = (
+            list(_local.values()) if namespace is None else [_local.get(namespace, [])]
+        )
+    for group in groups:
+        for lru in group:
+            lru.clear()
+
+
+def _listen() -> None:
+    backoff = 1.0
+    while True:
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            # Messages may have been missed while (re)connecting
+            _clear_local()
+            backoff = 1.0
+            while True:
+                msg = pubsub.get_message(timeout=1.0)
+                if msg and msg.get("type") == "message":
+                    _clear_local(str(msg.get("data") or "") or None)
+        except Exception as e:
+            logger.warning("tiered cache listener disconnected: %s", e)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+def _ensure_listener() -> None:
+    """Start the pub/sub listener once per process (again after a fork)."""
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _local_lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+    threading.Thread(target=_listen, name="tiered-cache-listener", daemon=True).start()
+
+
+def _generation(namespace: str) -> str:
+    raw = get_redis().get(GENERATION_KEY.format(ns=namespace))
+    return str(raw or 0)
+
+
+def invalidate(namespace: str, pipe=None) -> None:
+    """Drop ``namespace`` in this process, in Redis and in every other process.
+
+    With ``pipe`` the generation bump and the publish are queued on the given
+    Redis pipeline, so they commit together with the caller's own writes.
+    """
+    _clear_local(namespace)
+    try:
+        target = pipe if pipe is not None else get_redis().pipeline(transaction=True)
+        target.incr(GENERATION_KEY.format(ns=namespace))
+        target.publish(CHANNEL, namespace)
+        if pipe is None:
+            target.execute()
+    except Exception as e:
+        logger.warning("tiered cache invalidation of %r failed: %s", namespace, e)
+
+
+def _default_key(*args, **kwargs) -> str:
+    return repr((args, sorted(kwargs.items())))
+
+
+def tiered_cache(
+    namespace: str,
+    ttl: Optional[int] = None,
+    local_ttl: Optional[float] = None,
+    maxsize: Optional[int] = None,
+    shared: bool = True,
+    key: Optional[Callable[..., Any]] = None,
+):
+    """Memoize a function in process memory and (``shared=True``) in Redis.
+
+    - ttl: Redis expiry (default TIERED_CACHE_TTL_SECONDS);
+    - local_ttl: in-process expiry (default TIERED_CACHE_LOCAL_TTL_SECONDS);
+    - maxsize: in-process entries (default TIERED_CACHE_MAX_ENTRIES);
+    - shared=False: memory tier only, for data that already lives in Redis;
+    - key: builds the cache key from the call arguments (default: their repr).
+
+    ``None`` results are never cached. The wrapper exposes ``invalidate()``
+    (whole namespace, every process) and ``cache_clear()`` (this process).
+    """
+
+    def decorator(fn):
+        lru = LocalLRU(
+            maxsize=(
+                maxsize
+                if maxsize is not None
+                else int(getattr(settings, "TIERED_CACHE_MAX_ENTRIES", 256))
+            ),
+            ttl=(
+                local_ttl
+                if local_ttl is not None
+                else float(getattr(settings, "TIERED_CACHE_LOCAL_TTL_SECONDS", 30))
+            ),
+        )
+        _register(namespace, lru)
+        redis_ttl = (
+            ttl
+            if ttl is not None
+            else int(getattr(settings, "TIERED_CACHE_TTL_SECONDS", 300))
+        )
+        prefix = f"{fn.__module__}.{fn.__qualname__}:"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            _ensure_listener()
+            raw_key = prefix + str((key or _default_key)(*args, **kwargs))
+            value = lru.get(raw_key)
+            if value is not _MISSING:
+                return value
+            epoch = lru.epoch
+
+            redis_key = None
+            if shared:
+                try:
+                    digest = hashlib.sha1(raw_key.encode("utf-8")).hexdigest()
+                    redis_key = VALUE_KEY.format(
+                        ns=namespace, gen=_generation(namespace), digest=digest
+                    )
+                    value = cache_get_json(redis_key)
+                    if value is not None:
+                        lru.set(raw_key, value, epoch=epoch)
+                        return value
+                except Exception as e:
+                    logger.warning("tiered cache read %s failed: %s", namespace, e)
+                    redis_key = None
+
+            value = fn(*args, **kwargs)
+            if value is None:
+                return value
+            if redis_key is not None:
+                try:
+                    cache_set_json(redis_key, value, ex=redis_ttl)
+                except Exception as e:
+                    logger.warning("tiered cache write %s failed: %s", namespace, e)
+            lru.set(raw_key, value, epoch=epoch)
+            return value
+
+        wrapper.invalidate = lambda: invalidate(namespace)
+        wrapper.cache_clear = lru.clear
+        wrapper.local = lru
+        return wrapper
+
+    return decorator
+
+
+def tiered_cache_metrics() -> dict:
+    """Per-namespace in-process hit/miss counters and sizes."""
+    with _local_lock:
+        groups = {ns: list(lrus) for ns, lrus in _local.items()}
+    out = {}
+    for ns, lrus in groups.items():
+        hits = sum(l.hits for l in lrus)
+        misses = sum(l.misses for l in lrus)
+        out[ns] = {
+            "entries": sum(len(l) for l in lrus),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+    return out
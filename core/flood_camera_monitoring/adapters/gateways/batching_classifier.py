@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+"""Adapter: micro-batching em processo sobre um FloodClassifierPort.
+
+Frames de várias câmeras são enfileirados e enviados ao classificador em lote
+quando o lote enche ou quando o prazo de latência expira. Quem envia recebe
+futures, então a captura da próxima câmera segue enquanto o modelo roda.
+Se um lote falha, cada frame é reprocessado sozinho, para que um frame ruim
+não derrube as outras câmeras do lote.
+"""
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional, Sequence
+import logging
+import os
+import queue
+import threading
+import time
+
+from core.flood_camera_monitoring.domain.entities import FloodAssessment, ImageInput
+from core.flood_camera_monitoring.domain.repository import FloodClassifierPort
+
+# Sentinela para encerrar a thread de inferência
+_STOP = object()
+
+
+@dataclass
+class MicroBatchingClassifier(FloodClassifierPort):
+    inner: FloodClassifierPort
+    max_batch_size: int = int(os.getenv("FLOOD_MAX_BATCH_SIZE", "16"))
+    # Tempo máximo que o primeiro frame de um lote espera por companhia
+    max_latency_ms: int = int(os.getenv("FLOOD_BATCH_MAX_LATENCY_MS", "50"))
+
+    def __post_init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # Context manager: garante flush/encerramento da thread
+    def __enter__(self) -> "MicroBatchingClassifier":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._closed = False
+            self._thread = threading.Thread(
+                target=self._loop, name="flood-inference-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """Processa o que estiver pendente e encerra a thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+    def submit(self, image: ImageInput) -> "Future[FloodAssessment]":
+        if self._closed:
+            raise RuntimeError("MicroBatchingClassifier is closed")
+        if self._thread is None:
+            self.start()
+        fut: Future = Future()
+        self._queue.put((image, fut))
+        return fut
+
+    def submit_many(
+        self, images: Sequence[ImageInput]
+    ) -> list["Future[FloodAssessment]"]:
+        return [self.submit(img) for img in images]
+
+    def predict(self, image: ImageInput) -> FloodAssessment:
+        return self.submit(image).result()
+
+    def predict_batch(self, images: Sequence[ImageInput]) -> list[FloodAssessment]:
+        return [f.result() for f in self.submit_many(images)]
+
+    # Internal helpers
+    def _loop(self) -> None:
+        size = max(1, int(self.max_batch_size))
+        latency = max(0.0, float(self.max_latency_ms) / 1000.0)
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + latency
+            while len(batch) < size:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stopping = True
+                    break
+                batch.append(nxt)
+            self._flush(batch)
+        # Drena o que sobrou após o sinal de parada
+        leftover = []
+        while True:
+            try:
+                nxt = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is not _STOP:
+                leftover.append(nxt)
+        for start in range(0, len(leftover), size):
+            self._flush(leftover[start : start + size])
+
+    def _flush(self, batch: list) -> None:
+        pending = [
+            (img, fut) for img, fut in batch if fut.set_running_or_notify_cancel()
+        ]
+        if not pending:
+            return
+        try:
+            results = self.inner.predict_batch([img for img, _ in pending])
+        except Exception as e:
+            if len(pending) == 1:
+                logging.getLogger(__name__).warning("Inference failed: %s", e)
+                pending[0][1].set_exception(e)
+                return
+            # Lotes misturam câmeras: isola o frame ruim em vez de falhar todos
+            logging.getLogger(__name__).warning(
+                "Batched inference failed for %d frame(s) (%s); retrying one by one",
+                len(pending),
+                e,
+            )
+            for img, fut in pending:
+                try:
+                    fut.set_result(self.inner.predict_batch([img])[0])
+                except Exception as e1:
+                    fut.set_exception(e1)
+            return
+        for (_, fut), res in zip(pending, results):
+            fut.set_result(res)
@@ -13,6 +13,8 @@ from core.flood_camera_monitoring.domain.repository import VideoStreamPort
 class OpenCVVideoStream(VideoStreamPort):
     url: str
     backend: int = cv2.CAP_FFMPEG
+    # Optional open/read timeout for network streams (FFmpeg backend)
+    timeout_ms: Optional[int] = None
 
     def __post_init__(self) -> None:
         self._loop_mode = False
@@ -37,13 +39,7 @@ class OpenCVVideoStream(VideoStreamPort):
             # Open first available file lazily on first grab
             self._cap = None
         else:
-            self._cap = cv2.VideoCapture(url, self.backend)
-            # Best-effort low latency settings
-            try:
-                self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                self._cap.set(cv2.CAP_PROP_FPS, 10)
-            except Exception:
-                pass
+            self._cap = self._open(url)
 
     def is_open(self) -> bool:
         if self._loop_mode:
@@ -54,6 +50,14 @@ class OpenCVVideoStream(VideoStreamPort):
         return bool(self._cap is not None and self._cap.isOpened())
 
     def grab(self):
+        frame = self.grab_raw()
+        if frame is None:
+            return None
+        # Encode to JPEG bytes to comply with ImageInput (bytes OK)
+        return encode_jpeg(frame)
+
+    def grab_raw(self):
+        """Return the next decoded frame as a BGR numpy array (no JPEG round-trip)."""
         if not self.is_open():
             return None
 
@@ -73,11 +77,7 @@ class OpenCVVideoStream(VideoStreamPort):
             ret, frame = self._cap.read()
             if not ret or frame is None:
                 return None
-        # Encode to JPEG bytes to comply with ImageInput (bytes OK)
-        ok, buf = cv2.imencode(".jpg", frame)
-        if not ok:
-            return None
-        return buf.tobytes()
+        return frame
 
     def close(self) -> None:
         try:
@@ -100,10 +100,48 @@ class OpenCVVideoStream(VideoStreamPort):
         # Advance index and wrap, then open
         self._loop_idx = (self._loop_idx + 1) % len(self._loop_paths)
         path = self._loop_paths[self._loop_idx]
-        cap = cv2.VideoCapture(path, self.backend)
+        self._cap = self._open(path)
+
+    def _open(self, source: str):
+        return open_capture(source, self.backend, self.timeout_ms)
+
+
+def encode_jpeg(frame) -> Optional[bytes]:
+    """Encode a frame to JPEG bytes; bytes input is returned unchanged."""
+    if frame is None or isinstance(frame, (bytes, bytearray)):
+        return frame
+    ok, buf = cv2.imencode(".jpg", frame)
+    if not ok:
+        return None
+    return buf.tobytes()
+
+
+def open_capture(
+    source: str, backend: int = cv2.CAP_FFMPEG, timeout_ms: Optional[int] = None
+):
+    """Open a cv2.VideoCapture with low-latency settings and optional timeouts."""
+    cap = None
+    if timeout_ms:
+        # Bound connect/read so a dead endpoint cannot block the caller
         try:
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            cap.set(cv2.CAP_PROP_FPS, 10)
+            cap = cv2.VideoCapture(
+                source,
+                backend,
+                [
+                    cv2.CAP_PROP_OPEN_TIMEOUT_MSEC,
+                    int(timeout_ms),
+                    cv2.CAP_PROP_READ_TIMEOUT_MSEC,
+                    int(timeout_ms),
+                ],
+            )
         except Exception:
-            pass
-        self._cap = cap
+            cap = None
+    if cap is None:
+        cap = cv2.VideoCapture(source, backend)
+    # Best-effort low latency settings
+    try:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        cap.set(cv2.CAP_PROP_FPS, 10)
+    except Exception:
+        pass
+    return cap
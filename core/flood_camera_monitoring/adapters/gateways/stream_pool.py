@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+"""Adapter: pool de streams mantidos abertos (conexões "quentes").
+
+Cada câmera tem uma thread que mantém o cv2.VideoCapture aberto, descarta
+frames com grab() (sem decodificar) e só decodifica com retrieve() no
+intervalo de amostragem. Os frames amostrados ficam num ring buffer e são
+entregues a um ``sink`` (ex.: publicação no Redis). Falhas reconectam com
+backoff exponencial.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+from core.flood_camera_monitoring.adapters.gateways.opencv_stream_adapter import (
+    open_capture,
+)
+
+FrameSink = Callable[[str, object, float], None]
+
+
+@dataclass
+class _StreamReader:
+    url: str
+    sink: Optional[FrameSink]
+    ring_size: int
+    sample_interval_s: float
+    timeout_ms: int
+    backoff_min_s: float
+    backoff_max_s: float
+    frames: Deque[Tuple[float, object]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.frames = deque(maxlen=max(1, int(self.ring_size)))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"flood-stream-{id(self):x}", daemon=True
+        )
+        self.connected = False
+        self.reconnects = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        logger = logging.getLogger(__name__)
+        backoff = float(self.backoff_min_s)
+        while not self._stop.is_set():
+            cap = open_capture(self.url, timeout_ms=self.timeout_ms)
+            if cap is None or not cap.isOpened():
+                self.connected = False
+                logger.warning(
+                    "Stream pool: could not open %s (retry in %.1fs)", self.url, backoff
+                )
+                self._release(cap)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2.0, float(self.backoff_max_s))
+                self.reconnects += 1
+                continue
+
+            self.connected = True
+            last_sample = 0.0
+            failures = 0
+            try:
+                while not self._stop.is_set():
+                    # grab() advances the stream without decoding the frame
+                    if not cap.grab():
+                        failures += 1
+                        if failures >= 5:
+                            logger.warning(
+                                "Stream pool: lost %s, reconnecting", self.url
+                            )
+                            break
+                        continue
+                    failures = 0
+                    now = time.monotonic()
+                    if now - last_sample < self.sample_interval_s:
+                        continue
+                    ok, frame = cap.retrieve()
+                    if not ok or frame is None:
+                        continue
+                    last_sample = now
+                    # Healthy again: next disconnect starts from the minimum backoff
+                    backoff = float(self.backoff_min_s)
+                    ts = time.time()
+                    self.frames.append((ts, frame))
+                    if self.sink is not None:
+                        try:
+                            self.sink(self.url, frame, ts)
+                        except Exception as e:
+                            logger.debug("Stream pool sink failed: %s", e)
+            finally:
+                self.connected = False
+                self._release(cap)
+            if not self._stop.is_set():
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2.0, float(self.backoff_max_s))
+                self.reconnects += 1
+
+    @staticmethod
+    def _release(cap) -> None:
+        try:
+            if cap is not None:
+                cap.release()
+        except Exception:
+            pass
+
+
+class StreamPool:
+    """Mantém um leitor por URL e sincroniza o conjunto com as câmeras ativas."""
+
+    def __init__(
+        self,
+        sink: Optional[FrameSink] = None,
+        ring_size: int = int(os.getenv("FLOOD_STREAM_POOL_RING", "3")),
+        sample_interval_ms: int = int(
+            os.getenv("FLOOD_STREAM_POOL_SAMPLE_INTERVAL_MS", "1000")
+        ),
+        timeout_ms: int = int(os.getenv("FLOOD_STREAM_POOL_TIMEOUT_MS", "10000")),
+        backoff_min_s: float = float(os.getenv("FLOOD_STREAM_POOL_BACKOFF_MIN", "1")),
+        backoff_max_s: float = float(os.getenv("FLOOD_STREAM_POOL_BACKOFF_MAX", "60")),
+    ) -> None:
+        self.sink = sink
+        self.ring_size = ring_size
+        self.sample_interval_s = max(0.0, float(sample_interval_ms) / 1000.0)
+        self.timeout_ms = timeout_ms
+        self.backoff_min_s = backoff_min_s
+        self.backoff_max_s = backoff_max_s
+        self._readers: Dict[str, _StreamReader] = {}
+        self._lock = threading.Lock()
+
+    def ensure(self, url: str) -> None:
+        with self._lock:
+            if url in self._readers:
+                return
+            reader = _StreamReader(
+                url=url,
+                sink=self.sink,
+                ring_size=self.ring_size,
+                sample_interval_s=self.sample_interval_s,
+                timeout_ms=self.timeout_ms,
+                backoff_min_s=self.backoff_min_s,
+                backoff_max_s=self.backoff_max_s,
+            )
+            self._readers[url] = reader
+            reader.start()
+
+    def release(self, url: str) -> None:
+        with self._lock:
+            reader = self._readers.pop(url, None)
+        if reader is not None:
+            reader.stop()
+
+    def sync(self, urls: Iterable[str]) -> None:
+        """Open readers for new URLs and stop readers no longer wanted."""
+        wanted = {u for u in urls if u}
+        for url in list(self._readers):
+            if url not in wanted:
+                self.release(url)
+        for url in wanted:
+            self.ensure(url)
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "url": url,
+                "connected": bool(r.connected),
+                "frames": len(r.frames),
+                "reconnects": int(r.reconnects),
+            }
+            for url, r in list(self._readers.items())
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            readers = list(self._readers.values())
+            self._readers.clear()
+        for r in readers:
+            r.stop()
+        for r in readers:
+            r.join(timeout=5.0)
@@ -8,15 +8,13 @@ treinado (checkpoint .pth) com a aplicação.
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple, Union
+from typing import Sequence, Tuple, Union
 import os
+import json
 import logging
 
-import io
 import torch
 import torch.nn.functional as F
-import torchvision.transforms as T
-from PIL import Image
 
 from core.flood_camera_monitoring.domain.entities import (
     FloodAssessment,
@@ -25,25 +23,34 @@ from core.flood_camera_monitoring.domain.entities import (
     FloodSeverity,
 )
 from core.flood_camera_monitoring.domain.repository import FloodClassifierPort
-
-
-def _to_pil(image: ImageInput) -> Image.Image:
-    if isinstance(image, (str, Path)):
-        return Image.open(image).convert("RGB")
-    if isinstance(image, (bytes, bytearray)):
-        return Image.open(io.BytesIO(image)).convert("RGB")
-    raise TypeError(f"Unsupported image input type: {type(image)}")
+from core.flood_camera_monitoring.adapters.gateways.preprocessing import (
+    BatchPreprocessor,
+)
 
 
 @dataclass
 class TorchFloodClassifier(FloodClassifierPort):
     checkpoint_path: Union[str, Path]
     device: Union[str, torch.device] = "cpu"
+    # Máximo de imagens por forward pass em predict_batch
+    max_batch_size: int = int(os.getenv("FLOOD_MAX_BATCH_SIZE", "16"))
+    # Backend de inferência: 'eager' (padrão), 'torchscript' ou 'onnx'.
+    # Os dois últimos usam o grafo gerado por `manage.py export_flood_model`.
+    backend: str = os.getenv("FLOOD_MODEL_BACKEND", "eager")
+    # Threads intra-op do torch/onnxruntime (0 = padrão da biblioteca)
+    num_threads: int = int(os.getenv("FLOOD_TORCH_THREADS", "0"))
+    # Quantização int8 opcional: 'dynamic' ou 'static' (requer
+    # `manage.py calibrate_flood_model`). Vazio = usa a flag "quantize" do
+    # checkpoint, se houver.
+    quantize: str = os.getenv("FLOOD_MODEL_QUANTIZE", "")
 
     def __post_init__(self) -> None:
         logger = logging.getLogger(__name__)
         self.device = torch.device(self.device)
         self._fallback = False
+        self.active_backend = "eager"
+        if int(self.num_threads) > 0:
+            torch.set_num_threads(int(self.num_threads))
         ckpt: dict | None = None
         model_from_script: torch.nn.Module | None = None
 
@@ -74,6 +81,14 @@ class TorchFloodClassifier(FloodClassifierPort):
             self._init_fallback_model()
             return
 
+        # Backend otimizado (grafo exportado), se configurado e atualizado
+        backend = str(self.backend or "eager").lower()
+        if backend != "eager" and self._load_exported(path, backend):
+            self.preprocess = BatchPreprocessor(
+                capacity=self.max_batch_size, device=self.device
+            )
+            return
+
         # Tentativas de carregamento
         load_errors: list[str] = []
 
@@ -147,6 +162,7 @@ class TorchFloodClassifier(FloodClassifierPort):
                     path.name,
                     self.class_names,
                 )
+                self._apply_quantization(path, self.quantize or ckpt.get("quantize"))
             except Exception as e:  # pragma: no cover
                 logger.error(
                     "Falha ao reconstruir modelo a partir do checkpoint: %s", e
@@ -162,14 +178,87 @@ class TorchFloodClassifier(FloodClassifierPort):
             self._init_fallback_model()
             return
 
-        self.transform = T.Compose(
-            [
-                T.Resize((224, 224)),
-                T.ToTensor(),
-                T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-            ]
+        self.preprocess = BatchPreprocessor(
+            capacity=self.max_batch_size, device=self.device
+        )
+
+    def _load_exported(self, path: Path, backend: str) -> bool:
+        """Carrega o grafo TorchScript/ONNX exportado do checkpoint ``path``.
+
+        Retorna False (e o chamador segue com o modelo eager) quando o export
+        não existe, é mais antigo que o checkpoint ou falha ao carregar.
+        """
+        from core.flood_camera_monitoring.infra.utils import exported_model_path
+
+        logger = logging.getLogger(__name__)
+        export = exported_model_path(path, backend)
+        meta_path = export.with_name(export.name + ".json")
+        try:
+            if not export.exists():
+                logger.warning(
+                    "Backend '%s' sem export em '%s'; usando eager.", backend, export
+                )
+                return False
+            meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+            if float(meta.get("source_mtime", 0.0)) < path.stat().st_mtime:
+                logger.warning(
+                    "Export '%s' é mais antigo que o checkpoint; usando eager.", export
+                )
+                return False
+            if backend in ("torchscript", "int8"):
+                model = torch.jit.load(str(export), map_location=self.device)
+                model.eval()
+                if backend == "torchscript" and self.device.type == "cpu":
+                    # Fusões conv+bn/MKLDNN: feito no load pois o resultado
+                    # não é serializável
+                    model = torch.jit.optimize_for_inference(model)
+                self.model = model
+            elif backend == "onnx":
+                self.model = _OnnxModel(export, num_threads=int(self.num_threads))
+            else:
+                logger.warning("Backend desconhecido '%s'; usando eager.", backend)
+                return False
+        except Exception as e:
+            logger.warning(
+                "Falha ao carregar export '%s' (%s); usando eager.", export, e
+            )
+            return False
+        self.class_names = meta.get("class_names", ["normal", "flooded"])
+        self.active_backend = backend
+        logger.info("Modelo %s carregado (%s)", backend, export.name)
+        return True
+
+    def _apply_quantization(self, path: Path, mode) -> None:
+        """Troca o modelo float pela versão int8, se solicitado.
+
+        Falhas (export ausente, device não-CPU) mantêm o modelo float.
+        """
+        from core.flood_camera_monitoring.infra.quantization import (
+            normalize_mode,
+            quantize_dynamic,
         )
 
+        logger = logging.getLogger(__name__)
+        mode = normalize_mode(mode)
+        if not mode:
+            return
+        if self.device.type != "cpu":
+            logger.warning("Quantização int8 só é suportada em CPU; ignorando.")
+            return
+        if mode == "static":
+            if not self._load_exported(path, "int8"):
+                logger.warning(
+                    "Modelo int8 estático indisponível; rode "
+                    "`manage.py calibrate_flood_model`. Usando float."
+                )
+            return
+        try:
+            self.model = quantize_dynamic(self.model)
+            self.active_backend = "int8-dynamic"
+            logger.info("Quantização dinâmica int8 aplicada (%s)", path.name)
+        except Exception as e:  # pragma: no cover
+            logger.warning("Falha na quantização dinâmica (%s); usando float.", e)
+
     def _init_fallback_model(self):
         """Inicializa um modelo mínimo para manter a API funcional.
 
@@ -180,6 +269,7 @@ class TorchFloodClassifier(FloodClassifierPort):
 
         logger = logging.getLogger(__name__)
         self._fallback = True
+        self.active_backend = "fallback"
         self.class_names = ["normal", "flooded"]
         self.model = nn.Sequential(nn.Flatten(), nn.Linear(224 * 224 * 3, 2))
         # Inicializa pesos com valores pequenos para evitar NaNs.
@@ -187,28 +277,45 @@ class TorchFloodClassifier(FloodClassifierPort):
             torch.nn.init.constant_(p, 0.0)
         self.model.to(self.device)
         self.model.eval()
-        self.transform = T.Compose(
-            [
-                T.Resize((224, 224)),
-                T.ToTensor(),
-                T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-            ]
+        self.preprocess = BatchPreprocessor(
+            capacity=self.max_batch_size, device=self.device
         )
         logger.warning("Usando modelo fallback simples (checkpoint ausente/corrompido)")
 
     @torch.inference_mode()
     def predict(self, image: ImageInput) -> FloodAssessment:
-        pil = _to_pil(image)
-        x = self.transform(pil).unsqueeze(0).to(self.device)
+        return self.predict_batch([image])[0]
+
+    @torch.inference_mode()
+    def predict_batch(self, images: Sequence[ImageInput]) -> list[FloodAssessment]:
+        """Classifica vários frames com um forward pass por lote.
+
+        Os tensores são empilhados em lotes de até ``max_batch_size`` imagens;
+        o resultado preserva a ordem de entrada.
+        """
+        images = list(images)
+        out: list[FloodAssessment] = []
+        step = max(1, int(self.max_batch_size))
+        for start in range(0, len(images), step):
+            chunk = images[start : start + step]
+            # Decodifica/redimensiona cada frame e normaliza o lote de uma vez
+            x = self.preprocess(chunk)
+            out.extend(self._forward(x))
+        return out
+
+    def _forward(self, x: torch.Tensor) -> list[FloodAssessment]:
         logits = self.model(x)
         if self._fallback:
             # Força distribuição estável indicando modo de contingência
             # (90% normal, 10% flooded / medium inexistente)
-            logits = torch.tensor(
-                [[2.1972246, 0.0]], device=self.device
+            logits = torch.tensor([[2.1972246, 0.0]], device=self.device).expand(
+                x.shape[0], -1
             )  # log(9)=2.1972 aprox
-        probs = F.softmax(logits, dim=1)[0].detach().cpu().numpy()
+        probs = F.softmax(logits, dim=1).detach().cpu().numpy()
+        return [self._to_assessment(row) for row in probs]
 
+    def _to_assessment(self, probs) -> FloodAssessment:
+        """Converte uma linha de probabilidades (softmax) em FloodAssessment."""
         names = [
             str(c).lower() for c in getattr(self, "class_names", ["normal", "flooded"])
         ]
@@ -287,3 +394,29 @@ class TorchFloodClassifier(FloodClassifierPort):
             severity=severity,
             probabilities=probabilities,
         )
+
+
+class _OnnxModel:
+    """Executa um grafo ONNX via onnxruntime com a interface de um nn.Module."""
+
+    def __init__(self, path: Path, num_threads: int = 0) -> None:
+        import onnxruntime as ort  # type: ignore  # dependência opcional
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            opts.intra_op_num_threads = num_threads
+        self._session = ort.InferenceSession(
+            str(path), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self._input = self._session.get_inputs()[0].name
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        outputs = self._session.run(None, {self._input: x.detach().cpu().numpy()})
+        return torch.from_numpy(outputs[0])
+
+    def eval(self) -> "_OnnxModel":
+        return self
+
+    def to(self, *args, **kwargs) -> "_OnnxModel":
+        return self
@@ -1,16 +1,40 @@
+from concurrent.futures import Future
 from dataclasses import dataclass
 import logging
 import os
 import time
-from django.db import transaction
-from django.core.files.base import ContentFile
+from typing import Callable, Optional
+from django.utils import timezone
 
-from core.flood_camera_monitoring.application.dto.predict_response import (
-    PredictResponse,
+from core.flood_camera_monitoring.infra.models import Camera
+from core.flood_camera_monitoring.application.utils.aggregation import (
+    FLOODED,
+    CameraDecision,
+    FrameAggregator,
+    probability_matrix,
+)
+from core.flood_camera_monitoring.application.utils.capture import (
+    FrameCaptureStage,
+)
+from core.flood_camera_monitoring.adapters.gateways.batching_classifier import (
+    MicroBatchingClassifier,
 )
-from core.flood_camera_monitoring.infra.models import Camera, FloodDetectionRecord
 from core.flood_camera_monitoring.adapters.gateways.opencv_stream_adapter import (
-    OpenCVVideoStream,
+    encode_jpeg,
+)
+from core.flood_camera_monitoring.infra.adaptive_sampling import (
+    AdaptiveSampler,
+    SamplingPlan,
+)
+from core.flood_camera_monitoring.infra.detection_writer import DetectionRecordBuffer
+from core.flood_camera_monitoring.infra.frame_gate import (
+    FrameChangeGate,
+    GateReference,
+    thumbnail,
+)
+from core.flood_camera_monitoring.infra.stream_health import (
+    CameraHealth,
+    StreamHealthTracker,
 )
 from core.flood_camera_monitoring.infra.torch_flood_classifier import (
     build_default_classifier,
@@ -31,6 +55,17 @@ class AnalyzeAllCamerasService:
     sample_frames: int = int(os.getenv("FLOOD_SAMPLE_FRAMES", "3"))
     sample_interval_ms: int = int(os.getenv("FLOOD_SAMPLE_INTERVAL_MS", "150"))
     warmup_drops: int = int(os.getenv("FLOOD_WARMUP_DROPS", "2"))
+    # Concurrent capture stage
+    capture_max_workers: int = int(os.getenv("FLOOD_CAPTURE_MAX_WORKERS", "8"))
+    capture_timeout_seconds: float = float(
+        os.getenv("FLOOD_CAPTURE_TIMEOUT_SECONDS", "20")
+    )
+    # Backoff/OFFLINE handling of failing streams (infra.stream_health)
+    track_stream_health: bool = os.getenv("FLOOD_STREAM_HEALTH", "1").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
 
     # Early-warning (medium) configuration
     strong_min: float = float(os.getenv("FLOOD_STRONG_MIN", "60.0"))
@@ -38,6 +73,27 @@ class AnalyzeAllCamerasService:
     medium_max: float = float(os.getenv("FLOOD_MEDIUM_MAX", "60.0"))
     trend_min_delta: float = float(os.getenv("FLOOD_TREND_MIN_DELTA", "10.0"))
     min_medium_frames: int = int(os.getenv("FLOOD_MIN_MEDIUM_FRAMES", "2"))
+    # Per-camera risk tiers (infra.adaptive_sampling): only cameras whose
+    # interval elapsed are captured each tick, with a per-tier frame count
+    adaptive_sampling: bool = os.getenv("FLOOD_ADAPTIVE_SAMPLING", "1").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    # Explicit refresh: sample every camera, not only those due this tick
+    force_sampling: bool = False
+    # Reuse the previous assessment for frames whose scene did not change
+    # (infra.frame_gate); the skip rate is reported in the healthcheck
+    frame_gating: bool = os.getenv("FLOOD_FRAME_GATE", "1").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    # Called with each camera's result as soon as it is ready (e.g. cache)
+    on_result: Optional[Callable[[dict], None]] = None
+    # Called instead of on_result for cameras without a new result this cycle
+    # (NO_FRAME/BACKOFF/OFFLINE/ERROR), so the last good result can be kept
+    on_unavailable: Optional[Callable[[dict], None]] = None
 
     def run(self) -> int:
         """
@@ -54,309 +110,507 @@ class AnalyzeAllCamerasService:
         caching/inspection and `saved` is the number of DB records created.
         """
         logger = logging.getLogger(__name__)
-        saved = 0
+        # Alerts are buffered and inserted with one bulk_create at the end
+        records = DetectionRecordBuffer()
         rows = []  # collect per-câmera resultados para imprimir tabela ao final
         data: list[dict] = []
         clf = build_default_classifier()
 
+        aggregator = FrameAggregator.from_config(self)
+
+        def ready(result: tuple, plan: Optional[SamplingPlan]) -> None:
+            # Each camera is aggregated and published as soon as its
+            # predictions are in, while the other cameras are still captured
+            cam, predictions, chosen_bytes = result
+            decision = aggregator.aggregate(probability_matrix(predictions))
+            item = self._decide(
+                cam, predictions, chosen_bytes, decision, plan, records, rows
+            )
+            if item is not None:
+                data.append(item)
+                self._emit(item)
+
+        # Cameras are captured concurrently and their frames queued into a
+        # micro-batcher as each finishes, so inference overlaps with capture.
+        with MicroBatchingClassifier(clf) as batcher:
+            missing = self._capture_and_submit(batcher, ready)
+
+        saved = records.flush()
+
+        # Cameras without frames (or skipped by backoff) still show up for API
+        # consumers; on_unavailable keeps their last good result when cached
+        for cam, status, extra in missing:
+            data.append(
+                {
+                    "camera": {
+                        "id": str(getattr(cam, "id", "")),
+                        "description": getattr(cam, "description", ""),
+                        "video_hls": getattr(cam, "video_hls", ""),
+                    },
+                    "status": status,
+                    "is_flooded": False,
+                    "medium": False,
+                    "confidence": 0.0,
+                    "probabilities": {"normal": 0.0, "flooded": 0.0, "medium": 0.0},
+                    "meta": {"frames": 0, "note": status.lower(), **extra},
+                }
+            )
+            self._emit(data[-1], self.on_unavailable)
+
+        # Imprime uma tabela de resumo ao final
+        try:
+            table = self._format_table(
+                [
+                    "Câmera",
+                    "Endereço",
+                    "Status",
+                    "Conf(%)",
+                    "Normal(%)",
+                    "Alagado(%)",
+                    "Médio(%)",
+                ],
+                rows,
+                max_widths={"Endereço": 70},
+            )
+            logger.info("Resumo da análise (salvos=%s):\n%s", saved, table)
+        except Exception:
+            logger.exception("Falha ao montar tabela de resumo")
+
+        return data, saved
+
+    def _decide(
+        self,
+        cam,
+        predictions: list,
+        chosen_bytes: Optional[bytes],
+        d: CameraDecision,
+        plan: Optional[SamplingPlan],
+        records: DetectionRecordBuffer,
+        rows: list,
+    ) -> Optional[dict]:
+        """Apply the alert rules to one camera's decision.
+
+        Buffers the alert record (if any), appends the summary table row and
+        returns the structured result for the cache/API (None on error).
+        """
+        logger = logging.getLogger(__name__)
+        assessments = predictions
+        best_flooded = d.best_flooded
+        mean_normal = d.mean_normal
+        mean_flooded = d.mean_flooded
+        mean_medium = d.mean_medium
+        decision_flooded = d.decision_flooded
+        decision_medium = d.decision_medium
+        strong = d.strong
+        rising_trend = d.rising_trend
+        medium_band = d.medium_band
+        medium_frames = d.medium_frames
+        medium_condition = d.medium
+        # Demo loop cameras are analyzed (for the API cache) but never persisted
+        persist = not self._is_demo(cam)
+
+        if strong and persist:
+            records.add(
+                cam,
+                # Business rule: mark as flooded when flooded prob crosses threshold
+                is_flooded=True,
+                medium=False,
+                # Store the flooded probability used for the decision as confidence
+                confidence=decision_flooded,
+                prob_normal=mean_normal,
+                prob_flooded=mean_flooded,
+                prob_medium=mean_medium,
+                # Save the exact frame used for the decision
+                image_bytes=chosen_bytes,
+            )
+            status = "FLOOD_SAVE"
+            logger.info(
+                (
+                    "Camera id=%s result: %s | best_flooded=%.2f | mean_flooded=%.2f | "
+                    "mean_normal=%.2f | mean_medium=%.2f | best_conf=%.2f | frames=%d | threshold=%.2f"
+                ),
+                getattr(cam, "id", None),
+                status,
+                best_flooded,
+                mean_flooded,
+                mean_normal,
+                mean_medium,
+                float(decision_flooded),
+                len(assessments),
+                float(self.strong_min),
+            )
+        elif medium_condition and persist:
+            # Persist early-warning record (medium)
+            records.add(
+                cam,
+                is_flooded=False,
+                medium=True,
+                confidence=decision_flooded,
+                prob_normal=mean_normal,
+                prob_flooded=mean_flooded,
+                prob_medium=mean_medium,
+                image_bytes=chosen_bytes,
+            )
+            status = "MEDIUM_SAVE"
+            logger.info(
+                (
+                    "Camera id=%s result: %s | best_flooded=%.2f | mean_flooded=%.2f | "
+                    "mean_normal=%.2f | mean_medium=%.2f | frames=%d | criteria={band:%s,count:%d,trend:%s}"
+                ),
+                getattr(cam, "id", None),
+                status,
+                best_flooded,
+                mean_flooded,
+                mean_normal,
+                mean_medium,
+                len(assessments),
+                str(medium_band),
+                medium_frames,
+                str(rising_trend),
+            )
+        else:
+            status = "NO_FLOOD" if persist else "DEMO"
+            logger.info(
+                (
+                    "Camera id=%s result: %s | best_flooded=%.2f | mean_flooded=%.2f | "
+                    "mean_normal=%.2f | mean_medium=%.2f | best_conf=%.2f | frames=%d | threshold=%.2f"
+                ),
+                getattr(cam, "id", None),
+                status,
+                best_flooded,
+                mean_flooded,
+                mean_normal,
+                mean_medium,
+                float(decision_flooded),
+                len(assessments),
+                float(self.strong_min),
+            )
+
+        camera_label = f"({getattr(cam, 'description', '')})".strip()
+        # Keep row length aligned with headers below (7 columns)
+        rows.append(
+            (
+                camera_label,
+                getattr(cam, "video_hls", ""),
+                status,
+                f"{float(max(decision_flooded, decision_medium)):.2f}",
+                f"{mean_normal:.2f}",
+                f"{mean_flooded:.2f}",
+                f"{mean_medium:.2f}",
+            )
+        )
+
+        try:
+            return {
+                "camera": {
+                    "id": str(getattr(cam, "id", "")),
+                    "description": getattr(cam, "description", ""),
+                    "video_hls": getattr(cam, "video_hls", ""),
+                },
+                "status": status,
+                "is_flooded": bool(strong),
+                "medium": bool(medium_condition and not strong),
+                "confidence": float(max(decision_flooded, decision_medium)),
+                "probabilities": {
+                    "normal": float(mean_normal),
+                    "flooded": float(mean_flooded),
+                    "medium": float(mean_medium),
+                },
+                "meta": {
+                    "frames": d.frames,
+                    **({"sampling": plan.as_meta()} if plan is not None else {}),
+                    "best_flooded": float(best_flooded),
+                    "decision_flooded": float(decision_flooded),
+                    "trend": {
+                        "series": d.flooded_series,
+                        "rising": bool(rising_trend),
+                    },
+                },
+            }
+        except Exception:
+            # best-effort: ignore data collection errors
+            return None
+
+    def aggregate(self, predictions: list) -> CameraDecision:
+        """Aggregate one camera's frame predictions into the alert decision."""
+        return FrameAggregator.from_config(self).aggregate(
+            probability_matrix(predictions)
+        )
+
+    def _emit(self, item: dict, callback: Optional[Callable] = None) -> None:
+        callback = callback or self.on_result
+        if callback is None:
+            return
+        try:
+            callback(item)
+        except Exception as e:
+            logging.getLogger(__name__).warning(
+                "Result callback failed for camera %s: %s",
+                (item.get("camera") or {}).get("id"),
+                e,
+            )
+
+    @staticmethod
+    def _is_demo(cam) -> bool:
+        stream_url = getattr(cam, "video_hls", None)
+        return isinstance(stream_url, str) and stream_url.startswith("loop:")
+
+    def _capture_and_submit(
+        self,
+        batcher: MicroBatchingClassifier,
+        on_ready: Callable[[tuple, Optional[SamplingPlan]], None],
+    ) -> list:
+        """Capture frames for ACTIVE cameras concurrently and queue them for inference.
+
+        ``on_ready`` is called with (camera, assessments, chosen_jpeg) and the
+        camera's SamplingPlan as soon as that camera's predictions are in.
+        Returns (camera, status, meta) for the cameras that produced no
+        frame, were skipped by the stream-health backoff or whose inference
+        failed (ERROR). Cameras not due under adaptive sampling are left out
+        entirely (their last cached result stays). Raw frames are released
+        as soon as a camera's predictions are in; only the representative
+        (highest flooded) frame is JPEG-encoded.
+        """
+        logger = logging.getLogger(__name__)
+        tracker = StreamHealthTracker() if self.track_stream_health else None
+        targets = []
+        missing = []
         for cam in Camera.objects.filter(status=Camera.CameraStatus.ACTIVE).iterator():
             # Escolhe a URL correta do stream; o campo antigo 'video_url' foi removido.
             stream_url = getattr(cam, "video_hls", None)
-            # Pular câmeras de demonstração (loop) para não persistir registros
-            if isinstance(stream_url, str) and stream_url.startswith("loop:"):
-                logger.info(
-                    "Skipping demo loop camera id=%s for persistence.",
-                    getattr(cam, "id", None),
-                )
-                continue
             if not stream_url:
                 logger.warning(
                     "Camera id=%s não possui 'video_hls' configurado. Pulando.",
                     getattr(cam, "id", None),
                 )
+                missing.append((cam, "NO_FRAME", {}))
                 continue
-            stream = OpenCVVideoStream(stream_url)
-            frames: list[bytes] = []
+            targets.append((cam, stream_url))
+
+        health: dict[str, CameraHealth] = {}
+        if tracker is not None:
+            health = tracker.load(str(cam.id) for cam, _ in targets)
+            now = time.time()
+            due = []
+            for cam, stream_url in targets:
+                h = health[str(cam.id)]
+                if h.offline:
+                    # Set back to ACTIVE by an admin: start over
+                    tracker.forget_offline(h)
+                if tracker.is_due(h, now):
+                    due.append((cam, stream_url))
+                else:
+                    missing.append(
+                        (
+                            cam,
+                            "BACKOFF",
+                            {"failures": h.failures, "next_attempt": h.next_attempt},
+                        )
+                    )
+            targets = due + self._probe_offline(tracker, health)
+
+        plans = {}
+        if self.adaptive_sampling:
+            sampler = AdaptiveSampler()
             try:
-                # Drop a few initial frames to reduce buffering artifacts
-                for _ in range(max(0, int(self.warmup_drops))):
-                    _ = stream.grab()
-                attempts = max(1, int(self.sample_frames))
-                for i in range(attempts):
-                    img_bytes = stream.grab()
-                    if img_bytes:
-                        frames.append(img_bytes)
-                    if i < attempts - 1 and self.sample_interval_ms > 0:
-                        time.sleep(self.sample_interval_ms / 1000.0)
-            except Exception as e:
-                logger.exception(
-                    "Failed to grab frames from camera id=%s: %s",
-                    getattr(cam, "id", None),
-                    e,
+                plans = sampler.plan(
+                    [cam for cam, _ in targets], force=self.force_sampling
                 )
-            finally:
-                stream.close()
+            except Exception as e:
+                logger.warning("Adaptive sampling unavailable (%s); sampling all", e)
+            if plans:
+                targets = [
+                    (cam, url, plans[str(cam.id)].sample_frames)
+                    for cam, url in targets
+                    if plans[str(cam.id)].due
+                ]
+                sampler.mark_sampled(str(cam.id) for cam, _, _ in targets)
+
+        gate = FrameChangeGate() if self.frame_gating else None
+        refs = gate.load(str(cam.id) for cam, *_ in targets) if gate else {}
 
+        stage = FrameCaptureStage(
+            sample_frames=self.sample_frames,
+            sample_interval_ms=self.sample_interval_ms,
+            warmup_drops=self.warmup_drops,
+            max_workers=self.capture_max_workers,
+            timeout_seconds=self.capture_timeout_seconds,
+        )
+        inflight: list[tuple] = []
+
+        def collect(item: tuple) -> None:
+            result = self._collect(item, gate, missing)
+            if result is not None:
+                on_ready(result, plans.get(str(result[0].id)))
+
+        for cam, frames, seconds in stage.run_timed(targets):
+            h = health.get(str(cam.id))
             if not frames:
                 logger.warning(
                     "No frame captured for camera id=%s. Skipping.",
                     getattr(cam, "id", None),
                 )
+                status, extra = "NO_FRAME", {}
+                if tracker is not None and h is not None:
+                    h = tracker.record_failure(h, seconds)
+                    extra = {"failures": h.failures, "next_attempt": h.next_attempt}
+                    if h.offline:
+                        self._take_offline(cam, h)
+                        status = "OFFLINE"
+                missing.append((cam, status, extra))
                 continue
-
-            # Predict for all captured frames and aggregate
-            assessments: list[PredictResponse] = []
-            best_idx = 0
-            best_flooded = -1.0
-            flooded_series: list[float] = []
-            for idx, fb in enumerate(frames):
-                a = clf.predict(fb)
-                assessments.append(a)
-                flooded = float(a.probabilities.flooded)
-                if flooded > best_flooded:
-                    best_flooded = flooded
-                    best_idx = idx
-                flooded_series.append(flooded)
-            # choose representative frame bytes to persist in records/logs
-            chosen_bytes = frames[best_idx] if frames else None
-
-            mean_normal = sum(float(a.probabilities.normal) for a in assessments) / len(
-                assessments
-            )
-            mean_medium = sum(
-                float(getattr(a.probabilities, "medium", 0.0)) for a in assessments
-            ) / len(assessments)
-            mean_flooded = sum(
-                float(a.probabilities.flooded) for a in assessments
-            ) / len(assessments)
-            try:
-                mean_medium = sum(
-                    float(a.probabilities.medium) for a in assessments
-                ) / len(assessments)
-            except Exception:
-                mean_medium = 0.0
-            total = mean_normal + mean_flooded + mean_medium
-            if total > 0:
-                mean_normal = (mean_normal / total) * 100.0
-                mean_flooded = (mean_flooded / total) * 100.0
-                mean_medium = 100.0 - (mean_normal + mean_flooded)
-
-            # Decide triggers
-            decision_flooded = max(best_flooded, mean_flooded)
-            decision_medium = float(mean_medium)
-
-            # Compute early-warning (medium) indicators
-            strong = decision_flooded >= float(self.strong_min)
-            # rising trend if last increases sufficiently from first
-            rising_trend = False
-            if len(flooded_series) >= 2:
-                rising_trend = (flooded_series[-1] - flooded_series[0]) >= float(
-                    self.trend_min_delta
-                )
-            medium_band = (
-                float(self.medium_min) <= mean_flooded < float(self.medium_max)
+            if tracker is not None and h is not None:
+                tracker.record_success(h, seconds)
+            futures, thumbs = self._submit_gated(
+                batcher, gate, refs.get(str(cam.id)), frames
             )
-            medium_frames = sum(
-                1
-                for v in flooded_series
-                if float(self.medium_min) <= v < float(self.strong_min)
-            )
-            medium_condition = (not strong) and (
-                medium_band
-                or medium_frames >= int(self.min_medium_frames)
-                or (rising_trend and flooded_series[-1] >= float(self.medium_min))
+            inflight.append((cam, frames, futures, thumbs))
+            # Finalize cameras whose predictions already arrived (frees frames)
+            still: list[tuple] = []
+            for item in inflight:
+                if all(f.done() for f in item[2]):
+                    collect(item)
+                else:
+                    still.append(item)
+            inflight = still
+        for item in inflight:
+            collect(item)
+        if gate is not None:
+            gate.flush_stats()
+            logger.info(
+                "Frame gate: %d/%d frame(s) reused (skip rate %.1f%%)",
+                gate.skipped,
+                gate.frames,
+                gate.skip_rate * 100.0,
             )
+        return missing
 
-            if strong:
-                # Try creating with image; if fails (e.g., permission), save without image
-                try:
-                    with transaction.atomic():
-                        FloodDetectionRecord.objects.create(
-                            camera=cam,
-                            # Business rule: mark as flooded when flooded prob crosses threshold
-                            is_flooded=True,
-                            medium=False,
-                            # Store the flooded probability used for the decision as confidence
-                            confidence=decision_flooded,
-                            prob_normal=mean_normal,
-                            prob_flooded=mean_flooded,
-                            prob_medium=mean_medium,
-                            # Save the exact frame used for the decision with a unique name
-                            image=(
-                                ContentFile(
-                                    chosen_bytes,
-                                    name=f"{cam.id}-{int(time.time())}.jpg",
-                                )
-                                if chosen_bytes
-                                else None
-                            ),
-                        )
-                except Exception as e:
-                    logger.warning(
-                        "Could not save image for camera id=%s (will save record without image): %s",
-                        getattr(cam, "id", None),
-                        e,
-                    )
-                    with transaction.atomic():
-                        FloodDetectionRecord.objects.create(
-                            camera=cam,
-                            is_flooded=True,
-                            medium=False,
-                            confidence=decision_flooded,
-                            prob_normal=mean_normal,
-                            prob_flooded=mean_flooded,
-                            prob_medium=mean_medium,
-                            image=None,
-                        )
-                saved += 1
-                status = "FLOOD_SAVE"
-                logger.info(
-                    (
-                        "Camera id=%s result: %s | best_flooded=%.2f | mean_flooded=%.2f | "
-                        "mean_normal=%.2f | mean_medium=%.2f | best_conf=%.2f | frames=%d | threshold=%.2f"
-                    ),
-                    getattr(cam, "id", None),
-                    status,
-                    best_flooded,
-                    mean_flooded,
-                    mean_normal,
-                    mean_medium,
-                    float(decision_flooded),
-                    len(assessments),
-                    float(self.strong_min),
-                )
-            elif medium_condition:
-                # Persist early-warning record (medium)
-                try:
-                    with transaction.atomic():
-                        FloodDetectionRecord.objects.create(
-                            camera=cam,
-                            is_flooded=False,
-                            medium=True,
-                            confidence=decision_flooded,
-                            prob_normal=mean_normal,
-                            prob_flooded=mean_flooded,
-                            prob_medium=mean_medium,
-                            image=(
-                                ContentFile(
-                                    chosen_bytes,
-                                    name=f"{cam.id}-{int(time.time())}.jpg",
-                                )
-                                if chosen_bytes
-                                else None
-                            ),
-                        )
-                except Exception as e:
-                    logger.warning(
-                        "Could not save image for camera id=%s (medium, saving without image): %s",
-                        getattr(cam, "id", None),
-                        e,
-                    )
-                    with transaction.atomic():
-                        FloodDetectionRecord.objects.create(
-                            camera=cam,
-                            is_flooded=False,
-                            medium=True,
-                            confidence=decision_flooded,
-                            prob_normal=mean_normal,
-                            prob_flooded=mean_flooded,
-                            prob_medium=mean_medium,
-                            image=None,
-                        )
-                saved += 1
-                status = "MEDIUM_SAVE"
-                logger.info(
-                    (
-                        "Camera id=%s result: %s | best_flooded=%.2f | mean_flooded=%.2f | "
-                        "mean_normal=%.2f | mean_medium=%.2f | frames=%d | criteria={band:%s,count:%d,trend:%s}"
-                    ),
-                    getattr(cam, "id", None),
-                    status,
-                    best_flooded,
-                    mean_flooded,
-                    mean_normal,
-                    mean_medium,
-                    len(assessments),
-                    str(medium_band),
-                    medium_frames,
-                    str(rising_trend),
-                )
+    @staticmethod
+    def _submit_gated(
+        batcher: MicroBatchingClassifier,
+        gate: Optional[FrameChangeGate],
+        ref: Optional[GateReference],
+        frames: list,
+    ) -> tuple[list, list]:
+        """Queue the frames whose scene changed; reuse ``ref`` for the others.
+
+        Returns (futures, thumbs); ``thumbs[i]`` is set only for frames that
+        go through the model, to refresh the camera's reference afterwards.
+        """
+        if gate is None:
+            return batcher.submit_many(frames), [None] * len(frames)
+        futures, thumbs = [], []
+        now = time.time()
+        for frame in frames:
+            thumb = thumbnail(frame)
+            if gate.changed(ref, thumb, now):
+                futures.append(batcher.submit(frame))
+                thumbs.append(thumb)
             else:
-                status = "NO_FLOOD"
-                logger.info(
-                    (
-                        "Camera id=%s result: %s | best_flooded=%.2f | mean_flooded=%.2f | "
-                        "mean_normal=%.2f | mean_medium=%.2f | best_conf=%.2f | frames=%d | threshold=%.2f"
-                    ),
-                    getattr(cam, "id", None),
-                    status,
-                    best_flooded,
-                    mean_flooded,
-                    mean_normal,
-                    mean_medium,
-                    float(decision_flooded),
-                    len(assessments),
-                    float(self.strong_min),
-                )
+                fut: Future = Future()
+                fut.set_result(ref.assessment)
+                futures.append(fut)
+                thumbs.append(None)
+        gate.count(len(frames), sum(1 for t in thumbs if t is None))
+        return futures, thumbs
 
-            camera_label = f"({getattr(cam, 'description', '')})".strip()
-            # Keep row length aligned with headers below (7 columns)
-            rows.append(
-                (
-                    camera_label,
-                    getattr(cam, "video_hls", ""),
-                    status,
-                    f"{float(max(decision_flooded, decision_medium)):.2f}",
-                    f"{mean_normal:.2f}",
-                    f"{mean_flooded:.2f}",
-                    f"{mean_medium:.2f}",
-                )
+    def _probe_offline(
+        self, tracker: StreamHealthTracker, health: dict[str, CameraHealth]
+    ) -> list[tuple]:
+        """Probe cameras taken OFFLINE by the tracker; recovered ones go back to ACTIVE.
+
+        Probes grab a single frame with a short timeout. Returns the recovered
+        (camera, stream_url) pairs so they are analyzed in this same cycle.
+        """
+        logger = logging.getLogger(__name__)
+        probes = tracker.load(tracker.offline_ids())
+        now = time.time()
+        due_ids = [c for c, h in probes.items() if tracker.is_due(h, now)]
+        if not due_ids:
+            return []
+        cams = {str(c.id): c for c in Camera.objects.filter(id__in=due_ids)}
+        items = []
+        for cam_id in due_ids:
+            cam = cams.get(cam_id)
+            if cam is None or cam.status != Camera.CameraStatus.OFFLINE:
+                # Deleted or re-enabled/disabled by an admin meanwhile
+                tracker.forget_offline(probes[cam_id])
+                continue
+            if cam.video_hls:
+                items.append((cam, cam.video_hls))
+        stage = FrameCaptureStage(
+            sample_frames=1,
+            sample_interval_ms=0,
+            warmup_drops=0,
+            max_workers=self.capture_max_workers,
+            timeout_seconds=tracker.probe_timeout_seconds,
+        )
+        recovered = []
+        for cam, frames, seconds in stage.run_timed(items):
+            h = probes[str(cam.id)]
+            if not frames:
+                tracker.record_failure(h, seconds)
+                continue
+            Camera.objects.filter(id=cam.id, status=Camera.CameraStatus.OFFLINE).update(
+                status=Camera.CameraStatus.ACTIVE, updated_at=timezone.now()
             )
+            cam.status = Camera.CameraStatus.ACTIVE
+            health[str(cam.id)] = tracker.record_success(h, seconds)
+            recovered.append((cam, cam.video_hls))
+            logger.info("Camera id=%s stream recovered; back to ACTIVE", cam.id)
+        return recovered
 
-            # Append structured result for this camera
-            try:
-                data.append(
-                    {
-                        "camera": {
-                            "id": str(getattr(cam, "id", "")),
-                            "description": getattr(cam, "description", ""),
-                            "video_hls": getattr(cam, "video_hls", ""),
-                        },
-                        "status": status,
-                        "is_flooded": bool(strong),
-                        "medium": bool(medium_condition and not strong),
-                        "confidence": float(max(decision_flooded, decision_medium)),
-                        "probabilities": {
-                            "normal": float(mean_normal),
-                            "flooded": float(mean_flooded),
-                            "medium": float(mean_medium),
-                        },
-                    }
-                )
-            except Exception:
-                # best-effort: ignore data collection errors
-                pass
+    @staticmethod
+    def _take_offline(cam, health: CameraHealth) -> None:
+        Camera.objects.filter(id=cam.id, status=Camera.CameraStatus.ACTIVE).update(
+            status=Camera.CameraStatus.OFFLINE, updated_at=timezone.now()
+        )
+        logging.getLogger(__name__).warning(
+            "Camera id=%s: %d consecutive capture failures; marked OFFLINE "
+            "(recovery probe at %s)",
+            cam.id,
+            health.failures,
+            time.strftime("%H:%M:%S", time.localtime(health.next_attempt)),
+        )
 
-        # Imprime uma tabela de resumo ao final
+    @classmethod
+    def _collect(
+        cls,
+        item: tuple,
+        gate: Optional[FrameChangeGate],
+        missing: list,
+    ) -> Optional[tuple]:
+        """Finalize one camera; a failure only takes that camera out (ERROR)."""
         try:
-            table = self._format_table(
-                [
-                    "Câmera",
-                    "Endereço",
-                    "Status",
-                    "Conf(%)",
-                    "Normal(%)",
-                    "Alagado(%)",
-                    "Médio(%)",
-                ],
-                rows,
-                max_widths={"Endereço": 70},
+            return cls._finalize(*item, gate=gate)
+        except Exception as e:
+            cam = item[0]
+            logging.getLogger(__name__).warning(
+                "Inference failed for camera id=%s: %s", getattr(cam, "id", None), e
             )
-            logger.info("Resumo da análise (salvos=%s):\n%s", saved, table)
-        except Exception:
-            logger.exception("Falha ao montar tabela de resumo")
+            missing.append((cam, "ERROR", {"error": str(e)[:200]}))
+            return None
 
-        return data, saved
+    @staticmethod
+    def _finalize(
+        cam,
+        frames: list,
+        futures: list,
+        thumbs: Optional[list] = None,
+        gate: Optional[FrameChangeGate] = None,
+    ) -> tuple:
+        predictions = [f.result() for f in futures]
+        if gate is not None and thumbs:
+            # The last classified frame becomes the camera's new reference
+            for thumb, pred in zip(reversed(thumbs), reversed(predictions)):
+                if thumb is not None:
+                    gate.remember(str(cam.id), thumb, pred)
+                    break
+        # Same frame the aggregator picks as best (first highest flooded)
+        best_idx = int(probability_matrix(predictions)[:, FLOODED].argmax())
+        # choose representative frame bytes to persist in records/logs
+        chosen_bytes = encode_jpeg(frames[best_idx]) if frames else None
+        return cam, predictions, chosen_bytes
 
     @staticmethod
     def _format_table(headers, rows, max_widths=None) -> str:
@@ -36,7 +36,7 @@ class DetectFloodFromStream:
                 ):
                     break
 
-                frame = self.stream.grab()
+                frame = self.stream.grab_raw()
                 if frame is not None:
                     assessment = self.classifier.predict(frame)
                     yield PredictResponse(
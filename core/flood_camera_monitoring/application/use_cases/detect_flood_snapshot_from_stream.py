@@ -22,7 +22,7 @@ class DetectFloodSnapshotFromStream:
         deadline = time.time() + float(request.timeout_seconds)
         try:
             while self.stream.is_open() and time.time() < deadline:
-                img = self.stream.grab()
+                img = self.stream.grab_raw()
                 if img is not None:
                     assessment = self.classifier.predict(img)
                     return PredictResponse(
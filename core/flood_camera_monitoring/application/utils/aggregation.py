@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import os
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Column order of the probability matrices (percentages, 0-100)
+NORMAL, FLOODED, MEDIUM = 0, 1, 2
+
+
+def probability_matrix(assessments: Sequence[Any]) -> np.ndarray:
+    """Stack FloodAssessment probabilities into a (frames × 3) float matrix."""
+    out = np.zeros((len(assessments), 3), dtype=np.float64)
+    for i, a in enumerate(assessments):
+        p = a.probabilities
+        out[i, NORMAL] = float(p.normal)
+        out[i, FLOODED] = float(p.flooded)
+        # medium pode não existir em modelos 2-classes; trata como 0.0
+        out[i, MEDIUM] = float(getattr(p, "medium", 0.0) or 0.0)
+    return out
+
+
+@dataclass
+class CameraDecision:
+    """Aggregated decision for one camera over its sampled frames."""
+
+    frames: int
+    best_idx: int
+    best_flooded: float
+    mean_normal: float
+    mean_flooded: float
+    mean_medium: float
+    decision_flooded: float
+    decision_medium: float
+    chosen_confidence: float
+    strong: bool
+    medium: bool
+    medium_band: bool
+    medium_frames: int
+    rising_trend: bool
+    flooded_series: List[float] = field(default_factory=list)
+
+    def probabilities(self) -> Dict[str, float]:
+        return {
+            "normal": self.mean_normal,
+            "flooded": self.mean_flooded,
+            "medium": self.mean_medium,
+        }
+
+
+@dataclass
+class FrameAggregator:
+    """Vectorized per-camera aggregation of frame probabilities.
+
+    ``aggregate_many`` takes one (frames × classes) matrix per camera, pads
+    them into a single (cameras × frames × classes) array and computes means,
+    best frame, trend and the strong/medium criteria for all cameras at once.
+    """
+
+    strong_min: float = float(os.getenv("FLOOD_STRONG_MIN", "60.0"))
+    medium_min: float = float(os.getenv("FLOOD_MEDIUM_MIN", "25.0"))
+    medium_max: float = float(os.getenv("FLOOD_MEDIUM_MAX", "60.0"))
+    trend_min_delta: float = float(os.getenv("FLOOD_TREND_MIN_DELTA", "10.0"))
+    min_medium_frames: int = int(os.getenv("FLOOD_MIN_MEDIUM_FRAMES", "2"))
+
+    @classmethod
+    def from_config(cls, cfg: Any) -> "FrameAggregator":
+        """Build from any object exposing the threshold attributes."""
+        return cls(
+            strong_min=float(cfg.strong_min),
+            medium_min=float(cfg.medium_min),
+            medium_max=float(cfg.medium_max),
+            trend_min_delta=float(cfg.trend_min_delta),
+            min_medium_frames=int(cfg.min_medium_frames),
+        )
+
+    def aggregate(self, probs: np.ndarray) -> CameraDecision:
+        return self.aggregate_many([probs])[0]
+
+    def aggregate_many(self, matrices: Sequence[np.ndarray]) -> List[CameraDecision]:
+        if not matrices:
+            return []
+        counts = np.array([len(m) for m in matrices], dtype=np.int64)
+        if (counts <= 0).any():
+            raise ValueError("every camera needs at least one frame to aggregate")
+        n_cams, n_frames = len(matrices), int(counts.max())
+        probs = np.zeros((n_cams, n_frames, 3), dtype=np.float64)
+        for i, m in enumerate(matrices):
+            m = np.asarray(m, dtype=np.float64)
+            probs[i, : len(m), : m.shape[1]] = m[:, :3]
+        mask = np.arange(n_frames)[None, :] < counts[:, None]
+        rows = np.arange(n_cams)
+
+        flooded = probs[:, :, FLOODED]
+        # Padding never wins argmax; ties keep the first frame
+        best_idx = np.where(mask, flooded, -np.inf).argmax(axis=1)
+        best_flooded = flooded[rows, best_idx]
+        best_normal = probs[rows, best_idx, NORMAL]
+
+        means = probs.sum(axis=1) / counts[:, None]
+        total = means.sum(axis=1)
+        scaled = means * (100.0 / np.where(total > 0, total, 1.0))[:, None]
+        mean_normal = np.where(total > 0, scaled[:, NORMAL], means[:, NORMAL])
+        mean_flooded = np.where(total > 0, scaled[:, FLOODED], means[:, FLOODED])
+        mean_medium = np.where(
+            total > 0, 100.0 - (mean_normal + mean_flooded), means[:, MEDIUM]
+        )
+
+        decision_flooded = np.maximum(best_flooded, mean_flooded)
+        chosen_conf = np.where(
+            decision_flooded == mean_flooded,
+            mean_flooded,
+            np.maximum(best_flooded, best_normal),
+        )
+        strong = decision_flooded >= self.strong_min
+
+        first = flooded[:, 0]
+        last = flooded[rows, counts - 1]
+        rising = (counts >= 2) & ((last - first) >= self.trend_min_delta)
+        medium_band = (self.medium_min <= mean_flooded) & (
+            mean_flooded < self.medium_max
+        )
+        in_band = mask & (self.medium_min <= flooded) & (flooded < self.strong_min)
+        medium_frames = in_band.sum(axis=1)
+        medium = ~strong & (
+            medium_band
+            | (medium_frames >= self.min_medium_frames)
+            | (rising & (last >= self.medium_min))
+        )
+
+        return [
+            CameraDecision(
+                frames=int(counts[i]),
+                best_idx=int(best_idx[i]),
+                best_flooded=float(best_flooded[i]),
+                mean_normal=float(mean_normal[i]),
+                mean_flooded=float(mean_flooded[i]),
+                mean_medium=float(mean_medium[i]),
+                decision_flooded=float(decision_flooded[i]),
+                decision_medium=float(mean_medium[i]),
+                chosen_confidence=float(chosen_conf[i]),
+                strong=bool(strong[i]),
+                medium=bool(medium[i]),
+                medium_band=bool(medium_band[i]),
+                medium_frames=int(medium_frames[i]),
+                rising_trend=bool(rising[i]),
+                flooded_series=flooded[i, : counts[i]].tolist(),
+            )
+            for i in range(n_cams)
+        ]
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import logging
+import os
+import time
+from typing import Hashable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from core.flood_camera_monitoring.adapters.gateways.opencv_stream_adapter import (
+    OpenCVVideoStream,
+)
+from core.flood_camera_monitoring.domain.entities import ImageInput
+from core.flood_camera_monitoring.infra.frame_store import RedisFrameStore
+
+K = TypeVar("K", bound=Hashable)
+
+
+@dataclass
+class FrameCaptureStage:
+    """Capture a few frames from many camera streams concurrently.
+
+    Each camera is captured in a bounded thread pool (``max_workers``) and
+    gets ``timeout_seconds`` to deliver its frames; results are yielded as
+    soon as each camera finishes, so classification can start right away
+    instead of waiting for the slowest stream.
+    """
+
+    sample_frames: int = int(os.getenv("FLOOD_SAMPLE_FRAMES", "3"))
+    sample_interval_ms: int = int(os.getenv("FLOOD_SAMPLE_INTERVAL_MS", "150"))
+    warmup_drops: int = int(os.getenv("FLOOD_WARMUP_DROPS", "2"))
+    max_workers: int = int(os.getenv("FLOOD_CAPTURE_MAX_WORKERS", "8"))
+    timeout_seconds: float = float(os.getenv("FLOOD_CAPTURE_TIMEOUT_SECONDS", "20"))
+    # Read warm frames published by `manage.py run_stream_pool` when fresh
+    use_stream_pool: bool = os.getenv("FLOOD_STREAM_POOL", "0").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    stream_pool_max_age_seconds: float = float(
+        os.getenv("FLOOD_STREAM_POOL_MAX_AGE_SECONDS", "10")
+    )
+
+    def capture(
+        self, stream_url: str, sample_frames: Optional[int] = None
+    ) -> list[ImageInput]:
+        """Capture frames from a single stream, honoring the per-camera timeout.
+
+        ``sample_frames`` overrides the stage default for this camera. With
+        the stream pool enabled, fresh frames already published for the
+        stream are returned instantly and no connection is opened.
+        """
+        return self._warm_frames(stream_url, sample_frames) or self._grab(
+            stream_url, sample_frames
+        )
+
+    def _attempts(self, sample_frames: Optional[int]) -> int:
+        return max(
+            1, int(self.sample_frames if sample_frames is None else sample_frames)
+        )
+
+    def _warm_frames(
+        self, stream_url: str, sample_frames: Optional[int] = None
+    ) -> list[ImageInput]:
+        """Fresh frames published by the stream pool for ``stream_url``, if any."""
+        if not self.use_stream_pool:
+            return []
+        return RedisFrameStore().recent(
+            stream_url,
+            self._attempts(sample_frames),
+            self.stream_pool_max_age_seconds,
+        )
+
+    def _grab(
+        self, stream_url: str, sample_frames: Optional[int] = None
+    ) -> list[ImageInput]:
+        """Open the stream and read frames from it."""
+        logger = logging.getLogger(__name__)
+        attempts = self._attempts(sample_frames)
+        deadline = time.monotonic() + float(self.timeout_seconds)
+        stream = OpenCVVideoStream(
+            stream_url, timeout_ms=int(float(self.timeout_seconds) * 1000)
+        )
+        frames: list[ImageInput] = []
+        try:
+            # Drop a few initial frames to reduce buffering artifacts
+            for _ in range(max(0, int(self.warmup_drops))):
+                if time.monotonic() >= deadline:
+                    break
+                _ = stream.grab_raw()
+            for i in range(attempts):
+                if time.monotonic() >= deadline:
+                    logger.warning(
+                        "Capture timeout for %s after %d frame(s)", stream_url, i
+                    )
+                    break
+                # Raw BGR frame: JPEG encoding only happens for persisted evidence
+                frame = stream.grab_raw()
+                if frame is not None:
+                    frames.append(frame)
+                if i < attempts - 1 and self.sample_interval_ms > 0:
+                    time.sleep(self.sample_interval_ms / 1000.0)
+        except Exception as e:
+            logger.exception("Failed to grab frames from %s: %s", stream_url, e)
+        finally:
+            stream.close()
+        return frames
+
+    def run(
+        self, items: Iterable[Tuple[K, str]]
+    ) -> Iterator[Tuple[K, list[ImageInput]]]:
+        """Capture all (key, stream_url) items, yielding (key, frames) as they finish.
+
+        Cameras that exceed the timeout (e.g. a read blocked inside OpenCV)
+        are yielded with an empty frame list; their threads are abandoned.
+        """
+        for key, frames, _ in self.run_timed(items):
+            yield key, frames
+
+    def _timed_capture(
+        self, stream_url: str, sample_frames: Optional[int] = None
+    ) -> Tuple[list[ImageInput], Optional[float]]:
+        warm = self._warm_frames(stream_url, sample_frames)
+        if warm:
+            # Nothing was read from the stream: no latency to report
+            return warm, None
+        t0 = time.perf_counter()
+        frames = self._grab(stream_url, sample_frames)
+        return frames, time.perf_counter() - t0
+
+    def run_timed(
+        self, items: Iterable[tuple]
+    ) -> Iterator[Tuple[K, list[ImageInput], Optional[float]]]:
+        """Like run(), also yielding each camera's capture time in seconds.
+
+        Items may carry a third element, that camera's frame count. The time
+        is None for frames served by the stream pool (no stream was read).
+        """
+        logger = logging.getLogger(__name__)
+        items = list(items)
+        if not items:
+            return
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(int(self.max_workers), len(items))),
+            thread_name_prefix="flood-capture",
+        )
+        # Small grace over the per-camera timeout to let capture() return itself
+        grace = float(self.timeout_seconds) + 5.0
+        pending: dict[Future, K] = {}
+        started: dict[Future, float] = {}
+        try:
+            for key, url, *frames in items:
+                fut = executor.submit(self._timed_capture, url, *frames[:1])
+                pending[fut] = key
+            while pending:
+                done, _ = wait(list(pending), timeout=1.0, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for fut in done:
+                    key = pending.pop(fut)
+                    try:
+                        frames, seconds = fut.result()
+                    except Exception as e:  # pragma: no cover - capture() catches
+                        logger.warning("Capture failed for %s: %s", key, e)
+                        frames, seconds = [], now - started.get(fut, now)
+                    started.pop(fut, None)
+                    yield key, frames, seconds
+                for fut in list(pending):
+                    # Timeout counts from when the capture actually started
+                    if fut.running():
+                        started.setdefault(fut, now)
+                    t0 = started.get(fut)
+                    if t0 is not None and now - t0 > grace:
+                        key = pending.pop(fut)
+                        started.pop(fut, None)
+                        logger.warning("Abandoning stuck capture for %s", key)
+                        yield key, [], now - t0
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
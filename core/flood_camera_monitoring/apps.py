@@ -1,3 +1,7 @@
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
 
 
@@ -13,3 +17,56 @@ class FloodCameraMonitoringConfig(AppConfig):
             from .infra import models  # noqa: F401
         except Exception:
             pass
+
+        # Cached predictions use CACHE_CODEC: say so when its package is missing
+        try:
+            from core.common.cache import warn_missing_codecs
+
+            warn_missing_codecs()
+        except Exception:
+            pass
+
+        # Celery workers: load the classifier once per child process on boot
+        try:
+            from celery.signals import worker_process_init
+
+            worker_process_init.connect(_warm_classifier_on_worker_boot, weak=False)
+        except Exception:
+            pass
+
+        # worker_process_init only fires in prefork children: a solo (or
+        # threads/gevent/eventlet) worker runs tasks in this very process.
+        # Web workers (gunicorn) opt in, so management commands stay fast.
+        # Warm in background to not delay the worker accepting requests.
+        if _is_inline_celery_worker(sys.argv) or os.getenv(
+            "FLOOD_MODEL_WARMUP", "0"
+        ).lower() in ("1", "true", "yes"):
+            threading.Thread(
+                target=_warm_classifier, name="flood-model-warmup", daemon=True
+            ).start()
+
+
+def _warm_classifier() -> None:
+    from .infra.torch_flood_classifier import warm_default_classifier
+
+    warm_default_classifier()
+
+
+def _warm_classifier_on_worker_boot(**kwargs) -> None:
+    _warm_classifier()
+
+
+def _is_inline_celery_worker(argv: list) -> bool:
+    """True for a ``celery worker`` whose pool runs tasks in the main process."""
+    args = [str(a) for a in argv]
+    if "worker" not in args or not any("celery" in a for a in args[:3]):
+        return False
+    pool = "prefork"
+    for i, arg in enumerate(args):
+        if arg in ("-P", "--pool") and i + 1 < len(args):
+            pool = args[i + 1]
+        elif arg.startswith("--pool="):
+            pool = arg.split("=", 1)[1]
+        elif arg.startswith("-P") and len(arg) > 2:
+            pool = arg[2:]
+    return pool.lower() in ("solo", "threads", "gevent", "eventlet")
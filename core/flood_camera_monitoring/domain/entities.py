@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Union
+from typing import TYPE_CHECKING, Union
 from pathlib import Path
 from enum import Enum
 
@@ -77,5 +77,9 @@ class FloodAssessment:
     probabilities: FloodProbabilities
 
 
-# Tipo de entrada de imagem aceito no domínio sem depender de PIL
-ImageInput = Union[bytes, str, Path]
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+
+# Tipo de entrada de imagem aceito no domínio sem depender de PIL.
+# Frames crus de vídeo chegam como numpy.ndarray HxWx3 (BGR, uint8).
+ImageInput = Union[bytes, str, Path, "numpy.ndarray"]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Sequence
 
 from core.flood_camera_monitoring.domain.entities import (
     Camera,
@@ -41,6 +41,14 @@ class FloodClassifierPort(ABC):
     def predict(self, image: ImageInput) -> FloodAssessment:
         raise NotImplementedError
 
+    def predict_batch(self, images: Sequence[ImageInput]) -> list[FloodAssessment]:
+        """Classifica vários frames de uma vez, preservando a ordem de entrada.
+
+        Implementação padrão chama predict() por imagem; adaptadores que
+        suportam inferência em lote devem sobrescrever.
+        """
+        return [self.predict(image) for image in images]
+
 
 class VideoStreamPort(ABC):
     """Porta de domínio para leitura de frames de uma stream de vídeo."""
@@ -53,6 +61,14 @@ class VideoStreamPort(ABC):
         """
         raise NotImplementedError
 
+    def grab_raw(self) -> ImageInput | None:
+        """Captura o frame atual sem recodificar (ex.: numpy BGR do OpenCV).
+
+        Implementação padrão devolve grab(); adaptadores que leem frames
+        decodificados devem sobrescrever para evitar o ciclo JPEG.
+        """
+        return self.grab()
+
     @abstractmethod
     def is_open(self) -> bool:
         raise NotImplementedError
@@ -0,0 +1,244 @@
+"""Risk-adaptive sampling: how often and how many frames per camera.
+
+The beat ticks every ``FLOOD_SCHEDULER_TICK_SECONDS`` (60s by default) and
+each tick only captures the cameras whose interval has elapsed. Cameras get
+one of four risk tiers:
+
+- ``high``: a flooded record in the last ``recent_hours``, an active
+  Flood_Point_Register with ``possibility >= point_high`` in its neighborhood,
+  or a nearby forecast with ``probability >= forecast_high``;
+- ``elevated``: a medium record in the last ``recent_hours``, any other active
+  flood point in the neighborhood, or a forecast ``>= forecast_elevated``;
+- ``calm``: no record at all in the last ``calm_hours`` and no other signal;
+- ``normal``: everything else.
+
+Intervals (seconds) and frame counts per tier come from
+``FLOOD_SAMPLING_INTERVALS`` / ``FLOOD_SAMPLING_FRAMES`` (high, elevated,
+normal, calm). The last sampling time of each camera is kept in the Redis hash
+``flood:cam:sampled``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+import logging
+import math
+import os
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from core.common.cache import get_redis
+from core.flood_camera_monitoring.infra.models import FloodDetectionRecord
+
+SAMPLED_KEY = "flood:cam:sampled"
+TIERS = ("high", "elevated", "normal", "calm")
+
+
+def _per_tier(env: str, default: str, cast) -> dict[str, float]:
+    values = [cast(v) for v in os.getenv(env, default).split(",") if v.strip()]
+    fallback = [cast(v) for v in default.split(",")]
+    values = (values + fallback[len(values) :])[: len(TIERS)]
+    return dict(zip(TIERS, values))
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    """Distance (km) from one point to arrays of points."""
+    lat1, lon1 = math.radians(lat1), math.radians(lon1)
+    lat2, lon2 = np.radians(lat2), np.radians(lon2)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+
+@dataclass
+class SamplingPlan:
+    camera_id: str
+    tier: str
+    interval_seconds: float
+    sample_frames: int
+    reasons: list[str] = field(default_factory=list)
+    due: bool = True
+
+    def as_meta(self) -> dict:
+        return {
+            "tier": self.tier,
+            "interval_seconds": self.interval_seconds,
+            "frames": self.sample_frames,
+            "reasons": self.reasons,
+        }
+
+
+@dataclass
+class AdaptiveSampler:
+    """Assign each camera a risk tier and decide whether it is due this tick."""
+
+    intervals: dict = field(
+        default_factory=lambda: _per_tier(
+            "FLOOD_SAMPLING_INTERVALS", "60,150,300,900", float
+        )
+    )
+    frames: dict = field(
+        default_factory=lambda: _per_tier("FLOOD_SAMPLING_FRAMES", "6,4,3,2", int)
+    )
+    tick_seconds: float = float(os.getenv("FLOOD_SCHEDULER_TICK_SECONDS", "60"))
+    recent_hours: float = float(os.getenv("FLOOD_RISK_RECENT_HOURS", "6"))
+    calm_hours: float = float(os.getenv("FLOOD_RISK_CALM_HOURS", "24"))
+    point_high: float = float(os.getenv("FLOOD_RISK_POINT_HIGH", "0.5"))
+    forecast_high: float = float(os.getenv("FLOOD_RISK_FORECAST_HIGH", "0.7"))
+    forecast_elevated: float = float(os.getenv("FLOOD_RISK_FORECAST_ELEVATED", "0.4"))
+    forecast_radius_km: float = float(os.getenv("FLOOD_RISK_FORECAST_RADIUS_KM", "10"))
+    forecast_days: int = int(os.getenv("FLOOD_RISK_FORECAST_DAYS", "1"))
+
+    def plan(
+        self, cameras: Iterable, now: Optional[float] = None, force: bool = False
+    ) -> dict:
+        """SamplingPlan per camera id (``due`` says whether to sample this tick).
+
+        ``force`` (an explicit refresh) makes every camera due; tiers and frame
+        counts still apply.
+        """
+        cameras = list(cameras)
+        now = now if now is not None else time.time()
+        if not cameras:
+            return {}
+        records = self._record_signals([c.id for c in cameras])
+        points = self._flood_point_signals(
+            {c.neighborhood_id for c in cameras if c.neighborhood_id}
+        )
+        forecasts = self._forecast_signals(cameras)
+        last = self._last_sampled([str(c.id) for c in cameras])
+
+        plans = {}
+        for cam in cameras:
+            cam_id = str(cam.id)
+            high, elevated = [], []
+            rec = records.get(cam_id) or {}
+            if rec.get("flooded"):
+                high.append("recent-flooded")
+            elif rec.get("medium"):
+                elevated.append("recent-medium")
+            possibility = points.get(cam.neighborhood_id)
+            if possibility is not None:
+                (high if possibility >= self.point_high else elevated).append(
+                    "flood-point"
+                )
+            prob = forecasts.get(cam_id)
+            if prob is not None and prob >= self.forecast_high:
+                high.append("forecast")
+            elif prob is not None and prob >= self.forecast_elevated:
+                elevated.append("forecast")
+
+            if high:
+                tier, reasons = "high", high + elevated
+            elif elevated:
+                tier, reasons = "elevated", elevated
+            elif not rec.get("total"):
+                tier, reasons = "calm", []
+            else:
+                tier, reasons = "normal", []
+            interval = float(self.intervals[tier])
+            last_ts = last.get(cam_id)
+            # Half a tick of slack so jitter in the beat does not skip a turn
+            due = (
+                force
+                or last_ts is None
+                or now - last_ts >= interval - self.tick_seconds / 2
+            )
+            plans[cam_id] = SamplingPlan(
+                camera_id=cam_id,
+                tier=tier,
+                interval_seconds=interval,
+                sample_frames=max(1, int(self.frames[tier])),
+                reasons=reasons,
+                due=due,
+            )
+        return plans
+
+    def mark_sampled(self, camera_ids: Iterable[str], now: Optional[float] = None):
+        ids = [str(c) for c in camera_ids]
+        if not ids:
+            return
+        ts = now if now is not None else time.time()
+        try:
+            get_redis().hset(SAMPLED_KEY, mapping={c: ts for c in ids})
+        except Exception as e:
+            logging.getLogger(__name__).warning("Could not store sampling times: %s", e)
+
+    def _last_sampled(self, ids: list[str]) -> dict[str, float]:
+        try:
+            values = get_redis().hmget(SAMPLED_KEY, ids)
+        except Exception:
+            # Without Redis every camera is due (fixed-rate behavior)
+            return {}
+        out = {}
+        for cam_id, raw in zip(ids, values):
+            try:
+                out[cam_id] = float(raw)
+            except (TypeError, ValueError):
+                continue
+        return out
+
+    def _record_signals(self, camera_ids: list) -> dict[str, dict]:
+        now = timezone.now()
+        recent = now - timedelta(hours=self.recent_hours)
+        rows = (
+            FloodDetectionRecord.objects.filter(
+                camera_id__in=camera_ids,
+                created_at__gte=now
+                - timedelta(hours=max(self.calm_hours, self.recent_hours)),
+            )
+            .values("camera_id")
+            .annotate(
+                total=Count("id"),
+                flooded=Count("id", filter=Q(is_flooded=True, created_at__gte=recent)),
+                medium=Count("id", filter=Q(medium=True, created_at__gte=recent)),
+            )
+        )
+        return {str(r["camera_id"]): r for r in rows}
+
+    @staticmethod
+    def _flood_point_signals(neighborhood_ids: set) -> dict:
+        if not neighborhood_ids:
+            return {}
+        from core.flood_point_registering.infra.models import Flood_Point_Register
+
+        rows = (
+            Flood_Point_Register.objects.active()
+            .filter(neighborhood_id__in=neighborhood_ids)
+            .values("neighborhood_id")
+            .annotate(possibility=Max("possibility"))
+        )
+        return {r["neighborhood_id"]: float(r["possibility"] or 0.0) for r in rows}
+
+    def _forecast_signals(self, cameras: list) -> dict[str, float]:
+        """Highest forecast probability within the radius of each camera."""
+        from core.forecast.infra.models import Forecast
+
+        located = [
+            c for c in cameras if c.latitude is not None and c.longitude is not None
+        ]
+        if not located:
+            return {}
+        today = timezone.localdate()
+        rows = list(
+            Forecast.objects.filter(
+                date__gte=today, date__lte=today + timedelta(days=self.forecast_days)
+            ).values_list("latitude", "longitude", "probability")
+        )
+        if not rows:
+            return {}
+        grid = np.asarray(rows, dtype=np.float64)
+        out = {}
+        for cam in located:
+            dist = _haversine_km(cam.latitude, cam.longitude, grid[:, 0], grid[:, 1])
+            near = grid[dist <= self.forecast_radius_km, 2]
+            if len(near):
+                out[str(cam.id)] = float(near.max())
+        return out
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+"""Cache compartilhado do resultado de ``GET /predict/all``.
+
+Cada câmera tem um hash ``flood:cam:<id>`` (JSON do resultado + campos
+numéricos), atualizado assim que a câmera é processada no ciclo agendado, e
+entra em índices ``flood:cam:index:<campo>`` (sorted sets por confiança,
+probabilidades e descrição) usados pela API para ordenar e paginar com
+ZRANGE. ``flood:predict_all:meta`` guarda o ``ts`` do último ciclo completo.
+Cada ciclo renova o TTL dos hashes das câmeras mantidas (mesmo as não
+reamostradas), e membros de índice cujo hash sumiu são removidos na leitura.
+
+Com amostragem adaptativa um ciclo só reamostra parte das câmeras, então a
+idade exposta pela API é a da câmera mais antiga (índice ``ts``). Cada câmera
+também tem um prazo, ``due`` = ``ts`` + max(``PREDICT_CACHE_STALE_SECONDS``,
+intervalo de amostragem + tick do beat). O cache fica stale quando alguma
+câmera passa do prazo.
+
+A leitura segue stale-while-revalidate: após ``PREDICT_CACHE_STALE_SECONDS``
+os dados continuam sendo servidos (com sua idade) enquanto no máximo um
+refresh em background é enfileirado.
+
+As leituras (metadados, contagem e páginas) também ficam numa LRU em memória
+de cada processo (``core.common.tiered_cache``, só o tier local: os dados já
+estão no Redis), invalidada por pub/sub a cada câmera gravada e a cada ciclo.
+"""
+
+import logging
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+
+from core.common.cache import decode_value, encode_value, get_redis, now_ts
+from core.common.tiered_cache import invalidate, tiered_cache
+
+# Legado: blob JSON único, removido ao publicar o primeiro ciclo por câmera
+PREDICT_ALL_KEY = "flood:predict_all"
+META_KEY = "flood:predict_all:meta"
+CAMERA_KEY = "flood:cam:{id}"
+INDEX_KEY = "flood:cam:index:{field}"
+# Marca "refresh já enfileirado" (SET NX); removida ao fim do ciclo
+REFRESH_LOCK_KEY = "flood:predict_all:refresh"
+# Namespace das leituras memorizadas em processo (tiered_cache)
+CACHE_NAMESPACE = "predict_all"
+
+# ordering -> score extraído do resultado (sorted sets numéricos)
+SCORE_FIELDS = {
+    "confidence": lambda it: float(it.get("confidence", 0.0)),
+    "is_flooded": lambda it: 1.0 if it.get("is_flooded") else 0.0,
+    "normal": lambda it: float((it.get("probabilities") or {}).get("normal", 0.0)),
+    "flooded": lambda it: float((it.get("probabilities") or {}).get("flooded", 0.0)),
+    "medium": lambda it: float((it.get("probabilities") or {}).get("medium", 0.0)),
+}
+# Índice lexicográfico (score 0, ordem pelo membro "<descrição>\x1f<id>")
+LEX_FIELD = "description"
+ORDER_FIELDS = (LEX_FIELD, *SCORE_FIELDS)
+# Índices de frescor (não são campos de ordenação): amostragem e prazo
+FRESHNESS_FIELDS = ("ts", "due")
+_SEP = "\x1f"
+
+
+def predict_all_ttl() -> int:
+    """Hard expiry: how long a stale payload may still be served."""
+    return int(getattr(settings, "PREDICT_CACHE_TTL_SECONDS", 86400))
+
+
+def predict_all_stale_after() -> int:
+    """Soft expiry: age after which a background refresh is requested."""
+    return int(getattr(settings, "PREDICT_CACHE_STALE_SECONDS", 360))
+
+
+def predict_all_age(payload: Optional[dict]) -> Optional[float]:
+    """Age of the oldest camera result (of the last cycle, for legacy data)."""
+    try:
+        ts = payload.get("oldest_ts") or payload["ts"]
+        return max(0.0, now_ts() - float(ts))
+    except Exception:
+        return None
+
+
+def predict_all_is_stale(payload: Optional[dict]) -> bool:
+    """True when some camera is past its due time (or nothing is cached)."""
+    if not payload:
+        return True
+    due = payload.get("due")
+    if due is not None:
+        return now_ts() >= float(due)
+    age = predict_all_age(payload)
+    return age is None or age > predict_all_stale_after()
+
+
+def _due_ts(item: dict, ts: float) -> float:
+    """When this camera's result should have been replaced by a new sample."""
+    sampling = (item.get("meta") or {}).get("sampling") or {}
+    interval = float(sampling.get("interval_seconds") or 0.0)
+    tick = float(getattr(settings, "FLOOD_SCHEDULER_TICK_SECONDS", 60))
+    return ts + max(
+        float(predict_all_stale_after()), interval + tick if interval else 0.0
+    )
+
+
+def _camera_id(item: dict) -> str:
+    return str((item.get("camera") or {}).get("id") or "")
+
+
+def _lex_member(item: dict) -> str:
+    desc = str((item.get("camera") or {}).get("description") or "").lower()
+    return f"{desc}{_SEP}{_camera_id(item)}"
+
+
+def write_camera_result(item: dict, r=None) -> None:
+    """Publish one camera's result: hash + every ordering index, atomically."""
+    cam_id = _camera_id(item)
+    if not cam_id:
+        return
+    r = r or get_redis()
+    key = CAMERA_KEY.format(id=cam_id)
+    ttl = predict_all_ttl()
+    lex = _lex_member(item)
+    old_lex = r.hget(key, "lex")
+    ts = now_ts()
+    scores = {f: fn(item) for f, fn in SCORE_FIELDS.items()}
+    freshness = {"ts": ts, "due": _due_ts(item, ts)}
+    pipe = r.pipeline(transaction=True)
+    pipe.hset(
+        key,
+        mapping={"data": encode_value(item), "lex": lex, **scores, **freshness},
+    )
+    pipe.expire(key, ttl)
+    for field, score in {**scores, **freshness}.items():
+        pipe.zadd(INDEX_KEY.format(field=field), {cam_id: score})
+        pipe.expire(INDEX_KEY.format(field=field), ttl)
+    lex_key = INDEX_KEY.format(field=LEX_FIELD)
+    if old_lex and old_lex != lex:
+        # Descrição mudou: remove o membro antigo do índice lexicográfico
+        pipe.zrem(lex_key, old_lex)
+    pipe.zadd(lex_key, {lex: 0})
+    pipe.expire(lex_key, ttl)
+    invalidate(CACHE_NAMESPACE, pipe=pipe)
+    pipe.execute()
+
+
+def mark_camera_unavailable(item: dict, r=None) -> None:
+    """Record why a camera has no new result without discarding its last one.
+
+    For NO_FRAME/BACKOFF/OFFLINE/ERROR cameras: an existing cached result
+    (flags, probabilities, scores and sampling time) is kept; only its
+    ``status``, ``meta`` (note, failures, next_attempt...) and due time are
+    updated.
+    Cameras never cached get the placeholder as is.
+    """
+    cam_id = _camera_id(item)
+    if not cam_id:
+        return
+    key = CAMERA_KEY.format(id=cam_id)
+    # Binary client: values carry the codec header from encode_value()
+    r = r or get_redis(decode_responses=False)
+    raw = r.hget(key, "data")
+    try:
+        cached = decode_value(raw) if raw else None
+    except Exception:
+        cached = None
+    if not isinstance(cached, dict):
+        write_camera_result(item)
+        return
+    cached["status"] = item.get("status", cached.get("status"))
+    meta = {k: v for k, v in (item.get("meta") or {}).items() if k != "frames"}
+    cached["meta"] = {**(cached.get("meta") or {}), **meta}
+    # ``ts`` stays the last real sampling time; ``due`` moves on since this
+    # camera was attempted (or deliberately skipped) in the current cycle
+    due = _due_ts(cached, now_ts())
+    pipe = r.pipeline(transaction=True)
+    pipe.hset(key, mapping={"data": encode_value(cached), "due": due})
+    pipe.zadd(INDEX_KEY.format(field="due"), {cam_id: due})
+    invalidate(CACHE_NAMESPACE, pipe=pipe)
+    pipe.execute()
+
+
+def finish_predict_all_cycle(camera_ids: Iterable[str]) -> dict:
+    """Mark a complete cycle and drop cameras that are no longer reported."""
+    r = get_redis()
+    keep = {str(c) for c in camera_ids}
+    ts = now_ts()
+    lex_key = INDEX_KEY.format(field=LEX_FIELD)
+    known = r.zrange(INDEX_KEY.format(field="confidence"), 0, -1)
+    gone = [c for c in known if c not in keep]
+    gone_lex = [
+        m for m in r.zrange(lex_key, 0, -1) if m.rsplit(_SEP, 1)[-1] not in keep
+    ]
+    pipe = r.pipeline(transaction=True)
+    # Cameras not re-sampled this cycle keep their hash: refresh its TTL so it
+    # does not expire while the index members remain
+    ttl = predict_all_ttl()
+    for c in keep:
+        pipe.expire(CAMERA_KEY.format(id=c), ttl)
+    for field in (*ORDER_FIELDS, *FRESHNESS_FIELDS):
+        pipe.expire(INDEX_KEY.format(field=field), ttl)
+    if gone:
+        for field in (*SCORE_FIELDS, *FRESHNESS_FIELDS):
+            pipe.zrem(INDEX_KEY.format(field=field), *gone)
+        pipe.delete(*[CAMERA_KEY.format(id=c) for c in gone])
+    if gone_lex:
+        pipe.zrem(lex_key, *gone_lex)
+    pipe.hset(META_KEY, mapping={"ts": ts, "count": len(keep)})
+    pipe.expire(META_KEY, ttl)
+    pipe.delete(PREDICT_ALL_KEY)
+    invalidate(CACHE_NAMESPACE, pipe=pipe)
+    pipe.execute()
+    return {"ts": ts, "count": len(keep)}
+
+
+def write_predict_all(data: list[dict]) -> dict:
+    """Publish a whole cycle at once (per-camera keys + cycle metadata)."""
+    r = get_redis()
+    for item in data:
+        write_camera_result(item, r=r)
+    return finish_predict_all_cycle(_camera_id(it) for it in data)
+
+
+@tiered_cache(CACHE_NAMESPACE, shared=False)
+def read_predict_all() -> Optional[dict[str, Any]]:
+    """Last complete cycle plus per-camera freshness, or None.
+
+    ``{"ts", "count", "oldest_ts", "due"}``: ``oldest_ts`` is the sampling
+    time of the least recently sampled camera and ``due`` the earliest
+    camera due time (both None before the per-camera indexes exist).
+    """
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.hgetall(META_KEY)
+    for field in FRESHNESS_FIELDS:
+        pipe.zrange(INDEX_KEY.format(field=field), 0, 0, withscores=True)
+    meta, oldest, due = pipe.execute()
+    if not meta or "ts" not in meta:
+        return None
+    return {
+        "ts": float(meta["ts"]),
+        "count": int(meta.get("count", 0) or 0),
+        "oldest_ts": float(oldest[0][1]) if oldest else None,
+        "due": float(due[0][1]) if due else None,
+    }
+
+
+@tiered_cache(CACHE_NAMESPACE, shared=False)
+def camera_results_count(ordering: str) -> int:
+    return int(get_redis().zcard(INDEX_KEY.format(field=ordering)))
+
+
+@tiered_cache(CACHE_NAMESPACE, shared=False)
+def camera_results_range(
+    ordering: str, descending: bool, start: int, end: int
+) -> list[dict]:
+    """Results ``start..end`` (inclusive) of one ordering index."""
+    r = get_redis()
+    rng = r.zrevrange if descending else r.zrange
+    members = rng(INDEX_KEY.format(field=ordering), start, end)
+    if ordering == LEX_FIELD:
+        members = [m.rsplit(_SEP, 1)[-1] for m in members]
+    # Binary client: values carry the codec header from encode_value()
+    pipe = get_redis(decode_responses=False).pipeline(transaction=False)
+    for cam_id in members:
+        pipe.hget(CAMERA_KEY.format(id=cam_id), "data")
+    out = []
+    orphans = []
+    for cam_id, raw in zip(members, pipe.execute()):
+        if not raw:
+            orphans.append(cam_id)
+            continue
+        try:
+            out.append(decode_value(raw))
+        except Exception:
+            continue
+    if orphans:
+        _drop_orphans(r, orphans)
+    return out
+
+
+def _drop_orphans(r, camera_ids: list[str]) -> None:
+    """Remove index members whose camera hash expired (keeps ZCARD honest)."""
+    ids = set(camera_ids)
+    lex_key = INDEX_KEY.format(field=LEX_FIELD)
+    lex = [m for m in r.zrange(lex_key, 0, -1) if m.rsplit(_SEP, 1)[-1] in ids]
+    pipe = r.pipeline(transaction=True)
+    for field in (*SCORE_FIELDS, *FRESHNESS_FIELDS):
+        pipe.zrem(INDEX_KEY.format(field=field), *ids)
+    if lex:
+        pipe.zrem(lex_key, *lex)
+    invalidate(CACHE_NAMESPACE, pipe=pipe)
+    try:
+        pipe.execute()
+    except Exception as e:
+        logging.getLogger(__name__).warning("Could not prune predict_all index: %s", e)
+
+
+class CameraResultsPage:
+    """Lazy, server-side ordered view of the per-camera results.
+
+    Behaves like a sequence for Django's Paginator: ``len()`` is a ZCARD and
+    slicing issues one ZRANGE/ZREVRANGE plus a pipelined HGET per page; both
+    are served from process memory until the next cache invalidation.
+    """
+
+    def __init__(self, ordering: str = LEX_FIELD, descending: bool = False):
+        if ordering not in ORDER_FIELDS:
+            ordering = LEX_FIELD
+        self.ordering = ordering
+        self.descending = bool(descending)
+        self._len: Optional[int] = None
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = camera_results_count(self.ordering)
+        return self._len
+
+    def count(self) -> int:
+        return len(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(len(self))
+            return self._fetch(start, stop - 1) if stop > start else []
+        items = self._fetch(index, index)
+        if not items:
+            raise IndexError(index)
+        return items[0]
+
+    def _fetch(self, start: int, end: int) -> list[dict]:
+        return camera_results_range(self.ordering, self.descending, start, end)
+
+
+def request_predict_all_refresh(force: bool = False) -> bool:
+    """Enqueue one background analysis cycle unless one is already pending.
+
+    Concurrent callers race on a Redis ``SET NX``; only the winner enqueues.
+    ``force`` samples every camera, not only those due under adaptive
+    sampling. Returns True when a refresh is (already) on its way.
+    """
+    from core.flood_camera_monitoring.infra.tasks import (
+        CYCLE_LOCK_SECONDS,
+        refresh_predict_all_cache_task,
+    )
+
+    logger = logging.getLogger(__name__)
+    try:
+        r = get_redis()
+        if not r.set(REFRESH_LOCK_KEY, now_ts(), nx=True, ex=CYCLE_LOCK_SECONDS):
+            return True
+    except Exception as e:
+        logger.warning("predict_all refresh lock unavailable: %s", e)
+        return False
+    try:
+        refresh_predict_all_cache_task.delay(force=force)
+    except Exception as e:
+        logger.warning("Could not enqueue predict_all refresh: %s", e)
+        clear_predict_all_refresh()
+        return False
+    return True
+
+
+def clear_predict_all_refresh() -> None:
+    try:
+        get_redis().delete(REFRESH_LOCK_KEY)
+    except Exception:
+        pass
@@ -0,0 +1,146 @@
+"""Write-behind persistence of FloodDetectionRecord rows.
+
+The analysis cycle adds one record per alert to a ``DetectionRecordBuffer``
+while it iterates the cameras. Evidence frames go to the background
+``EvidenceStore`` as soon as the record is added, and the rows are inserted at
+the end of the cycle with a single ``bulk_create`` in one transaction. This
+replaces one transaction, with its round-trip and fsync, per alert.
+
+``flush`` waits at most ``image_wait_seconds`` for pending image writes.
+Records whose image is still being written are inserted without it, and the
+path is attached when the write completes. The hourly/daily rollups of the
+touched buckets are refreshed right after the insert.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+import logging
+import os
+from typing import Optional
+
+from django.db import transaction
+
+from core.flood_camera_monitoring.infra.evidence_store import (
+    EvidenceStore,
+    attach_when_stored,
+)
+from core.flood_camera_monitoring.infra.models import FloodDetectionRecord
+from core.flood_camera_monitoring.infra.rollups import refresh_for_records
+
+
+@dataclass
+class DetectionRecordBuffer:
+    batch_size: int = int(os.getenv("FLOOD_RECORD_BATCH_SIZE", "500"))
+    image_wait_seconds: float = float(
+        os.getenv("FLOOD_EVIDENCE_FLUSH_WAIT_SECONDS", "10")
+    )
+    store: Optional[EvidenceStore] = None
+
+    def __post_init__(self) -> None:
+        self._records: list[tuple[FloodDetectionRecord, Optional[Future]]] = []
+        if self.store is None:
+            self.store = EvidenceStore()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(
+        self,
+        camera,
+        *,
+        is_flooded: bool,
+        medium: bool,
+        confidence: float,
+        prob_normal: float,
+        prob_flooded: float,
+        prob_medium: float,
+        image_bytes=None,
+    ) -> FloodDetectionRecord:
+        """Queue a record; its image (JPEG bytes or frame) is stored in the background."""
+        rec = FloodDetectionRecord(
+            camera=camera,
+            is_flooded=is_flooded,
+            medium=medium,
+            confidence=confidence,
+            prob_normal=prob_normal,
+            prob_flooded=prob_flooded,
+            prob_medium=prob_medium,
+        )
+        future = None
+        if image_bytes is not None and len(image_bytes):
+            future = self.store.submit(camera.id, image_bytes)
+        self._records.append((rec, future))
+        return rec
+
+    def flush(self) -> int:
+        """Insert every queued record in one transaction; return how many were saved.
+
+        If the bulk insert fails the records are retried one by one, so a single
+        bad row does not drop the cycle's other alerts.
+        """
+        entries, self._records = self._records, []
+        if not entries:
+            return 0
+        logger = logging.getLogger(__name__)
+        futures = [f for _, f in entries if f is not None]
+        if futures:
+            wait(futures, timeout=max(0.0, float(self.image_wait_seconds)))
+        late: list[tuple[FloodDetectionRecord, Future]] = []
+        for rec, fut in entries:
+            if fut is None:
+                continue
+            if not fut.done():
+                late.append((rec, fut))
+                continue
+            try:
+                rec.image.name = fut.result()
+            except Exception as e:
+                logger.warning(
+                    "Could not save image for camera id=%s (record will be saved without image): %s",
+                    rec.camera_id,
+                    e,
+                )
+        records = [rec for rec, _ in entries]
+
+        saved: set = set()
+        try:
+            with transaction.atomic():
+                FloodDetectionRecord.objects.bulk_create(
+                    records, batch_size=max(1, int(self.batch_size))
+                )
+            saved = {rec.pk for rec in records}
+        except Exception as e:
+            logger.warning(
+                "bulk_create of %d detection record(s) failed (%s); saving one by one",
+                len(records),
+                e,
+            )
+            failed = []
+            for rec in records:
+                try:
+                    with transaction.atomic():
+                        rec.save(force_insert=True)
+                    saved.add(rec.pk)
+                except Exception as e2:
+                    logger.error(
+                        "Could not save detection record for camera id=%s: %s",
+                        rec.camera_id,
+                        e2,
+                    )
+                    failed.append(rec)
+            # Do not leave orphan per-record files behind (shared blobs are
+            # left to reconcile_fdr_media)
+            for rec in failed:
+                EvidenceStore.delete(rec.image.name)
+        try:
+            refresh_for_records(rec for rec in records if rec.pk in saved)
+        except Exception as e:
+            logger.warning("Could not refresh detection rollups: %s", e)
+        if late:
+            logger.info("%d evidence image(s) will be attached when stored", len(late))
+        for rec, fut in late:
+            # Unsaved records: the callback finds no row and drops the file
+            attach_when_stored(rec.pk, fut)
+        return len(saved)
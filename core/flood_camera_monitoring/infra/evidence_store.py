@@ -0,0 +1,264 @@
+"""Asynchronous, content-addressed storage of detection evidence frames.
+
+``EvidenceStore.submit`` hands a frame to a process-wide thread pool and
+returns a future with the stored name, so the analysis loop never waits on
+disk or object storage. Workers optionally re-encode the JPEG to a maximum
+side (``FLOOD_EVIDENCE_MAX_SIDE``) and quality (``FLOOD_EVIDENCE_JPEG_QUALITY``)
+before writing it through the ``FloodDetectionRecord.image`` storage.
+
+With ``FLOOD_EVIDENCE_DEDUP`` (default) frames are stored once as blobs named
+by their SHA-256 (``flood_detections/blobs/<2 hex>/<sha256>.jpg``) and records
+share them:
+
+- a frame whose perceptual hash is within ``dedup_phash_bits`` of the
+  camera's last stored frame (``flood:cam:evidence:<id>``, younger than
+  ``dedup_max_age_seconds``) reuses that blob;
+- otherwise a blob with the same SHA-256 is reused, or a new one is written.
+
+Blobs no record references any more are removed only by
+``manage.py reconcile_fdr_media``, never inline: a blob can be shared with a
+record that is not committed yet.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import cv2  # type: ignore
+import numpy as np
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+
+from core.common.cache import get_redis
+from core.flood_camera_monitoring.infra.frame_gate import phash, thumbnail
+from core.flood_camera_monitoring.infra.models import FloodDetectionRecord
+
+BLOB_PREFIX = "flood_detections/blobs/"
+LAST_STORED_KEY = "flood:cam:evidence:{id}"
+STATS_KEY = "flood:evidence:stats"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    """Shared writer pool, created lazily per process (after a worker fork)."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, int(workers)), thread_name_prefix="flood-evidence"
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+@dataclass
+class EvidenceStore:
+    workers: int = int(os.getenv("FLOOD_EVIDENCE_WORKERS", "2"))
+    # 0 keeps the captured JPEG as is
+    jpeg_quality: int = int(os.getenv("FLOOD_EVIDENCE_JPEG_QUALITY", "0"))
+    max_side: int = int(os.getenv("FLOOD_EVIDENCE_MAX_SIDE", "0"))
+    dedup: bool = os.getenv("FLOOD_EVIDENCE_DEDUP", "1").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    dedup_phash_bits: int = int(os.getenv("FLOOD_EVIDENCE_DEDUP_PHASH_BITS", "2"))
+    # Past this age a new frame is stored even if it looks the same, and the
+    # reused blob is always recent enough not to be collected meanwhile
+    dedup_max_age_seconds: float = float(
+        os.getenv("FLOOD_EVIDENCE_DEDUP_MAX_AGE_SECONDS", "3600")
+    )
+
+    def submit(self, camera_id, image) -> "Future[Optional[str]]":
+        """Store ``image`` (JPEG bytes or BGR frame) in the background."""
+        return _pool(self.workers).submit(self._write, str(camera_id), image)
+
+    def reencode(self, image) -> Optional[bytes]:
+        """Apply the size/quality policy; returns JPEG bytes."""
+        if image is None:
+            return None
+        needs_work = self.jpeg_quality > 0 or self.max_side > 0
+        if isinstance(image, (bytes, bytearray)):
+            if not needs_work:
+                return bytes(image)
+            frame = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                return bytes(image)
+        else:
+            frame = image
+        h, w = frame.shape[:2]
+        if self.max_side > 0 and max(h, w) > self.max_side:
+            scale = self.max_side / float(max(h, w))
+            frame = cv2.resize(
+                frame,
+                (max(1, int(w * scale)), max(1, int(h * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        params = (
+            [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)]
+            if self.jpeg_quality > 0
+            else []
+        )
+        ok, buf = cv2.imencode(".jpg", frame, params)
+        return buf.tobytes() if ok else None
+
+    def _write(self, camera_id: str, image) -> Optional[str]:
+        data = self.reencode(image)
+        if not data:
+            return None
+        field = FloodDetectionRecord._meta.get_field("image")
+        if not self.dedup:
+            name = field.generate_filename(None, f"{camera_id}-{int(time.time())}.jpg")
+            return field.storage.save(name, ContentFile(data))
+
+        thumb = thumbnail(image)
+        frame_hash = phash(thumb) if thumb is not None else None
+        name = self._near_duplicate(camera_id, frame_hash)
+        if name:
+            self._count("near_duplicate")
+            return name
+        name = blob_name(hashlib.sha256(data).hexdigest())
+        if field.storage.exists(name):
+            self._count("exact_duplicate")
+        else:
+            saved = field.storage.save(name, ContentFile(data))
+            if saved != name:
+                # Another writer stored the same content between exists() and
+                # save(), so the storage picked a new name. The blob under
+                # ``name`` has these exact bytes: drop the copy, reuse it.
+                try:
+                    field.storage.delete(saved)
+                except Exception as e:
+                    logging.getLogger(__name__).warning(
+                        "Could not delete duplicate evidence %s: %s", saved, e
+                    )
+                self._count("exact_duplicate")
+            else:
+                self._count("stored", len(data))
+        if frame_hash is not None:
+            self._remember(camera_id, frame_hash, name)
+        return name
+
+    def _near_duplicate(self, camera_id: str, frame_hash: Optional[int]):
+        """Blob of the camera's last stored frame if this one looks the same."""
+        if frame_hash is None:
+            return None
+        try:
+            raw = get_redis().hgetall(LAST_STORED_KEY.format(id=camera_id))
+            if not raw:
+                return None
+            if time.time() - float(raw["ts"]) > self.dedup_max_age_seconds:
+                return None
+            distance = bin(frame_hash ^ int(raw["phash"])).count("1")
+            if distance > self.dedup_phash_bits:
+                return None
+            name = raw["name"]
+        except Exception:
+            return None
+        storage = FloodDetectionRecord._meta.get_field("image").storage
+        return name if storage.exists(name) else None
+
+    def _remember(self, camera_id: str, frame_hash: int, name: str) -> None:
+        key = LAST_STORED_KEY.format(id=camera_id)
+        try:
+            pipe = get_redis().pipeline(transaction=True)
+            pipe.hset(
+                key, mapping={"phash": frame_hash, "name": name, "ts": time.time()}
+            )
+            pipe.expire(key, max(1, int(self.dedup_max_age_seconds)))
+            pipe.execute()
+        except Exception as e:
+            logging.getLogger(__name__).debug(
+                "Could not store evidence reference: %s", e
+            )
+
+    @staticmethod
+    def _count(outcome: str, nbytes: int = 0) -> None:
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.hincrby(STATS_KEY, outcome, 1)
+            if nbytes:
+                pipe.hincrby(STATS_KEY, "stored_bytes", nbytes)
+            pipe.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def delete(name: Optional[str]) -> None:
+        """Delete an unreferenced per-record frame; shared blobs are kept.
+
+        A blob no committed record references yet may still be handed out by
+        ``_write`` (exact or near duplicate) for another pending record, so
+        deleting it here would race with that write. Orphan blobs are left to
+        ``reconcile_fdr_media`` (``--min-age-hours`` and the Redis pins).
+        """
+        if not name or name.startswith(BLOB_PREFIX):
+            return
+        try:
+            if FloodDetectionRecord.objects.filter(image=name).exists():
+                return
+            FloodDetectionRecord._meta.get_field("image").storage.delete(name)
+        except Exception:
+            pass
+
+
+def blob_name(digest: str) -> str:
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest}.jpg"
+
+
+def evidence_metrics() -> dict:
+    """Stored / deduplicated evidence frame counters."""
+    try:
+        raw = get_redis().hgetall(STATS_KEY)
+    except Exception:
+        return {}
+    out = {
+        k: int(raw.get(k, 0) or 0)
+        for k in ("stored", "exact_duplicate", "near_duplicate", "stored_bytes")
+    }
+    total = out["stored"] + out["exact_duplicate"] + out["near_duplicate"]
+    out["dedup_rate"] = round((total - out["stored"]) / total, 4) if total else None
+    return out
+
+
+def attach_when_stored(record_pk, future: "Future[Optional[str]]") -> None:
+    """Set the record's image once its (late) write finishes.
+
+    Call only after the record is committed; runs in the writer thread (or
+    right away if the write already finished).
+    """
+
+    def _done(fut: Future) -> None:
+        logger = logging.getLogger(__name__)
+        try:
+            name = fut.result()
+        except Exception as e:
+            logger.warning("Evidence write failed for record %s: %s", record_pk, e)
+            return
+        if not name:
+            return
+        close_old_connections()
+        try:
+            updated = FloodDetectionRecord.objects.filter(pk=record_pk).update(
+                image=name
+            )
+            if not updated:
+                # Record was not saved (or was deleted): drop the orphan file
+                # (per-record files only, blobs go to reconcile_fdr_media)
+                EvidenceStore.delete(name)
+        except Exception as e:
+            logger.warning("Could not attach evidence to record %s: %s", record_pk, e)
+        finally:
+            close_old_connections()
+
+    future.add_done_callback(_done)
@@ -0,0 +1,66 @@
+"""Redis-backed store of recent frames published by the stream pool.
+
+The stream pool process (``manage.py run_stream_pool``) keeps camera
+connections open and pushes each sampled frame here as JPEG bytes; analysis
+workers read the most recent frames instantly instead of opening the stream.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from typing import Optional
+
+from core.common.cache import get_redis
+
+
+def _key(stream_url: str) -> str:
+    digest = hashlib.sha1(str(stream_url).encode("utf-8")).hexdigest()[:16]
+    return f"flood:stream:{digest}"
+
+
+class RedisFrameStore:
+    """Ring buffer of the latest JPEG frames per stream URL in Redis."""
+
+    def __init__(
+        self,
+        ring_size: int = int(os.getenv("FLOOD_STREAM_POOL_RING", "3")),
+        ttl_seconds: int = int(os.getenv("FLOOD_STREAM_POOL_TTL_SECONDS", "30")),
+    ) -> None:
+        self.ring_size = max(1, int(ring_size))
+        self.ttl_seconds = max(1, int(ttl_seconds))
+
+    def publish(self, stream_url: str, jpeg: bytes, ts: Optional[float] = None) -> None:
+        key = _key(stream_url)
+        r = get_redis(decode_responses=False)
+        pipe = r.pipeline()
+        pipe.lpush(f"{key}:frames", jpeg)
+        pipe.ltrim(f"{key}:frames", 0, self.ring_size - 1)
+        pipe.expire(f"{key}:frames", self.ttl_seconds)
+        pipe.set(f"{key}:ts", str(ts if ts is not None else time.time()))
+        pipe.expire(f"{key}:ts", self.ttl_seconds)
+        pipe.execute()
+
+    def recent(self, stream_url: str, n: int, max_age_seconds: float) -> list[bytes]:
+        """Return up to ``n`` frames (oldest first) if the stream is fresh, else []."""
+        key = _key(stream_url)
+        try:
+            r = get_redis(decode_responses=False)
+            pipe = r.pipeline()
+            pipe.get(f"{key}:ts")
+            pipe.lrange(f"{key}:frames", 0, max(1, int(n)) - 1)
+            raw_ts, frames = pipe.execute()
+        except Exception as e:
+            logging.getLogger(__name__).debug("Frame store unavailable: %s", e)
+            return []
+        if not raw_ts or not frames:
+            return []
+        try:
+            age = time.time() - float(raw_ts)
+        except (TypeError, ValueError):
+            return []
+        if age > float(max_age_seconds):
+            return []
+        return list(reversed(frames))
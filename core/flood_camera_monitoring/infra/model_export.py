@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+"""Export do classificador para TorchScript congelado ou ONNX.
+
+Usado por ``manage.py export_flood_model`` e pelos testes de paridade. O grafo
+e o sidecar ``<export>.json`` (formato, checkpoint de origem e mtime, classes)
+vão para o caminho que ``TorchFloodClassifier`` procura com
+``FLOOD_MODEL_BACKEND=torchscript|onnx``.
+"""
+
+from pathlib import Path
+from typing import Optional, Sequence
+import json
+
+import torch
+
+from core.flood_camera_monitoring.adapters.gateways.preprocessing import INPUT_SIZE
+from core.flood_camera_monitoring.infra.utils import exported_model_path
+
+EXPORT_FORMATS = ("torchscript", "onnx")
+
+
+def export_model(
+    model: torch.nn.Module,
+    checkpoint: Path,
+    fmt: str,
+    class_names: Sequence[str],
+    out: Optional[Path] = None,
+) -> Path:
+    """Export ``model`` (eager, already loaded from ``checkpoint``); return the path.
+
+    Raises ImportError when ``fmt='onnx'`` and the ``onnx`` package is missing.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    checkpoint = Path(checkpoint)
+    # Same location the loader resolves (FLOOD_MODEL_EXPORT_PATH overrides)
+    out = Path(out) if out is not None else exported_model_path(checkpoint, fmt)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    h, w = INPUT_SIZE
+    example = torch.randn(1, 3, h, w)
+    model = model.eval()
+
+    with torch.inference_mode():
+        if fmt == "torchscript":
+            traced = torch.jit.trace(model, example)
+            # freeze inlines weights/constant-folds; optimize_for_inference
+            # is applied at load time because its output is not serializable
+            frozen = torch.jit.freeze(traced.eval())
+            torch.jit.save(frozen, str(out))
+        else:
+            import onnx  # noqa: F401  # type: ignore
+
+            torch.onnx.export(
+                model,
+                example,
+                str(out),
+                input_names=["input"],
+                output_names=["logits"],
+                dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+                opset_version=17,
+            )
+
+    meta = {
+        "format": fmt,
+        "source": str(checkpoint),
+        "source_mtime": checkpoint.stat().st_mtime,
+        "class_names": list(class_names),
+        "input_size": [h, w],
+    }
+    Path(str(out) + ".json").write_text(json.dumps(meta, indent=2))
+    return out
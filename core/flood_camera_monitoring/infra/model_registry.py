@@ -0,0 +1,83 @@
+"""Process-wide registry of loaded flood classifiers.
+
+Building a TorchFloodClassifier means rebuilding the backbone and running
+``torch.load`` on the checkpoint, which costs seconds and hundreds of MB. The
+registry keeps one instance per (checkpoint path, device) in each process and
+reloads it transparently when the checkpoint mtime changes (hot reload).
+Fallback (untrained) models are never cached.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import threading
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    """Thread-safe cache of loaded models keyed by path, mtime and device."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (resolved path, device) -> (mtime at load time, loaded object)
+        self._entries: Dict[Tuple[str, str], Tuple[Optional[float], Any]] = {}
+
+    @staticmethod
+    def _key(path: Path, device: str) -> Tuple[str, str]:
+        try:
+            resolved = str(path.resolve())
+        except Exception:
+            resolved = str(path)
+        return resolved, str(device)
+
+    def get(self, path: Path, device: str, loader: Callable[[Path, str], Any]) -> Any:
+        """Return the cached object for ``path``/``device``, loading it if needed.
+
+        A changed mtime (or a file that appeared/disappeared) invalidates the
+        entry, so replacing the checkpoint on disk is picked up on the next call.
+        """
+        key = self._key(path, device)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == _mtime(path):
+            return entry[1]
+
+        with self._lock:
+            # Another thread may have loaded it while we waited for the lock
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == _mtime(path):
+                return entry[1]
+            if entry is not None:
+                logging.getLogger(__name__).info(
+                    "Checkpoint changed on disk, reloading model: %s", key[0]
+                )
+            obj = loader(path, device)
+            if getattr(obj, "_fallback", False):
+                # Untrained stand-in (checkpoint missing or unreadable): never
+                # cache it, so the next call retries the real checkpoint
+                self._entries.pop(key, None)
+                return obj
+            # Loader may have downloaded/replaced the file: record the final mtime
+            self._entries[key] = (_mtime(path), obj)
+            return obj
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def loaded(self) -> list[dict]:
+        """Describe the currently loaded entries (for health/debug output)."""
+        return [
+            {"path": path, "device": device, "mtime": mtime}
+            for (path, device), (mtime, _) in list(self._entries.items())
+        ]
+
+
+registry = ModelRegistry()
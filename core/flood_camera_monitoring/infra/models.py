@@ -55,4 +55,54 @@ class FloodDetectionRecord(models.Model):
         indexes = [
             models.Index(fields=["created_at"]),
             models.Index(fields=["confidence"]),
+            # Timeline of one camera, newest first
+            models.Index(
+                fields=["camera", "-created_at"], name="fdr_camera_created_desc_idx"
+            ),
+        ]
+
+
+class FloodDetectionHourly(models.Model):
+    """Rollup por câmera e hora de FloodDetectionRecord (ver infra/rollups.py)."""
+
+    camera = models.ForeignKey(
+        Camera, on_delete=models.CASCADE, related_name="hourly_detections"
+    )
+    bucket = models.DateTimeField()
+    detections = models.PositiveIntegerField(default=0)
+    flooded = models.PositiveIntegerField(default=0)
+    medium = models.PositiveIntegerField(default=0)
+    max_prob_flooded = models.FloatField(default=0.0)
+    max_confidence = models.FloatField(default=0.0)
+
+    class Meta:
+        verbose_name = "Flood detection hourly rollup"
+        verbose_name_plural = "Flood detection hourly rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["camera", "bucket"], name="fdr_hourly_camera_bucket_uniq"
+            )
+        ]
+
+
+class FloodDetectionDaily(models.Model):
+    """Rollup por câmera e dia (fuso local), agregado a partir do horário."""
+
+    camera = models.ForeignKey(
+        Camera, on_delete=models.CASCADE, related_name="daily_detections"
+    )
+    day = models.DateField()
+    detections = models.PositiveIntegerField(default=0)
+    flooded = models.PositiveIntegerField(default=0)
+    medium = models.PositiveIntegerField(default=0)
+    max_prob_flooded = models.FloatField(default=0.0)
+    max_confidence = models.FloatField(default=0.0)
+
+    class Meta:
+        verbose_name = "Flood detection daily rollup"
+        verbose_name_plural = "Flood detection daily rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["camera", "day"], name="fdr_daily_camera_day_uniq"
+            )
         ]
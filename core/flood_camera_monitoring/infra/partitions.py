@@ -0,0 +1,214 @@
+"""Monthly range partitions and retention of FloodDetectionRecord.
+
+On PostgreSQL migration 0017 turns the table into ``PARTITION BY RANGE
+(created_at)``. There is one partition per month (``<table>_pYYYYMM``,
+bounds at 00:00 UTC) plus a ``<table>_default`` partition that only receives
+rows if maintenance falls behind. ``DetectionPartitions.maintain`` (daily
+task) does two things:
+
+- creates the next ``months_ahead`` partitions;
+- applies retention. Months that ended before the last
+  ``retention_months`` are detached and dropped, which is a metadata-only
+  operation instead of a DELETE over millions of rows.
+
+On other databases (SQLite in development) retention falls back to batched
+DELETEs. The hourly/daily rollups are never pruned, so dashboards keep the
+history after the raw rows are gone. Evidence files of dropped rows are
+collected by ``manage.py reconcile_fdr_media``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone as dt_timezone
+import logging
+import os
+import re
+from typing import Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.flood_camera_monitoring.infra.models import FloodDetectionRecord
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.year * 12 + d.month - 1 + n, 12)
+    return date(y, m + 1, 1)
+
+
+def _bound(d: date) -> str:
+    return f"'{d.isoformat()} 00:00:00+00'"
+
+
+@dataclass
+class Partition:
+    name: str
+    start: Optional[date]  # None for the DEFAULT partition
+    rows: int
+
+    @property
+    def end(self) -> Optional[date]:
+        return add_months(self.start, 1) if self.start else None
+
+
+@dataclass
+class DetectionPartitions:
+    # 0 keeps every month
+    retention_months: int = int(os.getenv("FLOOD_DETECTION_RETENTION_MONTHS", "12"))
+    months_ahead: int = int(os.getenv("FLOOD_PARTITION_MONTHS_AHEAD", "2"))
+    delete_batch_size: int = int(os.getenv("FLOOD_RETENTION_DELETE_BATCH", "5000"))
+
+    @property
+    def table(self) -> str:
+        return FloodDetectionRecord._meta.db_table
+
+    def is_partitioned(self) -> bool:
+        if connection.vendor != "postgresql":
+            return False
+        with connection.cursor() as cur:
+            cur.execute(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.oid = to_regclass(%s)",
+                [self.table],
+            )
+            return cur.fetchone() is not None
+
+    def partitions(self) -> list[Partition]:
+        """Partitions of the table with their (estimated) row counts."""
+        with connection.cursor() as cur:
+            cur.execute(
+                "SELECT c.relname, c.reltuples::bigint FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+                [self.table],
+            )
+            rows = cur.fetchall()
+        out = []
+        for name, tuples in rows:
+            m = _MONTH_SUFFIX.search(name)
+            start = date(int(m.group(1)), int(m.group(2)), 1) if m else None
+            out.append(Partition(name=name, start=start, rows=max(0, int(tuples))))
+        return out
+
+    def retention_cutoff(self, now: Optional[datetime] = None) -> Optional[date]:
+        """First day still kept; None when retention is disabled."""
+        if self.retention_months <= 0:
+            return None
+        now = now or timezone.now()
+        # Whole months only: at least ``retention_months`` of history is kept
+        return add_months(
+            month_start(now.astimezone(dt_timezone.utc)), -self.retention_months
+        )
+
+    def ensure(self, now: Optional[datetime] = None) -> list[str]:
+        """Create the current and next ``months_ahead`` partitions; return new names."""
+        now = now or timezone.now()
+        first = month_start(now.astimezone(dt_timezone.utc))
+        existing = {p.start for p in self.partitions()}
+        created = []
+        for i in range(max(0, self.months_ahead) + 1):
+            start = add_months(first, i)
+            if start in existing:
+                continue
+            self.create_partition(start)
+            created.append(self.partition_name(start))
+        return created
+
+    def partition_name(self, start: date) -> str:
+        return f"{self.table}_p{start:%Y%m}"
+
+    def create_partition(self, start: date) -> None:
+        """Create the month's partition, moving rows the DEFAULT one caught."""
+        name, end = self.partition_name(start), add_months(start, 1)
+        table, default = self.table, f"{self.table}_default"
+        q = connection.ops.quote_name
+        rng = f"created_at >= {_bound(start)} AND created_at < {_bound(end)}"
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", [default])
+            has_default = cur.fetchone()[0]
+            stray = False
+            if has_default:
+                cur.execute(f"SELECT EXISTS (SELECT 1 FROM {q(default)} WHERE {rng})")
+                stray = cur.fetchone()[0]
+            if not stray:
+                cur.execute(
+                    f"CREATE TABLE {q(name)} PARTITION OF {q(table)} "
+                    f"FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})"
+                )
+                return
+            # Attaching over rows still in DEFAULT fails: move them first
+            cur.execute(f"CREATE TABLE {q(name)} (LIKE {q(table)} INCLUDING DEFAULTS)")
+            cur.execute(f"INSERT INTO {q(name)} SELECT * FROM {q(default)} WHERE {rng}")
+            cur.execute(f"DELETE FROM {q(default)} WHERE {rng}")
+            cur.execute(
+                f"ALTER TABLE {q(table)} ATTACH PARTITION {q(name)} "
+                f"FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})"
+            )
+
+    def expired(self, now: Optional[datetime] = None) -> list[Partition]:
+        cutoff = self.retention_cutoff(now)
+        if cutoff is None:
+            return []
+        return [p for p in self.partitions() if p.start and p.end <= cutoff]
+
+    def apply_retention(self, now: Optional[datetime] = None) -> dict:
+        """Drop (or delete, when not partitioned) detections past retention."""
+        cutoff = self.retention_cutoff(now)
+        if cutoff is None:
+            return {"dropped": [], "deleted": 0}
+        cutoff_dt = datetime(cutoff.year, cutoff.month, 1, tzinfo=dt_timezone.utc)
+        if not self.is_partitioned():
+            return {"dropped": [], "deleted": self._delete_before(cutoff_dt)}
+
+        q = connection.ops.quote_name
+        dropped = []
+        for p in self.expired(now):
+            with transaction.atomic(), connection.cursor() as cur:
+                cur.execute(f"ALTER TABLE {q(self.table)} DETACH PARTITION {q(p.name)}")
+                cur.execute(f"DROP TABLE {q(p.name)}")
+            dropped.append(p.name)
+        # Stragglers the DEFAULT partition caught (normally none)
+        deleted = 0
+        default = f"{self.table}_default"
+        with connection.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", [default])
+            if cur.fetchone()[0]:
+                cur.execute(
+                    f"DELETE FROM {q(default)} WHERE created_at < %s", [cutoff_dt]
+                )
+                deleted = cur.rowcount
+        return {"dropped": dropped, "deleted": deleted}
+
+    def _delete_before(self, cutoff: datetime) -> int:
+        deleted = 0
+        batch = max(1, int(self.delete_batch_size))
+        while True:
+            ids = list(
+                FloodDetectionRecord.objects.filter(created_at__lt=cutoff).values_list(
+                    "pk", flat=True
+                )[:batch]
+            )
+            if not ids:
+                return deleted
+            deleted += FloodDetectionRecord.objects.filter(pk__in=ids).delete()[0]
+
+    def maintain(self, now: Optional[datetime] = None) -> dict:
+        """Create upcoming partitions and apply retention."""
+        created = self.ensure(now) if self.is_partitioned() else []
+        result = {"created": created, **self.apply_retention(now)}
+        if created or result["dropped"] or result["deleted"]:
+            logging.getLogger(__name__).info(
+                "Detection partitions: created=%s dropped=%s deleted=%s",
+                created,
+                result["dropped"],
+                result["deleted"],
+            )
+        return result
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+"""Quantização int8 (CPU) do classificador de alagamentos.
+
+- ``dynamic``: pesos das camadas Linear em int8, aplicado no load, sem
+  calibração (ganho modesto em backbones convolucionais);
+- ``static``: FX graph mode com observadores calibrados em frames reais
+  (``manage.py calibrate_flood_model``), quantizando também as convoluções.
+  O resultado é salvo como TorchScript congelado em ``<stem>.int8.pt``.
+"""
+
+from typing import Iterable, Optional
+import copy
+import logging
+
+import torch
+import torch.nn as nn
+
+QUANTIZE_MODES = ("dynamic", "static")
+
+
+def normalize_mode(mode: Optional[str]) -> str:
+    """Return 'dynamic', 'static' or '' (desligado) for env/checkpoint values."""
+    value = str(mode or "").strip().lower()
+    if value in ("1", "true", "yes", "int8"):
+        return "dynamic"
+    return value if value in QUANTIZE_MODES else ""
+
+
+def quantize_dynamic(model: nn.Module) -> nn.Module:
+    """Quantize Linear layers to int8 (weights) with dynamic activations."""
+    return torch.ao.quantization.quantize_dynamic(
+        copy.deepcopy(model).eval(), {nn.Linear}, dtype=torch.qint8
+    )
+
+
+def quantize_static(
+    model: nn.Module,
+    calibration: Iterable[torch.Tensor],
+    example: torch.Tensor,
+    engine: str = "x86",
+) -> torch.jit.ScriptModule:
+    """Calibrate and convert ``model`` with FX post-training quantization.
+
+    ``calibration`` yields preprocessed Nx3xHxW batches; returns a frozen
+    TorchScript module ready to be saved/loaded without the model code.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    logger = logging.getLogger(__name__)
+    if engine in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = engine
+    qconfig = get_default_qconfig_mapping(torch.backends.quantized.engine)
+    prepared = prepare_fx(copy.deepcopy(model).eval(), qconfig, (example,))
+    seen = 0
+    with torch.inference_mode():
+        for batch in calibration:
+            prepared(batch)
+            seen += int(batch.shape[0])
+    if seen == 0:
+        raise ValueError("static quantization needs at least one calibration frame")
+    logger.info("Calibração int8 com %d frame(s)", seen)
+    quantized = convert_fx(prepared)
+    with torch.inference_mode():
+        traced = torch.jit.trace(quantized, example)
+        return torch.jit.freeze(traced.eval())
@@ -0,0 +1,131 @@
+"""Hourly and daily per-camera rollups of FloodDetectionRecord.
+
+After each flush the writer recomputes only the buckets it touched:
+
+- the hourly rows for the affected cameras and hours come from the raw
+  records, using the ``(camera, created_at DESC)`` index;
+- the daily rows (local ``TIME_ZONE`` days) are then aggregated from the
+  hourly table.
+
+Both are upserts, so recomputing a bucket is idempotent and late or retried
+inserts simply overwrite it. Dashboards and the detection history read these
+tables instead of scanning raw detections. Raw retention
+(``infra/partitions.py``) never removes rollups.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from typing import Iterable, Optional
+
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from core.flood_camera_monitoring.infra.models import (
+    FloodDetectionDaily,
+    FloodDetectionHourly,
+    FloodDetectionRecord,
+)
+
+ROLLUP_FIELDS = [
+    "detections",
+    "flooded",
+    "medium",
+    "max_prob_flooded",
+    "max_confidence",
+]
+
+
+def hour_floor(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def refresh_for_records(records: Iterable[FloodDetectionRecord]) -> None:
+    """Recompute the buckets of freshly saved records."""
+    stamps: dict = {}
+    for rec in records:
+        if rec.created_at is None:
+            continue
+        lo, hi = stamps.get(rec.camera_id, (rec.created_at, rec.created_at))
+        stamps[rec.camera_id] = (min(lo, rec.created_at), max(hi, rec.created_at))
+    if not stamps:
+        return
+    start = min(lo for lo, _ in stamps.values())
+    end = max(hi for _, hi in stamps.values())
+    refresh_range(stamps.keys(), start, end)
+
+
+def refresh_range(
+    camera_ids: Optional[Iterable] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> int:
+    """Recompute the hourly and daily rollups covering ``[start, end]``.
+
+    ``camera_ids=None`` means every camera. Returns the number of hourly rows
+    written.
+    """
+    end = end or timezone.now()
+    start = hour_floor(start or end)
+    stop = hour_floor(end) + timedelta(hours=1)
+    records = FloodDetectionRecord.objects.filter(
+        created_at__gte=start, created_at__lt=stop
+    )
+    if camera_ids is not None:
+        camera_ids = list(camera_ids)
+        records = records.filter(camera_id__in=camera_ids)
+    hourly = [
+        FloodDetectionHourly(camera_id=row.pop("camera_id"), **row)
+        for row in records.order_by()
+        .annotate(bucket=TruncHour("created_at"))
+        .values("camera_id", "bucket")
+        .annotate(
+            detections=Count("id"),
+            flooded=Count("id", filter=Q(is_flooded=True)),
+            medium=Count("id", filter=Q(medium=True)),
+            max_prob_flooded=Max("prob_flooded"),
+            max_confidence=Max("confidence"),
+        )
+    ]
+    if hourly:
+        FloodDetectionHourly.objects.bulk_create(
+            hourly,
+            update_conflicts=True,
+            unique_fields=["camera", "bucket"],
+            update_fields=ROLLUP_FIELDS,
+        )
+
+    # Whole local days around the range, re-aggregated from the hourly table
+    tz = timezone.get_current_timezone()
+    first_day = timezone.localtime(start, tz).date()
+    last_day = timezone.localtime(stop - timedelta(microseconds=1), tz).date()
+    hours = FloodDetectionHourly.objects.filter(
+        bucket__gte=timezone.make_aware(datetime.combine(first_day, time.min), tz),
+        bucket__lt=timezone.make_aware(
+            datetime.combine(last_day + timedelta(days=1), time.min), tz
+        ),
+    )
+    if camera_ids is not None:
+        hours = hours.filter(camera_id__in=camera_ids)
+    daily = [
+        FloodDetectionDaily(camera_id=row.pop("camera_id"), **row)
+        for row in hours.order_by()
+        .annotate(day=TruncDate("bucket"))
+        .values("camera_id", "day")
+        .annotate(
+            detections=Sum("detections"),
+            flooded=Sum("flooded"),
+            medium=Sum("medium"),
+            max_prob_flooded=Max("max_prob_flooded"),
+            max_confidence=Max("max_confidence"),
+        )
+    ]
+    if daily:
+        FloodDetectionDaily.objects.bulk_create(
+            daily,
+            update_conflicts=True,
+            unique_fields=["camera", "day"],
+            update_fields=ROLLUP_FIELDS,
+        )
+    return len(hourly)
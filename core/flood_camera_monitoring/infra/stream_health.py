@@ -0,0 +1,187 @@
+"""Per-camera stream health, kept in Redis across analysis cycles.
+
+Every capture attempt updates ``flood:cam:health:<id>`` (consecutive failures,
+last success/failure, EWMA capture latency). Failing streams are retried with
+exponential backoff instead of every cycle; after
+``offline_after_failures`` consecutive failures the camera is switched to
+``Camera.CameraStatus.OFFLINE`` and only probed every
+``probe_interval_seconds`` (ids in ``flood:cam:health:offline``). A successful
+probe puts the camera back to ACTIVE.
+
+Only cameras taken offline here are probed: cameras an admin set to OFFLINE
+or INACTIVE are never touched.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import logging
+import os
+import time
+from typing import Iterable, Optional
+
+from core.common.cache import get_redis
+
+HEALTH_KEY = "flood:cam:health:{id}"
+OFFLINE_SET_KEY = "flood:cam:health:offline"
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CameraHealth:
+    camera_id: str
+    failures: int = 0
+    total_failures: int = 0
+    successes: int = 0
+    last_success: Optional[float] = None
+    last_failure: Optional[float] = None
+    latency_ms: Optional[float] = None
+    next_attempt: float = 0.0
+    # Set when the tracker (not an admin) took the camera offline
+    offline: bool = False
+
+    @classmethod
+    def from_hash(cls, camera_id: str, raw: dict) -> "CameraHealth":
+        return cls(
+            camera_id=str(camera_id),
+            failures=int(raw.get("failures") or 0),
+            total_failures=int(raw.get("total_failures") or 0),
+            successes=int(raw.get("successes") or 0),
+            last_success=_float(raw.get("last_success")),
+            last_failure=_float(raw.get("last_failure")),
+            latency_ms=_float(raw.get("latency_ms")),
+            next_attempt=_float(raw.get("next_attempt")) or 0.0,
+            offline=str(raw.get("offline") or "0") == "1",
+        )
+
+    def to_hash(self) -> dict:
+        out = {}
+        for k, v in asdict(self).items():
+            if k == "camera_id" or v is None:
+                continue
+            out[k] = int(v) if isinstance(v, bool) else v
+        return out
+
+
+@dataclass
+class StreamHealthTracker:
+    """Backoff/offline policy plus the Redis persistence of CameraHealth."""
+
+    # First retry after ~4 min (the next fixed 300s cycle), then 2x, 4x, ...
+    # up to backoff_max_seconds
+    backoff_base_seconds: float = float(
+        os.getenv("FLOOD_HEALTH_BACKOFF_BASE_SECONDS", "240")
+    )
+    backoff_max_seconds: float = float(
+        os.getenv("FLOOD_HEALTH_BACKOFF_MAX_SECONDS", "3600")
+    )
+    offline_after_failures: int = int(os.getenv("FLOOD_HEALTH_OFFLINE_AFTER", "6"))
+    probe_interval_seconds: float = float(
+        os.getenv("FLOOD_HEALTH_PROBE_INTERVAL_SECONDS", "1800")
+    )
+    probe_timeout_seconds: float = float(
+        os.getenv("FLOOD_HEALTH_PROBE_TIMEOUT_SECONDS", "5")
+    )
+    latency_alpha: float = 0.3
+    ttl_seconds: int = 7 * 24 * 3600
+
+    def load(self, camera_ids: Iterable[str]) -> dict[str, CameraHealth]:
+        """Health of each camera; unknown (or Redis down) means healthy."""
+        ids = [str(c) for c in camera_ids]
+        out = {c: CameraHealth(camera_id=c) for c in ids}
+        if not ids:
+            return out
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for c in ids:
+                pipe.hgetall(HEALTH_KEY.format(id=c))
+            for c, raw in zip(ids, pipe.execute()):
+                if raw:
+                    out[c] = CameraHealth.from_hash(c, raw)
+        except Exception as e:
+            logging.getLogger(__name__).warning("Stream health unavailable: %s", e)
+        return out
+
+    def offline_ids(self) -> list[str]:
+        try:
+            return sorted(get_redis().smembers(OFFLINE_SET_KEY))
+        except Exception:
+            return []
+
+    def is_due(self, health: CameraHealth, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) >= health.next_attempt
+
+    def record_success(
+        self,
+        health: CameraHealth,
+        seconds: Optional[float],
+        now: Optional[float] = None,
+    ) -> CameraHealth:
+        now = now if now is not None else time.time()
+        health.failures = 0
+        health.successes += 1
+        health.last_success = now
+        health.next_attempt = 0.0
+        health.offline = False
+        self._observe_latency(health, seconds)
+        self.save(health)
+        return health
+
+    def record_failure(
+        self, health: CameraHealth, seconds: float, now: Optional[float] = None
+    ) -> CameraHealth:
+        """Count a failed capture and schedule the next attempt (or probe)."""
+        now = now if now is not None else time.time()
+        health.failures += 1
+        health.total_failures += 1
+        health.last_failure = now
+        self._observe_latency(health, seconds)
+        if health.offline or health.failures >= self.offline_after_failures:
+            health.offline = True
+            health.next_attempt = now + self.probe_interval_seconds
+        else:
+            delay = self.backoff_base_seconds * (2 ** (health.failures - 1))
+            health.next_attempt = now + min(self.backoff_max_seconds, delay)
+        self.save(health)
+        return health
+
+    def forget_offline(self, health: CameraHealth) -> None:
+        """Stop probing (e.g. an admin changed the camera status meanwhile)."""
+        health.offline = False
+        health.failures = 0
+        health.next_attempt = 0.0
+        self.save(health)
+
+    def save(self, health: CameraHealth) -> None:
+        key = HEALTH_KEY.format(id=health.camera_id)
+        try:
+            pipe = get_redis().pipeline(transaction=True)
+            pipe.delete(key)
+            pipe.hset(key, mapping=health.to_hash())
+            pipe.expire(key, self.ttl_seconds)
+            if health.offline:
+                pipe.sadd(OFFLINE_SET_KEY, health.camera_id)
+            else:
+                pipe.srem(OFFLINE_SET_KEY, health.camera_id)
+            pipe.execute()
+        except Exception as e:
+            logging.getLogger(__name__).warning(
+                "Could not save stream health for camera %s: %s", health.camera_id, e
+            )
+
+    def _observe_latency(self, health: CameraHealth, seconds: Optional[float]) -> None:
+        if seconds is None:
+            # Frames from the warm stream pool: the stream was not read
+            return
+        ms = max(0.0, float(seconds)) * 1000.0
+        if health.latency_ms is None:
+            health.latency_ms = ms
+        else:
+            a = self.latency_alpha
+            health.latency_ms = a * ms + (1.0 - a) * health.latency_ms
@@ -1,38 +1,108 @@
 from celery import shared_task
 import logging
-from core.common.cache import cache_set_json, now_ts
-from core.flood_camera_monitoring.application.use_cases.predict_all_cameras import (
-    PredictAllCamerasService,
+import os
+import uuid
+from core.common.cache import get_redis
+from core.flood_camera_monitoring.infra.cache import (
+    clear_predict_all_refresh,
+    finish_predict_all_cycle,
+    mark_camera_unavailable,
+    write_camera_result,
 )
 
+CYCLE_LOCK_KEY = "flood:analysis_cycle:lock"
+# Safety expiry in case a worker dies mid-cycle
+CYCLE_LOCK_SECONDS = int(os.getenv("FLOOD_CYCLE_LOCK_SECONDS", "600"))
 
-@shared_task
-def analyze_all_cameras_task() -> int:
-    """Run analysis, persist alerts; return number of records saved."""
+# Delete the lock only if we still own it
+_RELEASE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def run_analysis_cycle(force: bool = False) -> tuple[list[dict], int]:
+    """Single capture+inference sweep: persist alerts, then publish the API cache.
+
+    Every camera due this tick (see infra.adaptive_sampling; all of them with
+    ``force``) is captured and classified once per cycle; the same results
+    feed both FloodDetectionRecord persistence and the per-camera cache
+    (`flood:cam:<id>`), which is updated as each camera finishes.
+    """
     from core.flood_camera_monitoring.application.use_cases.analyze_all_cameras import (
         AnalyzeAllCamerasService,
     )
+    from core.flood_camera_monitoring.infra.models import Camera
 
     logger = logging.getLogger(__name__)
-    service = AnalyzeAllCamerasService()
-    saved = service.run()
+    token = uuid.uuid4().hex
+    r = None
+    try:
+        r = get_redis()
+        if not r.set(CYCLE_LOCK_KEY, token, nx=True, ex=CYCLE_LOCK_SECONDS):
+            logger.info("Analysis cycle already running elsewhere; skipping")
+            return [], 0
+    except Exception as e:
+        # Without Redis there is no shared cache either; still persist alerts
+        logger.warning("Cycle lock unavailable (%s); running unlocked", e)
+        r = None
+    try:
+        service = AnalyzeAllCamerasService(
+            on_result=write_camera_result,
+            on_unavailable=mark_camera_unavailable,
+            force_sampling=force,
+        )
+        data, saved = service.run_and_collect()
+        try:
+            # Adaptive sampling skips cameras that are not due this tick:
+            # keep every ACTIVE camera's last result, prune only the rest
+            keep = {str((it.get("camera") or {}).get("id") or "") for it in data}
+            keep.update(
+                str(c)
+                for c in Camera.objects.filter(
+                    status=Camera.CameraStatus.ACTIVE
+                ).values_list("id", flat=True)
+            )
+            finish_predict_all_cycle(keep)
+            logger.info("Refreshed predict_all cache with %s entries", len(data))
+        except Exception as e:
+            logger.warning("Failed to set predict_all cache: %s", e)
+        return data, saved
+    finally:
+        # Fresh data (or a failed cycle): let the next stale read enqueue again
+        clear_predict_all_refresh()
+        if r is not None:
+            try:
+                r.eval(_RELEASE_LUA, 1, CYCLE_LOCK_KEY, token)
+            except Exception:
+                pass
+
+
+@shared_task
+def analyze_all_cameras_task() -> int:
+    """Run the analysis cycle (persist alerts + cache); return records saved."""
+    logger = logging.getLogger(__name__)
+    _, saved = run_analysis_cycle()
     logger.info("AnalyzeAllCamerasTask finished: saved=%s", saved)
     return saved
 
 
 @shared_task
-def refresh_predict_all_cache_task() -> int:
-    """Compute predictions and refresh the shared cache.
+def refresh_predict_all_cache_task(force: bool = False) -> int:
+    """Refresh `flood:predict_all` through the same single analysis cycle.
 
-    Stores under key 'flood:predict_all' a JSON payload {"data": [...], "ts": <unix>}.
-    Returns the number of camera entries computed.
+    Kept for callers that enqueue it by name; ``force`` samples every camera
+    (``?refresh=true``). Returns the number of camera entries cached.
     """
-    logger = logging.getLogger(__name__)
-    service = PredictAllCamerasService()
-    data = service.run()
-    try:
-        cache_set_json("flood:predict_all", {"data": data, "ts": now_ts()}, ex=300)
-        logger.info("Refreshed predict_all cache with %s entries", len(data))
-    except Exception as e:
-        logger.warning("Failed to set predict_all cache: %s", e)
+    data, _ = run_analysis_cycle(force=force)
     return len(data)
+
+
+@shared_task
+def maintain_detection_partitions_task() -> dict:
+    """Create upcoming FloodDetectionRecord partitions and apply retention."""
+    from core.flood_camera_monitoring.infra.partitions import DetectionPartitions
+
+    return DetectionPartitions().maintain()
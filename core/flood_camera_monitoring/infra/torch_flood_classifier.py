@@ -12,6 +12,7 @@ from core.flood_camera_monitoring.infra.utils import (
     resolve_checkpoint_path,
     looks_like_lfs_pointer,
 )
+from core.flood_camera_monitoring.infra.model_registry import registry
 
 from core.flood_camera_monitoring.adapters.gateways.torch_classifier_adapter import (
     TorchFloodClassifier as TorchFloodClassifier,
@@ -21,15 +22,16 @@ from core.flood_camera_monitoring.adapters.gateways.torch_classifier_adapter imp
 def build_default_classifier(
     checkpoint_path: Union[str, Path] | None = None, device: str = "cpu"
 ) -> TorchFloodClassifier:
-    """Create a TorchFloodClassifier ensuring a valid checkpoint exists.
+    """Return a TorchFloodClassifier ensuring a valid checkpoint exists.
 
     Resolution order for checkpoint path:
     1) Explicit argument
     2) ENV FLOOD_MODEL_PATH
     3) Default: <this_dir>/machine_model/best_real_model.pth
 
-    If the file is missing or looks like a Git LFS pointer/tiny stub, we
-    download the real checkpoint via gdown.
+    The instance is shared per process through the model registry (keyed by
+    path, mtime and device) and reloaded when the checkpoint changes on disk.
+    Set FLOOD_MODEL_CACHE=0 to build a fresh instance on every call.
     """
 
     # Choose path from args, env or default
@@ -38,6 +40,36 @@ def build_default_classifier(
     else:
         checkpoint_path = Path(str(checkpoint_path))
 
+    if os.getenv("FLOOD_MODEL_CACHE", "1").lower() in ("0", "false", "no"):
+        return _load_classifier(checkpoint_path, device)
+    return registry.get(checkpoint_path, device, _load_classifier)
+
+
+def warm_default_classifier(device: str = "cpu") -> None:
+    """Load the default classifier into the registry (worker boot hook)."""
+    logger = logging.getLogger(__name__)
+    try:
+        clf = build_default_classifier(device=device)
+        logger.info(
+            "Flood classifier warmed (fallback=%s)",
+            bool(getattr(clf, "_fallback", False)),
+        )
+    except Exception:
+        logger.exception("Failed to warm flood classifier")
+
+
+def _load_classifier(checkpoint_path: Path, device: str) -> TorchFloodClassifier:
+    ensure_checkpoint(checkpoint_path)
+    return TorchFloodClassifier(str(checkpoint_path), device=device)
+
+
+def ensure_checkpoint(checkpoint_path: Path) -> Path:
+    """Make sure a real checkpoint exists at ``checkpoint_path``.
+
+    If the file is missing or looks like a Git LFS pointer/tiny stub, we
+    download the real checkpoint via gdown (or plain HTTP as fallback).
+    """
+
     # Ensure folder exists
     checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -89,4 +121,4 @@ def build_default_classifier(
         except Exception as e:
             logging.getLogger(__name__).error("Failed to download checkpoint: %s", e)
 
-    return TorchFloodClassifier(str(checkpoint_path), device=device)
+    return checkpoint_path
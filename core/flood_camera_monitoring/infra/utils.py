@@ -15,6 +15,21 @@ def resolve_checkpoint_path(env_var: str = "FLOOD_MODEL_PATH") -> Path:
     return Path(__file__).resolve().parent / "machine_model" / "best_real_model.pth"
 
 
+def exported_model_path(checkpoint: Path, fmt: str) -> Path:
+    """Return where the optimized export of ``checkpoint`` lives.
+
+    ``fmt`` is 'torchscript' (<stem>.torchscript.pt), 'onnx' (<stem>.onnx)
+    or 'int8' (<stem>.int8.pt, static quantization), next to the checkpoint
+    unless FLOOD_MODEL_EXPORT_PATH / FLOOD_MODEL_INT8_PATH is set.
+    """
+    env_var = "FLOOD_MODEL_INT8_PATH" if fmt == "int8" else "FLOOD_MODEL_EXPORT_PATH"
+    env_path = os.getenv(env_var)
+    if env_path:
+        return Path(env_path)
+    suffix = {"onnx": ".onnx", "int8": ".int8.pt"}.get(fmt, ".torchscript.pt")
+    return Path(checkpoint).with_name(Path(checkpoint).stem + suffix)
+
+
 def looks_like_lfs_pointer(p: Path) -> bool:
     """Detect Git LFS pointer files to avoid treating them as real checkpoints."""
     try:
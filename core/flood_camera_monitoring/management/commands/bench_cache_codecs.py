@@ -0,0 +1,119 @@
+import json
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from core.common.cache import (
+    CODECS,
+    COMPRESSORS,
+    decode_value,
+    encode_value,
+    get_redis,
+)
+from core.flood_camera_monitoring.application.use_cases.analyze_all_cameras import (
+    AnalyzeAllCamerasService,
+)
+
+
+def _payload(cameras: int, frames: int) -> dict:
+    """predict_all-shaped payload with realistic per-camera entries."""
+    rng = random.Random(0)
+    data = []
+    for i in range(cameras):
+        flooded = rng.uniform(0, 100)
+        medium = rng.uniform(0, 100 - flooded)
+        data.append(
+            {
+                "camera": {
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "description": f"Câmera {i:03d} - Rua {rng.randint(1, 999)}",
+                    "video_hls": f"https://cameras.example/{i}/index.m3u8",
+                },
+                "status": rng.choice(["NO_FLOOD", "MEDIUM_SAVE", "FLOOD_SAVE"]),
+                "is_flooded": flooded >= 60,
+                "medium": 25 <= flooded < 60,
+                "confidence": flooded,
+                "probabilities": {
+                    "normal": 100 - flooded - medium,
+                    "flooded": flooded,
+                    "medium": medium,
+                },
+                "meta": {
+                    "frames": frames,
+                    "best_flooded": flooded,
+                    "decision_flooded": flooded,
+                    "trend": {
+                        "series": [rng.uniform(0, 100) for _ in range(frames)],
+                        "rising": rng.random() > 0.5,
+                    },
+                },
+            }
+        )
+    return {"data": data, "ts": time.time()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark cache codecs/compression on a predict_all-shaped payload: "
+        "encode/decode time, encoded size and Redis MEMORY USAGE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cameras", type=int, default=100)
+        parser.add_argument("--frames", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument(
+            "--no-redis", action="store_true", help="Skip MEMORY USAGE probes"
+        )
+
+    def handle(self, *args, **options):
+        payload = _payload(int(options["cameras"]), int(options["frames"]))
+        repeat = max(1, int(options["repeat"]))
+        r = None
+        if not options["no_redis"]:
+            try:
+                r = get_redis(decode_responses=False)
+                r.ping()
+            except Exception as e:
+                self.stderr.write(f"Redis unavailable, skipping memory: {e}")
+                r = None
+
+        results = []
+        for _, (codec, _, _) in sorted(CODECS.items()):
+            for _, (comp, _, _) in sorted(COMPRESSORS.items()):
+                blob = encode_value(payload, codec, comp, min_compress_bytes=0)
+                enc, dec = [], []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    encode_value(payload, codec, comp, min_compress_bytes=0)
+                    t1 = time.perf_counter()
+                    decode_value(blob)
+                    t2 = time.perf_counter()
+                    enc.append(t1 - t0)
+                    dec.append(t2 - t1)
+                enc.sort()
+                dec.sort()
+                row = {
+                    "codec": codec,
+                    "compression": comp,
+                    "bytes": len(blob),
+                    "encode_us": round(enc[len(enc) // 2] * 1e6, 1),
+                    "decode_us": round(dec[len(dec) // 2] * 1e6, 1),
+                    "redis_bytes": None,
+                }
+                if r is not None:
+                    key = f"flood:bench:codec:{codec}:{comp}"
+                    try:
+                        r.set(key, blob, ex=60)
+                        row["redis_bytes"] = r.memory_usage(key)
+                        r.delete(key)
+                    except Exception as e:
+                        self.stderr.write(f"MEMORY USAGE failed: {e}")
+                results.append(row)
+
+        headers = list(results[0].keys())
+        rows = [[str(row[h]) for h in headers] for row in results]
+        self.stdout.write(AnalyzeAllCamerasService._format_table(headers, rows))
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,234 @@
+import json
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import cv2  # type: ignore
+import numpy as np
+import torch
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.flood_camera_monitoring.adapters.gateways.opencv_stream_adapter import (
+    encode_jpeg,
+)
+from core.flood_camera_monitoring.adapters.gateways.preprocessing import (
+    BatchPreprocessor,
+)
+from core.flood_camera_monitoring.application.use_cases.analyze_all_cameras import (
+    AnalyzeAllCamerasService,
+)
+from core.flood_camera_monitoring.application.utils.capture import FrameCaptureStage
+from core.flood_camera_monitoring.infra.models import Camera, FloodDetectionRecord
+from core.flood_camera_monitoring.infra.torch_flood_classifier import (
+    build_default_classifier,
+)
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in str(value).split(",") if v.strip()]
+
+
+def _summary(stage: str, samples: list[float], frames: int, **params) -> dict:
+    """p50/p95/p99 (ms) of per-call samples and throughput in frames/s."""
+    arr = np.asarray(samples, dtype=np.float64) * 1000.0
+    total = float(np.sum(samples)) if samples else 0.0
+    p50, p95, p99 = (
+        np.percentile(arr, [50, 95, 99]).tolist() if len(arr) else (0.0, 0.0, 0.0)
+    )
+    return {
+        "stage": stage,
+        **params,
+        "n": len(samples),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "fps": round(frames / total, 2) if total > 0 else 0.0,
+    }
+
+
+@dataclass
+class _TimedCaptureStage(FrameCaptureStage):
+    """FrameCaptureStage that records how long each camera capture took."""
+
+    durations: list[float] = field(default_factory=list)
+
+    def capture(self, stream_url: str, sample_frames=None):
+        t0 = time.perf_counter()
+        frames = super().capture(stream_url, sample_frames)
+        self.durations.append(time.perf_counter() - t0)
+        return frames
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark each stage of the camera analysis pipeline (capture, JPEG "
+        "round-trip, preprocessing, forward pass, aggregation, DB persistence) "
+        "offline, using loop: streams over local mp4 files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            action="append",
+            default=[],
+            help="mp4 path or loop: URL (repeatable); a synthetic clip is "
+            "generated when omitted",
+        )
+        parser.add_argument("--cameras", type=int, default=8)
+        parser.add_argument("--sample-frames", type=int, default=3)
+        parser.add_argument("--batch-sizes", default="1,4,8,16")
+        parser.add_argument("--threads", default="1,2,4", help="torch threads")
+        parser.add_argument(
+            "--capture-workers", default="1,4,8", help="capture thread pool sizes"
+        )
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument(
+            "--no-db", action="store_true", help="Skip the persistence stage"
+        )
+        parser.add_argument("--json", default=None, help="Write results to file")
+
+    def handle(self, *args, **options):
+        results: list[dict] = []
+        iterations = max(1, int(options["iterations"]))
+        with tempfile.TemporaryDirectory(prefix="flood-bench-") as tmp:
+            sources = options["source"] or [self._synthesize(Path(tmp) / "bench.mp4")]
+            url = "loop:" + ",".join(
+                s[len("loop:") :] if s.startswith("loop:") else s for s in sources
+            )
+
+            # 1. Capture: N virtual cameras over the same loop source
+            frames: list = []
+            for workers in _ints(options["capture_workers"]):
+                stage = _TimedCaptureStage(
+                    sample_frames=int(options["sample_frames"]),
+                    sample_interval_ms=0,
+                    max_workers=workers,
+                    use_stream_pool=False,
+                )
+                items = [(i, url) for i in range(max(1, int(options["cameras"])))]
+                t0 = time.perf_counter()
+                captured = [f for _, fs in stage.run(items) for f in fs]
+                wall = time.perf_counter() - t0
+                row = _summary(
+                    "capture", stage.durations, len(captured), workers=workers
+                )
+                # Concurrency shows up in wall-clock throughput, not per-camera latency
+                row["fps"] = round(len(captured) / wall, 2) if wall > 0 else 0.0
+                results.append(row)
+                frames = frames or captured
+        if not frames:
+            raise CommandError(f"No frames captured from {url}")
+
+        # 2. JPEG round-trip (legacy grab() path; now only for stored evidence)
+        samples = []
+        for frame in frames:
+            t0 = time.perf_counter()
+            data = encode_jpeg(frame)
+            cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            samples.append(time.perf_counter() - t0)
+        results.append(_summary("jpeg_roundtrip", samples, len(samples)))
+
+        clf = build_default_classifier()
+        if getattr(clf, "_fallback", False):
+            self.stderr.write("Checkpoint not found: timing the fallback model")
+        service = AnalyzeAllCamerasService()
+        pool = (frames * (max(_ints(options["batch_sizes"])) // len(frames) + 1))[
+            : max(_ints(options["batch_sizes"]))
+        ]
+        default_threads = torch.get_num_threads()
+        try:
+            for threads in _ints(options["threads"]):
+                torch.set_num_threads(max(1, threads))
+                for batch in _ints(options["batch_sizes"]):
+                    chunk = pool[:batch]
+                    pre = BatchPreprocessor(capacity=batch)
+                    pre_s, fwd_s = [], []
+                    with torch.inference_mode():
+                        # Warm-up (allocations, oneDNN kernels)
+                        clf.model(pre(chunk))
+                        for _ in range(iterations):
+                            t0 = time.perf_counter()
+                            x = pre(chunk)
+                            t1 = time.perf_counter()
+                            clf._forward(x)
+                            t2 = time.perf_counter()
+                            pre_s.append(t1 - t0)
+                            fwd_s.append(t2 - t1)
+                    params = {"batch": batch, "threads": threads}
+                    frames_done = batch * iterations
+                    results.append(_summary("preprocess", pre_s, frames_done, **params))
+                    results.append(_summary("forward", fwd_s, frames_done, **params))
+        finally:
+            torch.set_num_threads(default_threads)
+
+        # 3. Aggregation (per camera, sample_frames predictions each)
+        preds = clf.predict_batch(pool[: max(1, int(options["sample_frames"]))])
+        samples = []
+        for _ in range(max(100, iterations)):
+            t0 = time.perf_counter()
+            service.aggregate(preds)
+            samples.append(time.perf_counter() - t0)
+        results.append(_summary("aggregate", samples, len(samples) * len(preds)))
+
+        # 4. Persistence (rolled back; stored evidence files are removed)
+        if not options["no_db"]:
+            results.append(self._bench_persistence(frames, iterations))
+
+        self._print(results)
+        payload = json.dumps(
+            {"source": url, "torch": torch.__version__, "results": results}, indent=2
+        )
+        if options["json"]:
+            Path(options["json"]).write_text(payload)
+            self.stdout.write(f"JSON written to {options['json']}")
+        else:
+            self.stdout.write(payload)
+
+    def _bench_persistence(self, frames: list, iterations: int) -> dict:
+        jpeg = encode_jpeg(frames[0])
+        samples = []
+        with transaction.atomic():
+            cam = Camera.objects.create(
+                status=Camera.CameraStatus.INACTIVE, description="bench"
+            )
+            for i in range(max(10, iterations)):
+                t0 = time.perf_counter()
+                rec = FloodDetectionRecord.objects.create(
+                    camera=cam,
+                    is_flooded=True,
+                    confidence=90.0,
+                    prob_normal=10.0,
+                    prob_flooded=90.0,
+                    image=ContentFile(jpeg, name=f"bench-{cam.id}-{i}.jpg"),
+                )
+                samples.append(time.perf_counter() - t0)
+                rec.image.delete(save=False)
+            transaction.set_rollback(True)
+        return _summary("persist", samples, len(samples))
+
+    @staticmethod
+    def _synthesize(path: Path, seconds: int = 4, fps: int = 10) -> str:
+        """Write a small moving-gradient 720p clip so no network is needed."""
+        w, h = 1280, 720
+        writer = cv2.VideoWriter(
+            str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h)
+        )
+        base = np.tile(np.linspace(0, 255, w, dtype=np.uint8), (h, 1))
+        for i in range(seconds * fps):
+            shifted = np.roll(base, i * 8, axis=1)
+            writer.write(cv2.merge([shifted, base, np.flipud(shifted)]))
+        writer.release()
+        return str(path)
+
+    def _print(self, results: list[dict]) -> None:
+        headers = ["stage", "params", "n", "p50_ms", "p95_ms", "p99_ms", "fps"]
+        rows = []
+        for r in results:
+            params = ",".join(
+                f"{k}={r[k]}" for k in ("workers", "batch", "threads") if k in r
+            )
+            rows.append([r["stage"], params or "-"] + [str(r[k]) for k in headers[2:]])
+        self.stdout.write(AnalyzeAllCamerasService._format_table(headers, rows))
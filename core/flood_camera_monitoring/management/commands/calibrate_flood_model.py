@@ -0,0 +1,178 @@
+import json
+import time
+from pathlib import Path
+
+import torch
+import torch.nn.functional as F
+from django.core.management.base import BaseCommand, CommandError
+
+from core.flood_camera_monitoring.adapters.gateways.preprocessing import INPUT_SIZE
+from core.flood_camera_monitoring.adapters.gateways.torch_classifier_adapter import (
+    TorchFloodClassifier,
+)
+from core.flood_camera_monitoring.infra.models import FloodDetectionRecord
+from core.flood_camera_monitoring.infra.quantization import (
+    quantize_dynamic,
+    quantize_static,
+)
+from core.flood_camera_monitoring.infra.torch_flood_classifier import (
+    ensure_checkpoint,
+)
+from core.flood_camera_monitoring.infra.utils import (
+    exported_model_path,
+    resolve_checkpoint_path,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Calibrate int8 quantization on stored FloodDetectionRecord frames and "
+        "report the accuracy delta against the float model. Static mode saves "
+        "<stem>.int8.pt; enable with FLOOD_MODEL_QUANTIZE=static|dynamic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checkpoint", default=None)
+        parser.add_argument("--mode", choices=["static", "dynamic"], default="static")
+        parser.add_argument(
+            "--limit", type=int, default=512, help="Stored frames to load"
+        )
+        parser.add_argument(
+            "--calibration",
+            type=float,
+            default=0.5,
+            help="Fraction of frames used to calibrate (rest is evaluated)",
+        )
+        parser.add_argument("--batch", type=int, default=16)
+        parser.add_argument(
+            "--max-accuracy-drop",
+            type=float,
+            default=0.02,
+            help="Fail (and do not save) if int8 agreement drops more than this",
+        )
+
+    def handle(self, *args, **options):
+        ckpt = (
+            Path(options["checkpoint"])
+            if options["checkpoint"]
+            else resolve_checkpoint_path()
+        )
+        ensure_checkpoint(ckpt)
+        clf = TorchFloodClassifier(str(ckpt), backend="eager", quantize="")
+        if clf._fallback or not isinstance(clf.model, torch.nn.Module):
+            raise CommandError(f"Could not load a float model from {ckpt}")
+        float_model = clf.model.eval()
+
+        images, labels = self._load_frames(int(options["limit"]))
+        if len(images) < 2:
+            raise CommandError("Not enough stored detection frames to calibrate")
+        split = min(len(images) - 1, max(1, int(len(images) * options["calibration"])))
+        batch = max(1, int(options["batch"]))
+        calib = list(self._batches(clf, images[:split], batch))
+        evaluation = list(self._batches(clf, images[split:], batch))
+        self.stdout.write(
+            f"Frames: {len(images)} ({split} calibration, {len(images) - split} evaluation)"
+        )
+
+        mode = options["mode"]
+        h, w = INPUT_SIZE
+        if mode == "static":
+            qmodel = quantize_static(float_model, calib, torch.randn(1, 3, h, w))
+        else:
+            qmodel = quantize_dynamic(float_model)
+
+        float_probs, float_s = self._run(float_model, evaluation)
+        int8_probs, int8_s = self._run(qmodel, evaluation)
+        names = [str(c).lower() for c in clf.class_names]
+        i_flood = names.index("flooded") if "flooded" in names else 1
+        stored = torch.tensor(labels[split:], dtype=torch.bool)
+        float_pred = float_probs.argmax(dim=1) == i_flood
+        int8_pred = int8_probs.argmax(dim=1) == i_flood
+
+        n = max(1, len(stored))
+        report = {
+            "mode": mode,
+            "frames_eval": int(len(stored)),
+            # Os registros não têm rótulo humano: a referência é a decisão
+            # persistida (is_flooded) e a concordância com o modelo float
+            "accuracy_float": float((float_pred == stored).sum()) / n,
+            "accuracy_int8": float((int8_pred == stored).sum()) / n,
+            "agreement": float((float_pred == int8_pred).sum()) / n,
+            "max_prob_diff": float((float_probs - int8_probs).abs().max()),
+            "ms_per_frame_float": float_s * 1000.0 / n,
+            "ms_per_frame_int8": int8_s * 1000.0 / n,
+        }
+        report["accuracy_delta"] = report["accuracy_int8"] - report["accuracy_float"]
+        report["speedup"] = float_s / int8_s if int8_s > 0 else 0.0
+        self.stdout.write(json.dumps(report, indent=2))
+
+        drop = max(1.0 - report["agreement"], -report["accuracy_delta"])
+        if drop > float(options["max_accuracy_drop"]):
+            raise CommandError(
+                f"int8 accuracy drop {drop:.3f} exceeds "
+                f"{options['max_accuracy_drop']}; model not saved"
+            )
+        if mode == "dynamic":
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Dynamic int8 OK; enable with FLOOD_MODEL_QUANTIZE=dynamic"
+                )
+            )
+            return
+
+        out = exported_model_path(ckpt, "int8")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        torch.jit.save(qmodel, str(out))
+        meta = {
+            "format": "int8",
+            "source": str(ckpt),
+            "source_mtime": ckpt.stat().st_mtime,
+            "class_names": list(clf.class_names),
+            "engine": torch.backends.quantized.engine,
+            "report": report,
+        }
+        Path(str(out) + ".json").write_text(json.dumps(meta, indent=2))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved static int8 model to {out}; enable with "
+                "FLOOD_MODEL_QUANTIZE=static"
+            )
+        )
+
+    def _load_frames(self, limit: int) -> tuple[list[bytes], list[bool]]:
+        images: list[bytes] = []
+        labels: list[bool] = []
+        qs = (
+            FloodDetectionRecord.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .order_by("-created_at")
+            .only("image", "is_flooded")[: max(1, limit)]
+        )
+        for rec in qs.iterator():
+            try:
+                with rec.image.open("rb") as fh:
+                    images.append(fh.read())
+                labels.append(bool(rec.is_flooded))
+            except Exception as e:
+                self.stderr.write(f"Skipping {rec.image.name}: {e}")
+        return images, labels
+
+    @staticmethod
+    def _batches(clf: TorchFloodClassifier, images: list[bytes], size: int):
+        for start in range(0, len(images), size):
+            # clone(): o preprocessador reaproveita o buffer de saída
+            yield clf.preprocess(images[start : start + size]).clone()
+
+    @staticmethod
+    def _run(model, batches) -> tuple[torch.Tensor, float]:
+        probs = []
+        elapsed = 0.0
+        with torch.inference_mode():
+            for x in batches:
+                t0 = time.perf_counter()
+                logits = model(x)
+                elapsed += time.perf_counter() - t0
+                probs.append(F.softmax(logits, dim=1))
+        if not probs:
+            return torch.empty((0, 2)), elapsed
+        return torch.cat(probs), elapsed
@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.flood_camera_monitoring.application.use_cases.analyze_all_cameras import (
+    AnalyzeAllCamerasService,
+)
+from core.flood_camera_monitoring.infra.models import Camera
+from core.flood_camera_monitoring.infra.stream_health import StreamHealthTracker
+
+
+def _when(ts) -> str:
+    if not ts:
+        return "-"
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+class Command(BaseCommand):
+    help = (
+        "Show per-camera stream health (consecutive failures, last success, "
+        "capture latency, backoff) and optionally reset it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="append",
+            default=[],
+            metavar="CAMERA_ID",
+            help="Retry a camera on the next cycle, skipping its backoff or probe "
+            "interval (repeatable; 'all' for every one)",
+        )
+
+    def handle(self, *args, **options):
+        tracker = StreamHealthTracker()
+        cams = list(
+            Camera.objects.exclude(status=Camera.CameraStatus.INACTIVE).order_by(
+                "description"
+            )
+        )
+        health = tracker.load(str(c.id) for c in cams)
+
+        reset = set(options["reset"])
+        if reset:
+            for cam_id, h in health.items():
+                if "all" in reset or cam_id in reset:
+                    h.failures = 0
+                    h.next_attempt = 0.0
+                    tracker.save(h)
+                    self.stdout.write(f"Camera {cam_id} will be retried next cycle")
+            health = tracker.load(str(c.id) for c in cams)
+
+        now = time.time()
+        rows = []
+        for cam in cams:
+            h = health[str(cam.id)]
+            rows.append(
+                [
+                    cam.description or str(cam.id),
+                    cam.get_status_display(),
+                    str(h.failures),
+                    _when(h.last_success),
+                    f"{h.latency_ms:.0f}" if h.latency_ms is not None else "-",
+                    "yes" if h.offline else "no",
+                    (f"{h.next_attempt - now:.0f}s" if h.next_attempt > now else "now"),
+                ]
+            )
+        self.stdout.write(
+            AnalyzeAllCamerasService._format_table(
+                [
+                    "Câmera",
+                    "Status",
+                    "Falhas",
+                    "Último sucesso",
+                    "Latência(ms)",
+                    "Auto-offline",
+                    "Próxima",
+                ],
+                rows,
+                max_widths={"Câmera": 50},
+            )
+        )
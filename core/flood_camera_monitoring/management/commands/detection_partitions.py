@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.flood_camera_monitoring.application.use_cases.analyze_all_cameras import (
+    AnalyzeAllCamerasService,
+)
+from core.flood_camera_monitoring.infra.partitions import DetectionPartitions
+from core.flood_camera_monitoring.infra.rollups import refresh_range
+
+
+class Command(BaseCommand):
+    help = (
+        "Show FloodDetectionRecord partitions and what retention would drop; "
+        "optionally run the maintenance and rebuild the hourly/daily rollups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Create upcoming partitions and drop/delete expired detections",
+        )
+        parser.add_argument(
+            "--rebuild-rollups",
+            type=int,
+            default=0,
+            metavar="DAYS",
+            help="Recompute the rollups of the last DAYS days (one day per query)",
+        )
+
+    def handle(self, *args, **options):
+        parts = DetectionPartitions()
+        cutoff = parts.retention_cutoff()
+        self.stdout.write(
+            f"Retention: {parts.retention_months} month(s), keeping since {cutoff}"
+            if cutoff
+            else "Retention: disabled"
+        )
+
+        if parts.is_partitioned():
+            expired = {p.name for p in parts.expired()}
+            rows = [
+                [
+                    p.name,
+                    str(p.start or "DEFAULT"),
+                    str(p.end or "-"),
+                    str(p.rows),
+                    "drop" if p.name in expired else "",
+                ]
+                for p in parts.partitions()
+            ]
+            self.stdout.write(
+                AnalyzeAllCamerasService._format_table(
+                    ["Partição", "Início", "Fim", "Linhas (est.)", "Retenção"], rows
+                )
+            )
+        else:
+            self.stdout.write(
+                "Table is not partitioned (PostgreSQL only); retention uses DELETE"
+            )
+
+        if options["apply"]:
+            result = parts.maintain()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Created {len(result['created'])} partition(s), dropped "
+                    f"{len(result['dropped'])}, deleted {result['deleted']} row(s)"
+                )
+            )
+
+        days = max(0, int(options["rebuild_rollups"]))
+        if days:
+            now = timezone.now()
+            written = 0
+            for i in range(days, 0, -1):
+                written += refresh_range(
+                    None, now - timedelta(days=i), now - timedelta(days=i - 1)
+                )
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {written} hourly rollup row(s)")
+            )
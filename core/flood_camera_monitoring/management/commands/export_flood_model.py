@@ -0,0 +1,99 @@
+import time
+from pathlib import Path
+
+import torch
+from django.core.management.base import BaseCommand, CommandError
+
+from core.flood_camera_monitoring.adapters.gateways.preprocessing import INPUT_SIZE
+from core.flood_camera_monitoring.adapters.gateways.torch_classifier_adapter import (
+    TorchFloodClassifier,
+)
+from core.flood_camera_monitoring.infra.model_export import export_model
+from core.flood_camera_monitoring.infra.torch_flood_classifier import (
+    ensure_checkpoint,
+)
+from core.flood_camera_monitoring.infra.utils import resolve_checkpoint_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the flood checkpoint to a frozen TorchScript or ONNX graph and "
+        "check parity/latency against the eager model. Enable it with "
+        "FLOOD_MODEL_BACKEND=torchscript|onnx."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checkpoint", default=None)
+        parser.add_argument(
+            "--format", choices=["torchscript", "onnx"], default="torchscript"
+        )
+        parser.add_argument("--batch", type=int, default=8)
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=1e-3,
+            help="Max abs difference allowed between eager and exported softmax",
+        )
+        parser.add_argument("--skip-check", action="store_true")
+
+    def handle(self, *args, **options):
+        fmt = options["format"]
+        ckpt = (
+            Path(options["checkpoint"])
+            if options["checkpoint"]
+            else resolve_checkpoint_path()
+        )
+        ensure_checkpoint(ckpt)
+        eager = TorchFloodClassifier(str(ckpt), backend="eager")
+        if eager._fallback:
+            raise CommandError(f"Could not load a real model from {ckpt}")
+        model = eager.model.eval()
+
+        try:
+            out = export_model(model, ckpt, fmt, eager.class_names)
+        except ImportError as e:
+            raise CommandError(
+                "ONNX export requires the 'onnx' package "
+                "(and onnxruntime to serve it)"
+            ) from e
+        self.stdout.write(self.style.SUCCESS(f"Exported {fmt} model to {out}"))
+
+        if options["skip_check"]:
+            return
+        exported = TorchFloodClassifier(str(ckpt), backend=fmt)
+        if exported.active_backend != fmt:
+            raise CommandError(f"Exported {fmt} model could not be loaded back")
+
+        batch = max(1, int(options["batch"]))
+        iters = max(1, int(options["iterations"]))
+        h, w = INPUT_SIZE
+        max_diff = 0.0
+        timings = {"eager": 0.0, fmt: 0.0}
+        with torch.inference_mode():
+            for _ in range(iters):
+                x = torch.randn(batch, 3, h, w)
+                results = {}
+                for name, clf in (("eager", eager), (fmt, exported)):
+                    t0 = time.perf_counter()
+                    results[name] = torch.softmax(clf.model(x), dim=1)
+                    timings[name] += time.perf_counter() - t0
+                diff = (results["eager"] - results[fmt]).abs().max()
+                max_diff = max(max_diff, float(diff))
+
+        frames = batch * iters
+        self.stdout.write(
+            "Latency per frame: "
+            + " | ".join(
+                f"{k} {v * 1000.0 / frames:.2f} ms" for k, v in timings.items()
+            )
+            + f" | threads={torch.get_num_threads()}"
+        )
+        if max_diff > float(options["tolerance"]):
+            raise CommandError(
+                f"Parity check failed: max softmax diff {max_diff:.6f} > "
+                f"{options['tolerance']}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Parity OK: max softmax diff {max_diff:.2e}")
+        )
@@ -0,0 +1,136 @@
+from datetime import timedelta
+from itertools import islice
+import posixpath
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.common.cache import get_redis
+from core.flood_camera_monitoring.infra.evidence_store import LAST_STORED_KEY
+from core.flood_camera_monitoring.infra.models import FloodDetectionRecord
+
+
+def _walk(storage, root: str):
+    """Yield every file name under ``root``, one directory at a time."""
+    try:
+        dirs, files = storage.listdir(root)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for f in sorted(files):
+        yield posixpath.join(root, f)
+    for d in sorted(dirs):
+        yield from _walk(storage, posixpath.join(root, d))
+
+
+def _batches(iterable, size: int):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete evidence frames (content-addressed blobs and legacy per-record "
+        "files) that no FloodDetectionRecord references any more."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prefix",
+            default="flood_detections",
+            help="Storage directory to scan (default: flood_detections)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="File names checked against the database per query",
+        )
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24.0,
+            help="Keep files newer than this: their record may not be inserted yet",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        storage = FloodDetectionRecord._meta.get_field("image").storage
+        batch_size = max(1, int(options["batch_size"]))
+        min_age = max(0.0, options["min_age_hours"])
+        cutoff = timezone.now() - timedelta(hours=min_age)
+        dry_run = options["dry_run"]
+        # Blobs a camera may reuse for its next near-duplicate frame
+        pinned = self._pinned_names()
+
+        scanned = referenced = recent = deleted = failed = 0
+        freed = 0
+        for batch in _batches(
+            _walk(storage, options["prefix"].rstrip("/")), batch_size
+        ):
+            scanned += len(batch)
+            in_use = set(
+                FloodDetectionRecord.objects.filter(image__in=batch).values_list(
+                    "image", flat=True
+                )
+            )
+            referenced += len(in_use)
+            for name in batch:
+                if name in in_use:
+                    continue
+                if name in pinned or not self._older_than(
+                    storage, name, cutoff, min_age
+                ):
+                    recent += 1
+                    continue
+                try:
+                    size = storage.size(name)
+                except Exception:
+                    size = 0
+                if dry_run:
+                    self.stdout.write(f"would delete {name}")
+                else:
+                    try:
+                        storage.delete(name)
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f"Could not delete {name}: {e}")
+                        continue
+                deleted += 1
+                freed += size
+
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(
+            f"Scanned {scanned} file(s): {referenced} referenced, {recent} recent or "
+            f"pinned, {failed} failed. {verb} {deleted} ({freed / 1e6:.1f} MB)."
+        )
+
+    @staticmethod
+    def _older_than(storage, name: str, cutoff, min_age: float) -> bool:
+        try:
+            modified = storage.get_modified_time(name)
+        except Exception:
+            # Unknown age: only collect when no grace period was asked for
+            return min_age == 0
+        if timezone.is_naive(modified):
+            modified = timezone.make_aware(modified)
+        return modified < cutoff
+
+    def _pinned_names(self) -> set:
+        try:
+            r = get_redis()
+            keys = list(r.scan_iter(match=LAST_STORED_KEY.format(id="*"), count=500))
+            pipe = r.pipeline(transaction=False)
+            for k in keys:
+                pipe.hget(k, "name")
+            return {n for n in pipe.execute() if n}
+        except Exception as e:
+            self.stderr.write(f"Redis unavailable, no blobs pinned: {e}")
+            return set()
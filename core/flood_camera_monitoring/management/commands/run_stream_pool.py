@@ -0,0 +1,62 @@
+import logging
+import signal
+import threading
+
+import cv2  # type: ignore
+from django.core.management.base import BaseCommand
+
+from core.flood_camera_monitoring.adapters.gateways.stream_pool import StreamPool
+from core.flood_camera_monitoring.infra.frame_store import RedisFrameStore
+from core.flood_camera_monitoring.infra.models import Camera
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep ACTIVE camera streams open and publish their latest frames to Redis "
+        "(enable consumers with FLOOD_STREAM_POOL=1)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh",
+            type=float,
+            default=60.0,
+            help="Seconds between syncing the camera list from the database",
+        )
+
+    def handle(self, *args, **options):
+        logger = logging.getLogger(__name__)
+        store = RedisFrameStore()
+
+        def publish(url, frame, ts):
+            ok, buf = cv2.imencode(".jpg", frame)
+            if ok:
+                store.publish(url, buf.tobytes(), ts)
+
+        pool = StreamPool(sink=publish, ring_size=store.ring_size)
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+        self.stdout.write(self.style.SUCCESS("Stream pool started"))
+        try:
+            while not stop.is_set():
+                urls = [
+                    url
+                    for url in Camera.objects.filter(
+                        status=Camera.CameraStatus.ACTIVE
+                    ).values_list("video_hls", flat=True)
+                    # Demo loops read local files; no need to keep them warm
+                    if url and not str(url).startswith("loop:")
+                ]
+                pool.sync(urls)
+                stats = pool.stats()
+                logger.info(
+                    "Stream pool: %d streams (%d connected)",
+                    len(stats),
+                    sum(1 for s in stats if s["connected"]),
+                )
+                stop.wait(float(options["refresh"]))
+        finally:
+            pool.close()
+            self.stdout.write("Stream pool stopped")
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flood_camera_monitoring', '0015_seed_demo_camera'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FloodDetectionDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('detections', models.PositiveIntegerField(default=0)),
+                ('flooded', models.PositiveIntegerField(default=0)),
+                ('medium', models.PositiveIntegerField(default=0)),
+                ('max_prob_flooded', models.FloatField(default=0.0)),
+                ('max_confidence', models.FloatField(default=0.0)),
+            ],
+            options={
+                'verbose_name': 'Flood detection daily rollup',
+                'verbose_name_plural': 'Flood detection daily rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='FloodDetectionHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('detections', models.PositiveIntegerField(default=0)),
+                ('flooded', models.PositiveIntegerField(default=0)),
+                ('medium', models.PositiveIntegerField(default=0)),
+                ('max_prob_flooded', models.FloatField(default=0.0)),
+                ('max_confidence', models.FloatField(default=0.0)),
+            ],
+            options={
+                'verbose_name': 'Flood detection hourly rollup',
+                'verbose_name_plural': 'Flood detection hourly rollups',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='flooddetectionrecord',
+            index=models.Index(fields=['camera', '-created_at'], name='fdr_camera_created_desc_idx'),
+        ),
+        migrations.AddField(
+            model_name='flooddetectiondaily',
+            name='camera',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_detections', to='flood_camera_monitoring.camera'),
+        ),
+        migrations.AddField(
+            model_name='flooddetectionhourly',
+            name='camera',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_detections', to='flood_camera_monitoring.camera'),
+        ),
+        migrations.AddConstraint(
+            model_name='flooddetectiondaily',
+            constraint=models.UniqueConstraint(fields=('camera', 'day'), name='fdr_daily_camera_day_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='flooddetectionhourly',
+            constraint=models.UniqueConstraint(fields=('camera', 'bucket'), name='fdr_hourly_camera_bucket_uniq'),
+        ),
+    ]
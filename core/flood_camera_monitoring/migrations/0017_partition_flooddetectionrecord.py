@@ -0,0 +1,121 @@
+# Generated manually: monthly range partitioning of FloodDetectionRecord (PostgreSQL only)
+from datetime import date, timezone as dt_timezone
+
+from django.db import migrations
+from django.utils import timezone
+
+TABLE = "flood_camera_monitoring_flooddetectionrecord"
+# Partitions created ahead of the current month (see infra/partitions.py)
+MONTHS_AHEAD = 2
+
+
+def _add_months(d, n):
+    y, m = divmod(d.year * 12 + d.month - 1 + n, 12)
+    return date(y, m + 1, 1)
+
+
+def _bound(d):
+    return f"'{d.isoformat()} 00:00:00+00'"
+
+
+def _rebuild(schema_editor, partitioned):
+    """Copy the table into a partitioned (or plain) one with the same columns.
+
+    Postgres cannot partition a table in place. The old table is renamed and
+    copied, and its indexes and foreign keys are recreated under the same
+    names, so later Django migrations still find them. The primary key
+    becomes ``(id, created_at)``, because a partitioned table's unique
+    constraints must include the partition key. ``id`` stays unique
+    (UUID4).
+    """
+    conn = schema_editor.connection
+    if conn.vendor != "postgresql":
+        return
+    q = conn.ops.quote_name
+    old = f"{TABLE}_old"
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [TABLE],
+        )
+        if (cur.fetchone() is not None) == partitioned:
+            return
+        cur.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            [TABLE],
+        )
+        pk_name = cur.fetchone()[0]
+        cur.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s "
+            "AND indexname <> %s",
+            [TABLE, pk_name],
+        )
+        indexes = cur.fetchall()
+        cur.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cur.fetchall()
+        cur.execute(f"SELECT min(created_at) FROM {q(TABLE)}")
+        oldest = cur.fetchone()[0]
+
+    ex = schema_editor.execute
+    ex(f"ALTER TABLE {q(TABLE)} RENAME TO {q(old)}")
+    ex(f"ALTER TABLE {q(old)} RENAME CONSTRAINT {q(pk_name)} TO {q(old + '_pkey')}")
+    for name, _ in foreign_keys:
+        ex(f"ALTER TABLE {q(old)} DROP CONSTRAINT {q(name)}")
+    for name, _ in indexes:
+        ex(f"DROP INDEX {q(name)}")
+
+    if partitioned:
+        ex(
+            f"CREATE TABLE {q(TABLE)} (LIKE {q(old)} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        ex(
+            f"ALTER TABLE {q(TABLE)} ADD CONSTRAINT {q(pk_name)} PRIMARY KEY (id, created_at)"
+        )
+        now = timezone.now().astimezone(dt_timezone.utc)
+        first = (oldest or now).astimezone(dt_timezone.utc)
+        last = _add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+        start = min(date(first.year, first.month, 1), date(now.year, now.month, 1))
+        while start <= last:
+            end = _add_months(start, 1)
+            ex(
+                f"CREATE TABLE {q(f'{TABLE}_p{start:%Y%m}')} PARTITION OF {q(TABLE)} "
+                f"FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})"
+            )
+            start = end
+        ex(f"CREATE TABLE {q(TABLE + '_default')} PARTITION OF {q(TABLE)} DEFAULT")
+    else:
+        ex(f"CREATE TABLE {q(TABLE)} (LIKE {q(old)} INCLUDING DEFAULTS)")
+        ex(f"ALTER TABLE {q(TABLE)} ADD CONSTRAINT {q(pk_name)} PRIMARY KEY (id)")
+
+    ex(f"INSERT INTO {q(TABLE)} SELECT * FROM {q(old)}")
+    # Also drops the old partitions when going back to a plain table
+    ex(f"DROP TABLE {q(old)}")
+    for name, definition in foreign_keys:
+        ex(f"ALTER TABLE {q(TABLE)} ADD CONSTRAINT {q(name)} {definition}")
+    for _, definition in indexes:
+        # "ON ONLY" (partitioned parent) would skip the partitions
+        ex(definition.replace(" ON ONLY ", " ON "))
+
+
+def forwards_func(apps, schema_editor):
+    _rebuild(schema_editor, partitioned=True)
+
+
+def reverse_func(apps, schema_editor):
+    _rebuild(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flood_camera_monitoring", "0016_detection_rollups_and_camera_index"),
+    ]
+
+    operations = [migrations.RunPython(forwards_func, reverse_code=reverse_func)]
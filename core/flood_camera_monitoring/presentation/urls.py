@@ -22,6 +22,11 @@ urlpatterns = [
         FloodMonitoringViewSet.as_view({"get": "cameras"}),
         name="cameras-list",
     ),
+    path(
+        "cameras/<uuid:camera_id>/detections/",
+        FloodMonitoringViewSet.as_view({"get": "camera_detections"}),
+        name="camera-detections",
+    ),
     path("health/", HealthcheckView.as_view(), name="health"),
     # Simplified HLS live loop endpoints
     path("demo", HlsLoopInfoView.as_view(), name="hls-demo-info"),
@@ -24,26 +24,38 @@ from core.flood_camera_monitoring.application.use_cases.detect_flood_snapshot_fr
 from core.flood_camera_monitoring.application.dto.stream_request import (
     StreamDetectRequest,
 )
-from core.common.cache import cache_get_json
-from core.flood_camera_monitoring.infra.tasks import refresh_predict_all_cache_task
+from core.common.cache import cache_metrics, get_redis
+from core.common.tiered_cache import tiered_cache_metrics
+from core.flood_camera_monitoring.infra.cache import (
+    ORDER_FIELDS,
+    CameraResultsPage,
+    predict_all_age,
+    predict_all_is_stale,
+    read_predict_all,
+    request_predict_all_refresh,
+)
+from core.flood_camera_monitoring.infra.evidence_store import evidence_metrics
+from core.flood_camera_monitoring.infra.frame_gate import frame_gate_metrics
+from core.flood_camera_monitoring.infra.tasks import analyze_all_cameras_task
 from core.flood_camera_monitoring.application.dto.snapshot_request import (
     SnapshotDetectRequest,
 )
-from core.flood_camera_monitoring.application.use_cases.analyze_all_cameras import (
-    AnalyzeAllCamerasService,
-)
-from core.flood_camera_monitoring.application.use_cases.predict_all_cameras import (
-    PredictAllCamerasService,
+from core.flood_camera_monitoring.infra.models import (
+    Camera,
+    FloodDetectionDaily,
+    FloodDetectionHourly,
+    FloodDetectionRecord,
 )
-from core.flood_camera_monitoring.infra.models import Camera
 import uuid
-from config.pagination import DefaultPageNumberPagination
+from datetime import datetime
+from config.pagination import DefaultPageNumberPagination, KeysetPagination
 from core.common.mixins import SafeOrderingMixin
 from pathlib import Path
 from django.db import connections
 import os
-import redis
 from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 import time
 import subprocess
 import shlex
@@ -51,6 +63,7 @@ from core.flood_camera_monitoring.infra.utils import (
     resolve_checkpoint_path,
     looks_like_lfs_pointer,
 )
+from core.flood_camera_monitoring.infra.model_registry import registry
 
 
 class FloodMonitoringViewSet(SafeOrderingMixin, viewsets.ViewSet):
@@ -76,52 +89,43 @@ class FloodMonitoringViewSet(SafeOrderingMixin, viewsets.ViewSet):
             "true",
             "yes",
         )
-        cached = None if force_refresh else cache_get_json("flood:predict_all")
-        if cached and isinstance(cached, dict) and "data" in cached:
-            data = cached["data"]
-        else:
-            service = PredictAllCamerasService()
-            data = service.run()
-            try:
-                refresh_predict_all_cache_task.delay()
-            except Exception:
-                pass
-
-        # optional sorting of in-memory results
+        # Stale-while-revalidate: always answer from the cache (whatever its
+        # age) and let at most one background cycle refresh it.
+        cached = read_predict_all()
+        # Age of the least recently sampled camera; stale once any camera is
+        # past its own sampling interval (infra.cache)
+        age = predict_all_age(cached)
+        stale = predict_all_is_stale(cached)
+        refreshing = False
+        if force_refresh or stale:
+            refreshing = request_predict_all_refresh(force=force_refresh)
+
+        # Ordered and paged server-side (ZRANGE over the per-camera indexes);
+        # the first known ordering key wins, ties fall back to camera id.
         ordering_param = request.query_params.get("ordering", "description")
-        order_map = {
-            "description": lambda it: (it.get("camera") or {}).get("description") or "",
-            "is_flooded": lambda it: bool(it.get("is_flooded", False)),
-            "confidence": lambda it: float(it.get("confidence", 0.0)),
-            "normal": lambda it: float(
-                (it.get("probabilities") or {}).get("normal", 0.0)
-            ),
-            "flooded": lambda it: float(
-                (it.get("probabilities") or {}).get("flooded", 0.0)
-            ),
-            "medium": lambda it: float(
-                (it.get("probabilities") or {}).get("medium", 0.0)
-            ),
-        }
-        if ordering_param:
-            parts = [p.strip() for p in str(ordering_param).split(",") if p.strip()]
-            parsed = []
-            for p in parts:
-                desc = p.startswith("-")
-                key = p[1:] if desc else p
-                fn = order_map.get(key)
-                if fn:
-                    parsed.append((fn, desc))
-            for fn, desc in reversed(parsed):
-                try:
-                    data.sort(key=fn, reverse=desc)
-                except Exception:
-                    pass
+        order_key, descending = "description", False
+        for p in str(ordering_param or "").split(","):
+            p = p.strip()
+            if p.lstrip("-") in ORDER_FIELDS:
+                order_key, descending = p.lstrip("-"), p.startswith("-")
+                break
+        data = CameraResultsPage(order_key, descending)
 
         # DRF pagination for consistency with other list endpoints
         paginator = DefaultPageNumberPagination()
         page_items = paginator.paginate_queryset(data, request, view=self)
-        return paginator.get_paginated_response(page_items)
+        response = paginator.get_paginated_response(page_items)
+        response.data["ts"] = cached.get("ts") if cached else None
+        response.data["age_seconds"] = round(age, 1) if age is not None else None
+        response.data["stale"] = bool(stale)
+        response.data["refreshing"] = bool(refreshing)
+        if age is not None:
+            response["Age"] = str(int(age))
+        if cached is None:
+            # First cycle still running: tell clients to come back shortly
+            response.status_code = status.HTTP_202_ACCEPTED
+            response["Retry-After"] = "30"
+        return response
 
     @action(detail=False, methods=["post"], url_path="predict/snapshot")
     def predict_snapshot(self, request):
@@ -167,9 +171,12 @@ class FloodMonitoringViewSet(SafeOrderingMixin, viewsets.ViewSet):
 
     @action(detail=False, methods=["post"], url_path="analyze/all")
     def analyze_all(self, request):
-        service = AnalyzeAllCamerasService()
-        saved = service.run()
-        return Response({"saved": saved})
+        # Runs on the worker; the sweep is too slow for a request thread
+        task = analyze_all_cameras_task.delay()
+        return Response(
+            {"status": "queued", "task_id": str(task.id)},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
     @action(detail=False, methods=["get"], url_path="cameras")
     def cameras(self, request):
@@ -230,6 +237,110 @@ class FloodMonitoringViewSet(SafeOrderingMixin, viewsets.ViewSet):
         # get_paginated_response will include count/next/previous and ordering
         return paginator.get_paginated_response(data_out)
 
+    @action(detail=True, methods=["get"], url_path="detections")
+    def camera_detections(self, request, camera_id=None):
+        """Linha do tempo de detecções de uma câmera (paginação por cursor).
+
+        - `since` / `until`: ISO 8601 (data ou data/hora), intervalo [since, until)
+        - `resolution`: `raw` (padrão, registros), `hour` ou `day` (rollups)
+        - `ordering`: `-created_at` (padrão, mais recentes primeiro) ou `created_at`
+        """
+        if not Camera.objects.filter(pk=camera_id).exists():
+            raise Http404("Camera not found")
+        bounds = {}
+        for name in ("since", "until"):
+            raw = request.query_params.get(name)
+            if not raw:
+                continue
+            value = parse_datetime(raw)
+            if value is None and parse_date(raw) is not None:
+                value = datetime.combine(parse_date(raw), datetime.min.time())
+            if value is None:
+                return Response(
+                    {"detail": f"{name} inválido"}, status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            bounds[name] = value
+
+        resolution = str(request.query_params.get("resolution") or "raw").lower()
+        if resolution == "raw":
+            qs = FloodDetectionRecord.objects.filter(camera_id=camera_id).only(
+                "id",
+                "created_at",
+                "is_flooded",
+                "medium",
+                "confidence",
+                "prob_normal",
+                "prob_flooded",
+                "prob_medium",
+                "image",
+            )
+            if "since" in bounds:
+                qs = qs.filter(created_at__gte=bounds["since"])
+            if "until" in bounds:
+                qs = qs.filter(created_at__lt=bounds["until"])
+            paginator = KeysetPagination(("created_at", "id"))
+            rows = paginator.paginate_queryset(qs, request, view=self)
+            results = [
+                {
+                    "id": str(rec.id),
+                    "created_at": rec.created_at,
+                    "is_flooded": rec.is_flooded,
+                    "medium": rec.medium,
+                    "confidence": rec.confidence,
+                    "probabilities": {
+                        "normal": rec.prob_normal,
+                        "flooded": rec.prob_flooded,
+                        "medium": rec.prob_medium,
+                    },
+                    "image": (
+                        request.build_absolute_uri(rec.image.url) if rec.image else None
+                    ),
+                }
+                for rec in rows
+            ]
+        elif resolution in ("hour", "day"):
+            # Bucketed maxima from the rollups: never scans raw detections
+            if resolution == "hour":
+                model, key = FloodDetectionHourly, "bucket"
+                lo, hi = bounds.get("since"), bounds.get("until")
+            else:
+                model, key = FloodDetectionDaily, "day"
+                lo, hi = (
+                    timezone.localtime(bounds[k]).date() if k in bounds else None
+                    for k in ("since", "until")
+                )
+            qs = model.objects.filter(camera_id=camera_id)
+            if lo is not None:
+                qs = qs.filter(**{f"{key}__gte": lo})
+            if hi is not None:
+                qs = qs.filter(**{f"{key}__lt": hi})
+            # Same ``ordering`` values as raw detections
+            paginator = KeysetPagination((key, "id"), ordering_field="created_at")
+            rows = paginator.paginate_queryset(qs, request, view=self)
+            results = [
+                {
+                    key: getattr(row, key),
+                    "detections": row.detections,
+                    "flooded": row.flooded,
+                    "medium": row.medium,
+                    "max_prob_flooded": row.max_prob_flooded,
+                    "max_confidence": row.max_confidence,
+                }
+                for row in rows
+            ]
+        else:
+            return Response(
+                {"detail": "resolution deve ser raw, hour ou day"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        response = paginator.get_paginated_response(results)
+        response.data["camera_id"] = str(camera_id)
+        response.data["resolution"] = resolution
+        return response
+
 
 ## Removed duplicate StreamBatchDetectView; use ViewSet action predict/batch
 
@@ -405,7 +516,7 @@ class HealthcheckView(APIView):
         redis_error = None
         redis_url = getattr(settings, "CELERY_BROKER_URL", "redis://redis:6379/0")
         try:
-            r = redis.from_url(redis_url)
+            r = get_redis(url=redis_url)
             if r.ping():
                 redis_ok = True
         except Exception as e:
@@ -419,6 +530,7 @@ class HealthcheckView(APIView):
                 "path": str(checkpoint_path),
                 "exists": model_exists,
                 "size": model_size,
+                "loaded": registry.loaded(),
             },
             "database": {"ok": db_ok, **({"error": db_error} if db_error else {})},
             "redis": {
@@ -426,6 +538,9 @@ class HealthcheckView(APIView):
                 "url": redis_url,
                 **({"error": redis_error} if redis_error else {}),
             },
+            "cache": {**cache_metrics(), "local": tiered_cache_metrics()},
+            "frame_gate": frame_gate_metrics(),
+            "evidence": evidence_metrics(),
         }
         return Response(
             payload,
@@ -468,7 +583,7 @@ class HlsPredictView(APIView):
         try:
             to_skip = _next_skip_count()
             for _ in range(max(0, to_skip)):
-                _ = stream.grab()
+                _ = stream.grab_raw()
                 time.sleep(0.005)
         except Exception:
             pass
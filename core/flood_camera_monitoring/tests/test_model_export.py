@@ -0,0 +1,88 @@
+from pathlib import Path
+import importlib.util
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+from django.test import SimpleTestCase
+
+from core.flood_camera_monitoring.adapters.gateways.torch_classifier_adapter import (
+    TorchFloodClassifier,
+)
+from core.flood_camera_monitoring.infra.machine_model.model import get_model
+from core.flood_camera_monitoring.infra.model_export import export_model
+
+# Same default as `manage.py export_flood_model --tolerance` (softmax units)
+SOFTMAX_TOLERANCE = 1e-3
+CLASS_NAMES = ["normal", "flooded"]
+
+HAS_ONNX = all(
+    importlib.util.find_spec(name) is not None for name in ("onnx", "onnxruntime")
+)
+
+
+def softmax_rows(assessments) -> np.ndarray:
+    """FloodAssessment percentages back to (frames × classes) softmax rows."""
+    return (
+        np.array(
+            [[a.probabilities.normal, a.probabilities.flooded] for a in assessments]
+        )
+        / 100.0
+    )
+
+
+class ExportedModelParityTest(SimpleTestCase):
+    """Exported graphs served by TorchFloodClassifier must match the eager model."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.checkpoint = Path(cls._tmp.name) / "flood_model.pth"
+        torch.manual_seed(0)
+        # Untrained ResNetFloodDetector: same architecture as the production
+        # checkpoint, without downloading weights
+        model = get_model("resnet50", num_classes=len(CLASS_NAMES), pretrained=False)
+        # Shrink the random head so softmax is not saturated and differences
+        # between backends stay visible
+        head = [m for m in model.modules() if isinstance(m, torch.nn.Linear)][-1]
+        with torch.no_grad():
+            head.weight.mul_(1e-3)
+        torch.save(
+            {
+                "model_state_dict": model.state_dict(),
+                "config": {"model_name": "resnet50", "num_classes": len(CLASS_NAMES)},
+                "class_names": CLASS_NAMES,
+            },
+            cls.checkpoint,
+        )
+        cls.eager = TorchFloodClassifier(str(cls.checkpoint), backend="eager")
+        rng = np.random.default_rng(0)
+        cls.frames = [
+            rng.integers(0, 256, (240, 320, 3), dtype=np.uint8) for _ in range(4)
+        ]
+        cls.expected = softmax_rows(cls.eager.predict_batch(cls.frames))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+        super().tearDownClass()
+
+    def assert_backend_parity(self, fmt: str) -> None:
+        self.assertFalse(self.eager._fallback)
+        export_model(self.eager.model, self.checkpoint, fmt, self.eager.class_names)
+        exported = TorchFloodClassifier(str(self.checkpoint), backend=fmt)
+        self.assertEqual(exported.active_backend, fmt)
+        got = softmax_rows(exported.predict_batch(self.frames))
+        self.assertEqual(got.shape, self.expected.shape)
+        self.assertLessEqual(
+            float(np.abs(got - self.expected).max()), SOFTMAX_TOLERANCE
+        )
+
+    def test_frozen_torchscript_matches_eager(self):
+        self.assert_backend_parity("torchscript")
+
+    @unittest.skipUnless(HAS_ONNX, "onnx/onnxruntime not installed")
+    def test_onnx_matches_eager(self):
+        self.assert_backend_parity("onnx")
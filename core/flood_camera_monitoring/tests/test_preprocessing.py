@@ -0,0 +1,87 @@
+import io
+
+import cv2  # type: ignore
+import numpy as np
+import torch
+import torchvision.transforms as T
+from django.test import SimpleTestCase
+from PIL import Image
+
+from core.flood_camera_monitoring.adapters.gateways.preprocessing import (
+    IMAGENET_MEAN,
+    IMAGENET_STD,
+    INPUT_SIZE,
+    BatchPreprocessor,
+    to_rgb,
+)
+
+# One grey level after normalization is 1 / (255 * min(std)) ~= 0.0175; the
+# antialiased uint8 resize may round one level away from PIL's T.Resize
+MAX_ABS_DIFF = 0.02
+MEAN_ABS_DIFF = 0.005
+
+
+def legacy_transform(image) -> torch.Tensor:
+    """Pipeline antigo: PIL -> T.Resize -> ToTensor -> Normalize, um por vez."""
+    tf = T.Compose(
+        [
+            T.Resize(INPUT_SIZE),
+            T.ToTensor(),
+            T.Normalize(mean=list(IMAGENET_MEAN), std=list(IMAGENET_STD)),
+        ]
+    )
+    if isinstance(image, np.ndarray):
+        pil = Image.fromarray(to_rgb(image))
+    else:
+        pil = Image.open(io.BytesIO(image)).convert("RGB")
+    return tf(pil)
+
+
+def camera_like_frames(n: int, height: int = 720, width: int = 1280) -> list:
+    """Smooth synthetic BGR frames (pure noise is far harsher than a camera)."""
+    rng = np.random.default_rng(0)
+    return [
+        cv2.GaussianBlur(
+            rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (0, 0), 2
+        )
+        for _ in range(n)
+    ]
+
+
+class BatchPreprocessorParityTest(SimpleTestCase):
+    """BatchPreprocessor must stay interchangeable with the T.Compose pipeline."""
+
+    def assert_parity(self, images) -> None:
+        got = BatchPreprocessor(capacity=len(images))(images)
+        ref = torch.stack([legacy_transform(img) for img in images])
+        self.assertEqual(tuple(got.shape), (len(images), 3, *INPUT_SIZE))
+        diff = (ref - got).abs()
+        self.assertLessEqual(float(diff.max()), MAX_ABS_DIFF)
+        self.assertLessEqual(float(diff.mean()), MEAN_ABS_DIFF)
+
+    def test_raw_bgr_frames(self):
+        self.assert_parity(camera_like_frames(4))
+
+    def test_jpeg_bytes(self):
+        self.assert_parity(
+            [cv2.imencode(".jpg", f)[1].tobytes() for f in camera_like_frames(2)]
+        )
+
+    def test_grayscale_and_bgra_frames(self):
+        frame = camera_like_frames(1, 360, 640)[0]
+        self.assert_parity(
+            [
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY),
+                cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA),
+            ]
+        )
+
+    def test_frame_already_at_input_size(self):
+        self.assert_parity(camera_like_frames(2, *INPUT_SIZE))
+
+    def test_reused_buffers_do_not_leak_between_batches(self):
+        pre = BatchPreprocessor(capacity=2)
+        frames = camera_like_frames(3)
+        first = pre(frames[:2]).clone()
+        pre(frames[2:])
+        self.assertTrue(torch.equal(pre(frames[:2]), first))